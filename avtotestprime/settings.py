@@ -48,10 +48,11 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.PerformanceMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -60,7 +61,7 @@ ROOT_URLCONF = 'avtotestprime.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.perf.TimedDjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -68,6 +69,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'core.context_processors.fragment_cache',
             ],
         },
     },
@@ -75,6 +77,10 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'avtotestprime.wsgi.application'
 
+# ASGI (SERVER_MODE=asgi) da doimiy ulanishlar ishonchli qayta ishlatilmaydi va Postgres
+# max_connections gacha to'planib qoladi: u yerda DB_POOL=True yoki DB_CONN_MAX_AGE=0.
+SERVER_MODE = os.environ.get('SERVER_MODE', 'wsgi')
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -83,9 +89,83 @@ DATABASES = {
         'PASSWORD': os.environ.get('PGPASSWORD', ''),
         'HOST': os.environ.get('PGHOST', 'localhost'),
         'PORT': os.environ.get('PGPORT', '5432'),
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', '0' if SERVER_MODE == 'asgi' else '60')),
+        'CONN_HEALTH_CHECKS': os.environ.get('DB_CONN_HEALTH_CHECKS', 'True').lower() in ('true', '1', 'yes'),
     }
 }
 
+# psycopg 3 connection pool: pip install "psycopg[binary,pool]" va DB_POOL=True
+if os.environ.get('DB_POOL', 'False').lower() in ('true', '1', 'yes'):
+    try:
+        import psycopg_pool  # noqa: F401
+    except ImportError:
+        pass
+    else:
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS'] = {
+            'pool': {
+                'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', '2')),
+                'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', '10')),
+                'timeout': int(os.environ.get('DB_POOL_TIMEOUT', '10')),
+            },
+        }
+
+PERF_RING_SIZE = int(os.environ.get('PERF_RING_SIZE', '360'))
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', str(BASE_DIR / '.cache')),
+    },
+    # Savol kartochkalari HTML bo'laklari: kalit (id, updated_at), shuning uchun
+    # savol o'zgarganda eski bo'lak o'z-o'zidan ishlatilmay qoladi
+    'fragments': {
+        'BACKEND': os.environ.get('FRAGMENT_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('FRAGMENT_CACHE_LOCATION', 'fragments'),
+        'OPTIONS': {'MAX_ENTRIES': int(os.environ.get('FRAGMENT_CACHE_MAX_ENTRIES', '5000'))},
+    },
+    # Metrikalar halqa buferi alohida: PERF_RING_SIZE ta slot umumiy keshning
+    # MAX_ENTRIES (300) chegarasidan oshib, undagi boshqa yozuvlarni siqib chiqarardi
+    'perf': {
+        'BACKEND': os.environ.get('PERF_CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.environ.get('PERF_CACHE_LOCATION', str(BASE_DIR / '.cache-perf')),
+        'OPTIONS': {'MAX_ENTRIES': PERF_RING_SIZE + 100},
+    },
+    # Sessiyalar va auth_user:{id} - har talabaga bittadan yozuv. Umumiy keshda ular
+    # MAX_ENTRIES (300) dan oshib question_bank:version ni siqib chiqarardi
+    # (har safar bank qayta yuklanib, biletlar va oflayn nusxa qayta qurilardi)
+    'sessions': {
+        'BACKEND': os.environ.get('SESSION_CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.environ.get('SESSION_CACHE_LOCATION', str(BASE_DIR / '.cache-sessions')),
+        'OPTIONS': {'MAX_ENTRIES': int(os.environ.get('SESSION_CACHE_MAX_ENTRIES', '20000'))},
+    },
+}
+FRAGMENT_CACHE_TIMEOUT = int(os.environ.get('FRAGMENT_CACHE_TIMEOUT', '86400'))
+
+# /panel/performance/ uchun so'rov metrikalari (workerlar orasida kesh orqali)
+PERF_ENABLED = os.environ.get('PERF_ENABLED', 'True').lower() in ('true', '1', 'yes')
+PERF_CACHE = os.environ.get('PERF_CACHE', 'perf')
+PERF_SLOW_MS = int(os.environ.get('PERF_SLOW_MS', '500'))
+PERF_FLUSH_SECONDS = int(os.environ.get('PERF_FLUSH_SECONDS', '10'))
+
+# Yechilayotgan test javoblari bazada: kesh yozuvlarni siqib chiqarsa javob yo'qolib, noto'g'ri hisoblanardi.
+# CacheExamStateStore faqat hech qachon tozalanmaydigan kesh (EXAM_STATE_CACHE) bilan ishlatilsin.
+EXAM_STATE_BACKEND = os.environ.get('EXAM_STATE_BACKEND', 'core.exam_state.DatabaseExamStateStore')
+EXAM_STATE_CACHE = os.environ.get('EXAM_STATE_CACHE', 'default')
+
+# Sessiya keshdan o'qiladi (bazaga faqat yozishda), foydalanuvchi ham keshdan
+# (core.middleware.CachedAuthenticationMiddleware) - sahifa uchun auth so'rovlari yo'q
+SESSION_ENGINE = os.environ.get('SESSION_ENGINE', 'django.contrib.sessions.backends.cached_db')
+SESSION_CACHE_ALIAS = os.environ.get('SESSION_CACHE_ALIAS', 'sessions')
+USER_CACHE = os.environ.get('USER_CACHE', 'sessions')
+USER_CACHE_TIMEOUT = int(os.environ.get('USER_CACHE_TIMEOUT', '300'))
+
+# compact_answers: shundan eski testlarning javoblari TestSession.answers_packed ga ko'chiriladi
+ANSWER_RETENTION_DAYS = int(os.environ.get('ANSWER_RETENTION_DAYS', '90'))
+
+# Talabalarni ommaviy qo'shishda parollar shuncha jarayonda hashlanadi (0 - protsessorlar soni)
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', '0'))
+
 AUTH_PASSWORD_VALIDATORS = []
 
 LANGUAGE_CODE = 'en-us'
@@ -96,6 +176,13 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 STATIC_ROOT = BASE_DIR / 'staticfiles'
+# collectstatic: hashli nomlar, minify va .gz/.br nusxalar (nginx gzip_static/brotli_static uchun)
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {
+        'BACKEND': os.environ.get('STATICFILES_BACKEND', 'core.storage.CompressedManifestStaticFilesStorage'),
+    },
+}
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
@@ -1,7 +1,8 @@
 from django.contrib import admin
-from .models import Question, Bookmark, TestSession, TestAnswer
+from .models import Question, Bookmark, TestSession, TestAnswer, ExamTicket
 
 admin.site.register(Question)
 admin.site.register(Bookmark)
 admin.site.register(TestSession)
 admin.site.register(TestAnswer)
+admin.site.register(ExamTicket)
@@ -0,0 +1,182 @@
+import json
+from asgiref.sync import sync_to_async
+from django.contrib.auth.decorators import login_required
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse
+from django.shortcuts import aget_object_or_404
+from django.urls import reverse
+from django.views.decorators.http import require_GET, require_POST
+from .bank import aget_bank
+from .exam_state import get_exam_state_store
+from .grading import grade_session, record_offline_sessions
+from .models import TestSession
+from .offline import aexam_in_progress, aget_snapshot, build_snapshot, dumps, parse_sessions
+
+
+MAX_PAGE_SIZE = 10
+
+
+def question_payload(q):
+    image = None
+    if q.image:
+        image = {
+            'src': q.image.url,
+            'full': q.image_full_url,
+            'srcset_webp': q.image_srcset_webp,
+            'srcset_jpg': q.image_srcset_jpg,
+        }
+    return {
+        'id': q.id,
+        'number': q.number,
+        'text': q.text,
+        'image': image,
+        'variants': q.variants,
+    }
+
+
+def _json_body(request):
+    try:
+        return json.loads(request.body or b'{}')
+    except ValueError:
+        return {}
+
+
+async def _open_session(request, session_id):
+    user = await request.auser()
+    session = await aget_object_or_404(TestSession, id=session_id, user=user)
+    if session.completed:
+        return session, JsonResponse({
+            'error': 'completed',
+            'redirect': reverse('test_result', args=[session.id]),
+        }, status=409)
+    return session, None
+
+
+async def _stored_answers(request, session):
+    answers = await get_exam_state_store().aload_answers(request, session)
+    return {int(qid): answer for qid, answer in answers.items()}
+
+
+async def _save_answers(request, session, bank, submitted):
+    allowed = set(session.question_ids)
+    valid = {}
+    for qid, letter in submitted.items():
+        try:
+            qid = int(qid)
+        except (TypeError, ValueError):
+            continue
+        q = bank.get(qid)
+        letter = str(letter or '').upper()[:1]
+        if qid not in allowed or q is None:
+            continue
+        if letter not in {v['letter'] for v in q.variants}:
+            continue
+        valid[qid] = letter
+    if not valid:
+        return await _stored_answers(request, session)
+    # birinchi javob qoladi: saqlangan savolga kelgan javob e'tiborsiz
+    return await get_exam_state_store().amerge_answers(request, session, valid)
+
+
+def _results(answers, answer_key):
+    return {
+        str(qid): {'selected': selected, 'correct': answer_key.get(qid)}
+        for qid, selected in answers.items()
+    }
+
+
+@require_GET
+@login_required
+async def test_questions(request, session_id):
+    session, error = await _open_session(request, session_id)
+    if error:
+        return error
+    try:
+        start = max(int(request.GET.get('start', 0)), 0)
+        count = min(max(int(request.GET.get('count', 1)), 1), MAX_PAGE_SIZE)
+    except ValueError:
+        start, count = 0, 1
+    bank = await aget_bank()
+    page_ids = session.question_ids[start:start + count]
+    answers = await _stored_answers(request, session)
+    answer_key = bank.answer_key([qid for qid in page_ids if qid in answers])
+    questions = []
+    for offset, q in enumerate(bank.ordered(page_ids)):
+        item = question_payload(q)
+        item['index'] = start + offset
+        if q.id in answers:
+            item['result'] = {'selected': answers[q.id], 'correct': answer_key.get(q.id)}
+        questions.append(item)
+    return JsonResponse({'total': len(session.question_ids), 'questions': questions})
+
+
+@require_POST
+@login_required
+async def test_answers(request, session_id):
+    session, error = await _open_session(request, session_id)
+    if error:
+        return error
+    bank = await aget_bank()
+    submitted = _json_body(request).get('answers') or {}
+    answers = await _save_answers(request, session, bank, submitted)
+    return JsonResponse({'results': _results(answers, bank.answer_key(list(answers)))})
+
+
+@require_POST
+@login_required
+async def test_finish(request, session_id):
+    session, error = await _open_session(request, session_id)
+    if error:
+        return error
+    bank = await aget_bank()
+    data = _json_body(request)
+    answers = await _save_answers(request, session, bank, data.get('answers') or {})
+    try:
+        time_spent = max(int(data.get('time_spent', 0)), 0)
+    except (TypeError, ValueError):
+        time_spent = 0
+    user = await request.auser()
+    await sync_to_async(grade_session)(session.id, user, session.question_ids, answers, time_spent)
+    await get_exam_state_store().aclear(request, session)
+    return JsonResponse({'redirect': reverse('test_result', args=[session.id])})
+
+
+@require_GET
+@login_required
+async def bank_snapshot(request):
+    bank = await aget_bank()
+    # ETag - bank versiyasi: o'zgarmagan bo'lsa brauzer 304 oladi, aks holda ?since= bo'yicha farq
+    etag = f'"{bank.version}"'
+    if etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponseNotModified()
+    elif await aexam_in_progress(await request.auser()):
+        return JsonResponse({'error': 'exam_in_progress'}, status=403)
+    else:
+        try:
+            since = int(request.GET['since'])
+        except (KeyError, ValueError):
+            since = None
+        if since is None:
+            body = await aget_snapshot(bank)
+        else:
+            body = dumps(build_snapshot(bank, since))
+        response = HttpResponse(body, content_type='application/json')
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+@require_POST
+@login_required
+async def practice_sync(request):
+    data = _json_body(request)
+    sessions = data.get('sessions') if isinstance(data, dict) else None
+    if not isinstance(sessions, list):
+        return JsonResponse({'error': 'sessions'}, status=400)
+    user = await request.auser()
+    items, rejected = parse_sessions(await aget_bank(), user, sessions)
+    if items:
+        await sync_to_async(record_offline_sessions)(user, items)
+    return JsonResponse({
+        'synced': [str(item['client_id']) for item in items],
+        'rejected': rejected,
+    })
@@ -0,0 +1,140 @@
+from django.db import transaction
+from .bank import get_bank
+from .models import LETTERS, TestAnswer, TestSession
+
+
+# Paket formati (1-versiya), savollar session.question_ids tartibida:
+#   1 bayt            - format versiyasi
+#   ceil(n / 8) bayt  - to'g'rilik bitlari: i-bit = i-savolga to'g'ri javob berilgan
+#   ceil(n / 2) bayt  - har savolga 4 bit: 0 - javob yozuvi yo'q, 1 - javob tanlanmagan,
+#                       2.. - tanlangan harf (A=2, B=3, ...)
+# 20 savollik test 14 baytga sig'adi; TestAnswer da esa 20 ta qator va indeks yozuvlari.
+PACK_VERSION = 1
+_MISSING = 0
+_BLANK = 1
+
+
+class ArchivedAnswer:
+    """Paketdan tiklangan javob: test_result shablonida TestAnswer o'rnida ishlatiladi."""
+
+    __slots__ = ('question', 'selected_answer', 'is_correct')
+
+    def __init__(self, question, selected_answer, is_correct):
+        self.question = question
+        self.selected_answer = selected_answer
+        self.is_correct = is_correct
+
+
+def pack_answers(question_ids, answers):
+    """answers: {question_id: (selected_answer, is_correct)} -> bytes."""
+    n = len(question_ids)
+    correct = bytearray((n + 7) // 8)
+    letters = bytearray((n + 1) // 2)
+    for i, qid in enumerate(question_ids):
+        answer = answers.get(qid)
+        if answer is None:
+            continue
+        selected, is_correct = answer
+        index = LETTERS.find(selected) if selected else -1
+        code = index + 2 if index >= 0 else _BLANK
+        letters[i >> 1] |= code << ((i & 1) * 4)
+        if is_correct:
+            correct[i >> 3] |= 1 << (i & 7)
+    return bytes([PACK_VERSION]) + bytes(correct) + bytes(letters)
+
+
+def unpack_answers(question_ids, packed):
+    """pack_answers teskarisi: [(question_id, selected_answer, is_correct)], yozuvi yo'q savollarsiz."""
+    packed = bytes(packed)
+    if not packed or packed[0] != PACK_VERSION:
+        raise ValueError(f"Noma'lum paket formati: {packed[:1].hex()}")
+    n = len(question_ids)
+    correct = packed[1:1 + (n + 7) // 8]
+    letters = packed[1 + (n + 7) // 8:]
+    if len(letters) != (n + 1) // 2:
+        raise ValueError("Paket uzunligi savollar soniga mos emas")
+    result = []
+    for i, qid in enumerate(question_ids):
+        code = (letters[i >> 1] >> ((i & 1) * 4)) & 0xF
+        if code == _MISSING:
+            continue
+        selected = LETTERS[code - 2] if code > _BLANK else ''
+        result.append((qid, selected, bool(correct[i >> 3] & (1 << (i & 7)))))
+    return result
+
+
+def session_answers(session):
+    """test_result uchun javoblar: jonli TestAnswer qatorlari yoki arxivlangan paket."""
+    if not session.is_archived:
+        return TestAnswer.objects.filter(session=session).select_related('question')
+    bank = get_bank()
+    # TestAnswer qatorlari savol o'chirilganda CASCADE bilan ketadi; paketda ham ularni tashlab ketamiz
+    return [
+        ArchivedAnswer(bank.get(qid), selected, is_correct)
+        for qid, selected, is_correct in unpack_answers(session.question_ids, session.answers_packed)
+        if qid in bank.by_id
+    ]
+
+
+def compactable_session_ids(cutoff, after=0, limit=500):
+    return list(
+        TestSession.objects.filter(completed=True, answers_packed__isnull=True, created_at__lt=cutoff, id__gt=after)
+        .order_by('id').values_list('id', flat=True)[:limit]
+    )
+
+
+def _answer_order(session, answers):
+    # 0008 migratsiyasidan oldingi testlarda question_ids bo'sh: tartib TestAnswer qatorlaridan olinadi
+    order = list(session.question_ids)
+    known = set(order)
+    return order + [qid for qid in answers if qid not in known]
+
+
+def compact_sessions(session_ids):
+    """Testlar javoblarini paketga yig'ib, ularning TestAnswer qatorlarini o'chiradi.
+
+    Qatorlar faqat paket ochilganda aynan shu javoblar qaytsa o'chiriladi;
+    aks holda test arxivlanmay qoladi.
+    Qaytaradi: (arxivlangan testlar soni, o'chirilgan qatorlar soni).
+    """
+    with transaction.atomic():
+        sessions = list(
+            TestSession.objects.select_for_update()
+            .filter(id__in=session_ids, completed=True, answers_packed__isnull=True)
+            .only('id', 'question_ids')
+        )
+        if not sessions:
+            return 0, 0
+        answers = {}
+        rows = TestAnswer.objects.filter(session_id__in=[s.id for s in sessions]).order_by('id').values_list(
+            'session_id', 'question_id', 'selected_answer', 'is_correct'
+        )
+        for session_id, qid, selected, is_correct in rows:
+            answers.setdefault(session_id, {})[qid] = (selected, is_correct)
+        packed = []
+        for session in sessions:
+            current = answers.get(session.id, {})
+            order = _answer_order(session, current)
+            blob = pack_answers(order, current)
+            restored = {qid: (selected, is_correct) for qid, selected, is_correct in unpack_answers(order, blob)}
+            if restored != current:
+                continue
+            session.question_ids = order
+            session.answers_packed = blob
+            packed.append(session)
+        if not packed:
+            return 0, 0
+        TestSession.objects.bulk_update(packed, ['question_ids', 'answers_packed'])
+        deleted, _ = TestAnswer.objects.filter(session_id__in=[s.id for s in packed]).delete()
+    return len(packed), deleted
+
+
+def iter_archived_answers(batch_size=500):
+    """Arxivlangan barcha javoblar: (user_id, question_id, selected_answer, is_correct)."""
+    sessions = (
+        TestSession.objects.filter(completed=True, answers_packed__isnull=False)
+        .only('user_id', 'question_ids', 'answers_packed')
+    )
+    for session in sessions.iterator(chunk_size=batch_size):
+        for qid, selected, is_correct in unpack_answers(session.question_ids, session.answers_packed):
+            yield session.user_id, qid, selected, is_correct
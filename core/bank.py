@@ -0,0 +1,75 @@
+import threading
+import uuid
+from array import array
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+
+
+BANK_VERSION_KEY = 'question_bank:version'
+
+_lock = threading.Lock()
+_loaded = {'version': None, 'bank': None}
+
+
+class QuestionBank:
+    def __init__(self, version, questions):
+        self.version = version
+        self.questions = questions
+        self.by_id = {q.id: q for q in questions}
+        self.ids = array('q', (q.id for q in questions))
+        self.positions = {q.id: i for i, q in enumerate(questions)}
+        self.image_ids = array('q', (q.id for q in questions if q.image))
+
+    def __len__(self):
+        return len(self.questions)
+
+    @property
+    def count(self):
+        return len(self.questions)
+
+    def get(self, question_id):
+        return self.by_id.get(question_id)
+
+    def ordered(self, question_ids):
+        return [self.by_id[qid] for qid in question_ids if qid in self.by_id]
+
+    def answer_key(self, question_ids):
+        return {qid: self.by_id[qid].correct_answer for qid in question_ids if qid in self.by_id}
+
+
+def current_version():
+    version = cache.get(BANK_VERSION_KEY)
+    if version is None:
+        cache.add(BANK_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        version = cache.get(BANK_VERSION_KEY)
+    return version
+
+
+def bump_version():
+    cache.set(BANK_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+def _load(version):
+    from .models import Question
+    questions = list(Question.objects.all())
+    return QuestionBank(version, questions)
+
+
+def get_bank():
+    version = current_version()
+    bank = _loaded['bank']
+    if bank is not None and _loaded['version'] == version:
+        return bank
+    with _lock:
+        if _loaded['bank'] is None or _loaded['version'] != version:
+            _loaded['bank'] = _load(version)
+            _loaded['version'] = version
+        return _loaded['bank']
+
+
+async def aget_bank():
+    version = await cache.aget(BANK_VERSION_KEY)
+    bank = _loaded['bank']
+    if version is not None and bank is not None and _loaded['version'] == version:
+        return bank
+    return await sync_to_async(get_bank)()
@@ -0,0 +1,381 @@
+import json
+import random
+import statistics
+import threading
+import time
+import uuid
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from .archive import compact_sessions
+from .bank import bump_version, get_bank
+from .models import LETTERS, Bookmark, Question, TestAnswer, TestSession
+from .tickets import warm_tickets
+
+
+BENCH_PASSWORD = 'bench-pass'
+AJAX = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}
+
+# Har bir so'rov uchun ruxsat etilgan SQL so'rovlar soni (sessiya/auth
+# so'rovlari ham kiradi). Oshib ketsa `benchmark` xato bilan tugaydi.
+QUERY_BUDGETS = {
+    'index': 0,
+    'login': 0,
+    'login:post': 9,
+    'logout': 3,
+    'dashboard': 2,
+    'all_questions': 1,
+    'all_questions:ajax': 1,
+    'question_detail': 1,
+    'search_questions': 1,
+    'search_questions:ajax': 1,
+    'toggle_bookmark': 4,
+    'bookmarks': 1,
+    'start_test': 1,
+    'start_test:post': 2,
+    'start_test:weak': 3,
+    'take_test': 1,
+    'tickets': 1,
+    'start_ticket': 1,
+    'take_test:ticket': 1,
+    'practice': 0,
+    'service_worker': 0,
+    'web_manifest': 0,
+    'api_bank_snapshot': 1,
+    'api_bank_snapshot:delta': 1,
+    'api_bank_snapshot:exam': 1,
+    'api_bank_snapshot:304': 0,
+    'api_practice_sync': 16,
+    'api_test_questions': 1,
+    'api_test_answers': 5,
+    'submit_test': 16,
+    'api_test_finish': 16,
+    'test_result': 2,
+    'test_result:archived': 1,
+    'statistics': 2,
+    'profile': 0,
+    'admin_dashboard': 5,
+    'admin_db_status': 0,
+    'admin_performance': 0,
+    'admin_questions': 2,
+    'admin_questions:ajax': 1,
+    'admin_add_question': 0,
+    'admin_add_question:post': 4,
+    'admin_import_questions': 0,
+    'admin_export_questions': 1,
+    'admin_edit_question': 1,
+    'admin_edit_question:post': 2,
+    'admin_delete_question': 8,
+    'admin_users': 1,
+    'admin_add_user': 0,
+    'admin_add_user:post': 2,
+    'admin_import_users': 0,
+    'admin_import_users:post': 4,
+    'admin_edit_user': 1,
+    'admin_edit_user:post': 2,
+    'admin_delete_user': 11,
+    'admin_statistics': 2,
+    'admin_statistics_export': 1,
+}
+
+
+def seed(questions=1000, users=50, sessions=500, answers_per_session=20, seed_value=0):
+    """Benchmark uchun soxta ma'lumotlar: savollar, talabalar, yakunlangan testlar."""
+    rng = random.Random(seed_value)
+    start = Question.objects.count() + 1
+    batch = []
+    for number in range(start, start + questions):
+        count = rng.randint(2, 5)
+        q = Question(
+            number=number,
+            text=f"Savol {number}: yo'l harakati qoidalari bo'yicha vaziyat {rng.randint(1, 10 ** 6)}",
+            variants=[{'letter': LETTERS[i], 'text': f'Variant {LETTERS[i]} {number}'} for i in range(count)],
+            correct_answer=LETTERS[rng.randrange(count)],
+        )
+        q.search_document = q.build_search_document()
+        batch.append(q)
+    Question.objects.bulk_create(batch, batch_size=500)
+    bump_version()
+
+    password = make_password(BENCH_PASSWORD)
+    User.objects.bulk_create([
+        User(username=f'bench_user_{i}', password=password) for i in range(users)
+    ], batch_size=500)
+    User.objects.get_or_create(username='bench_admin', defaults={'password': password, 'is_staff': True})
+    student_ids = list(User.objects.filter(username__startswith='bench_user_').values_list('id', flat=True))
+    question_ids = list(get_bank().ids)
+    answer_key = get_bank().answer_key(question_ids)
+
+    for offset in range(0, sessions, 200):
+        chunk = []
+        for _ in range(min(200, sessions - offset)):
+            picked = rng.sample(question_ids, min(answers_per_session, len(question_ids)))
+            chunk.append(TestSession(
+                user_id=rng.choice(student_ids),
+                total_questions=len(picked),
+                question_ids=picked,
+                time_limit=len(picked) * 60,
+                completed=True,
+            ))
+        answers = []
+        for session in chunk:
+            for qid in session.question_ids:
+                letter = rng.choice([answer_key[qid], 'A', 'B'])
+                session.correct_answers += letter == answer_key[qid]
+                answers.append(TestAnswer(session=session, question_id=qid, selected_answer=letter, is_correct=letter == answer_key[qid]))
+            session.wrong_answers = session.total_questions - session.correct_answers
+            session.time_spent = rng.randint(60, 1200)
+        TestSession.objects.bulk_create(chunk)
+        TestAnswer.objects.bulk_create(answers, batch_size=1000)
+
+    bookmarks = [
+        Bookmark(user_id=user_id, question_id=qid)
+        for user_id in student_ids
+        for qid in rng.sample(question_ids, min(10, len(question_ids)))
+    ]
+    Bookmark.objects.bulk_create(bookmarks, batch_size=1000, ignore_conflicts=True)
+    return student_ids
+
+
+def rebuild_stats():
+    from django.core.management import call_command
+    from io import StringIO
+    call_command('rebuild_user_stats', stdout=StringIO())
+
+
+class Result:
+    def __init__(self, name):
+        self.name = name
+        self.queries = []
+        self.times = []
+        self.statuses = set()
+
+    @property
+    def max_queries(self):
+        return max(self.queries)
+
+    @property
+    def median_ms(self):
+        return statistics.median(self.times) * 1000
+
+    @property
+    def p95_ms(self):
+        times = sorted(self.times)
+        return times[min(len(times) - 1, int(len(times) * 0.95))] * 1000
+
+
+class Runner:
+    def __init__(self, student, admin):
+        self.results = {}
+        self.student = student
+        self.admin = admin
+        self.user_client = Client()
+        self.user_client.force_login(student)
+        self.admin_client = Client()
+        self.admin_client.force_login(admin)
+
+    def measure(self, name, client, method, url, data=None, status=(200,), **extra):
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            response = getattr(client, method)(url, data or {}, **extra)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            elapsed = time.perf_counter() - started
+        if response.status_code not in status:
+            raise AssertionError(f"{name}: {method.upper()} {url} -> {response.status_code}")
+        result = self.results.setdefault(name, Result(name))
+        result.queries.append(len(ctx.captured_queries))
+        result.times.append(elapsed)
+        result.statuses.add(response.status_code)
+        return response
+
+    def exam_flow(self, num_questions):
+        """Asosiy yo'l: start_test -> take_test -> savollar/javoblar -> submit_test -> test_result."""
+        c = self.user_client
+        r = self.measure('start_test:post', c, 'post', reverse('start_test'), {'num_questions': num_questions}, status=(302,))
+        session_id = int(r.url.rstrip('/').split('/')[-1])
+        session = TestSession.objects.get(id=session_id)
+        key = get_bank().answer_key(session.question_ids)
+        self.measure('take_test', c, 'get', reverse('take_test', args=[session_id]))
+        self.measure('api_test_questions', c, 'get', reverse('api_test_questions', args=[session_id]), {'start': 0, 'count': 2})
+        first, rest = session.question_ids[0], session.question_ids[1:]
+        self.measure('api_test_answers', c, 'post', reverse('api_test_answers', args=[session_id]),
+                     f'{{"answers": {{"{first}": "{key[first]}"}}}}', content_type='application/json')
+        data = {f'answer_{qid}': key[qid] for qid in rest}
+        data['time_spent'] = 30
+        self.measure('submit_test', c, 'post', reverse('submit_test', args=[session_id]), data, status=(302,))
+        self.measure('test_result', c, 'get', reverse('test_result', args=[session_id]))
+        compact_sessions([session_id])
+        self.measure('test_result:archived', c, 'get', reverse('test_result', args=[session_id]))
+
+        r = c.post(reverse('start_test'), {'num_questions': num_questions})
+        session_id = int(r.url.rstrip('/').split('/')[-1])
+        self.measure('api_test_finish', c, 'post', reverse('api_test_finish', args=[session_id]),
+                     '{"time_spent": 10}', content_type='application/json')
+        # admin sahifalari bankni o'zgartiradi; biletlar update.sh dagi kabi oldindan tayyorlanadi
+        warm_tickets(get_bank())
+        r = self.measure('start_ticket', c, 'post', reverse('start_ticket', args=[1]), status=(302,))
+        session_id = int(r.url.rstrip('/').split('/')[-1])
+        self.measure('take_test:ticket', c, 'get', reverse('take_test', args=[session_id]))
+        self.measure('start_test:weak', c, 'post', reverse('start_test'),
+                     {'num_questions': num_questions, 'mode': 'weak'}, status=(302,))
+        self.offline_flow(session.question_ids)
+
+    def offline_flow(self, question_ids):
+        """Oflayn mashq: bank nusxasi (to'liq, farq, 304) va navbatdagi natijalarni sinxronlash."""
+        c = self.user_client
+        self.measure('practice', c, 'get', reverse('practice'))
+        self.measure('service_worker', Client(), 'get', reverse('service_worker'))
+        self.measure('web_manifest', Client(), 'get', reverse('web_manifest'))
+        url = reverse('api_bank_snapshot')
+        # exam_flow dagi bilet va zaif savollar testlari yakunlanmagan: nusxa berilmaydi
+        self.measure('api_bank_snapshot:exam', c, 'get', url, status=(403,))
+        TestSession.objects.filter(user=self.student, completed=False).update(completed=True)
+        r = self.measure('api_bank_snapshot', c, 'get', url)
+        since = json.loads(r.content)['updated']
+        self.measure('api_bank_snapshot:delta', c, 'get', url, {'since': since})
+        self.measure('api_bank_snapshot:304', c, 'get', url, {'since': since}, status=(304,), HTTP_IF_NONE_MATCH=r['ETag'])
+        key = get_bank().answer_key(question_ids)
+        now = int(time.time() * 1000)
+        sessions = [
+            {
+                'client_id': str(uuid.uuid4()),
+                'user': self.student.id,
+                'started_at': now - (i + 1) * 600000,
+                'time_spent': 300,
+                'question_ids': question_ids,
+                'answers': {str(qid): key[qid] for qid in question_ids[i:]},
+            }
+            for i in range(5)
+        ]
+        self.measure('api_practice_sync', c, 'post', reverse('api_practice_sync'),
+                     json.dumps({'sessions': sessions}), content_type='application/json')
+
+    def pages(self, iteration):
+        u, a = self.user_client, self.admin_client
+        bank = get_bank()
+        question_id = bank.questions[iteration % bank.count].id
+        middle = bank.questions[bank.count // 2].number
+
+        anon = Client()
+        self.measure('index', anon, 'get', reverse('index'), status=(302,))
+        self.measure('login', anon, 'get', reverse('login'))
+        self.measure('login:post', anon, 'post', reverse('login'),
+                     {'username': self.student.username, 'password': BENCH_PASSWORD}, status=(302,))
+        self.measure('logout', anon, 'get', reverse('logout'), status=(302,))
+
+        self.measure('dashboard', u, 'get', reverse('dashboard'))
+        self.measure('all_questions', u, 'get', reverse('all_questions'))
+        self.measure('all_questions:ajax', u, 'get', reverse('all_questions'), {'after': middle}, **AJAX)
+        self.measure('question_detail', u, 'get', reverse('question_detail', args=[question_id]))
+        self.measure('search_questions', u, 'get', reverse('search_questions'), {'q': "yo'l harakati"})
+        self.measure('search_questions:ajax', u, 'get', reverse('search_questions'), {'q': 'savol', 'start': 50}, **AJAX)
+        self.measure('toggle_bookmark', u, 'get', reverse('toggle_bookmark', args=[question_id]), **AJAX)
+        self.measure('bookmarks', u, 'get', reverse('bookmarks'))
+        self.measure('start_test', u, 'get', reverse('start_test'))
+        self.measure('tickets', u, 'get', reverse('tickets'))
+        self.measure('statistics', u, 'get', reverse('statistics'))
+        self.measure('profile', u, 'get', reverse('profile'))
+
+        self.measure('admin_dashboard', a, 'get', reverse('admin_dashboard'))
+        self.measure('admin_db_status', a, 'get', reverse('admin_db_status'))
+        self.measure('admin_performance', a, 'get', reverse('admin_performance'))
+        self.measure('admin_questions', a, 'get', reverse('admin_questions'))
+        self.measure('admin_questions:ajax', a, 'get', reverse('admin_questions'), {'after': middle}, **AJAX)
+        self.measure('admin_add_question', a, 'get', reverse('admin_add_question'))
+        self.measure('admin_add_question:post', a, 'post', reverse('admin_add_question'), {
+            'text': f'Benchmark savol {iteration}', 'variant_a': 'Ha', 'variant_b': "Yo'q", 'correct_answer': 'A',
+        }, status=(302,))
+        added = Question.objects.filter(text=f'Benchmark savol {iteration}').values_list('id', flat=True).first()
+        self.measure('admin_edit_question', a, 'get', reverse('admin_edit_question', args=[added]))
+        self.measure('admin_edit_question:post', a, 'post', reverse('admin_edit_question', args=[added]), {
+            'text': f'Benchmark savol {iteration} (tahrir)', 'variant_a': 'Ha', 'variant_b': "Yo'q", 'correct_answer': 'B',
+        }, status=(302,))
+        self.measure('admin_delete_question', a, 'post', reverse('admin_delete_question', args=[added]), status=(302,))
+        self.measure('admin_import_questions', a, 'get', reverse('admin_import_questions'))
+        self.measure('admin_export_questions', a, 'get', reverse('admin_export_questions'), {'format': 'csv'})
+
+        username = f'bench_tmp_{iteration}'
+        self.measure('admin_users', a, 'get', reverse('admin_users'))
+        self.measure('admin_add_user', a, 'get', reverse('admin_add_user'))
+        self.measure('admin_add_user:post', a, 'post', reverse('admin_add_user'),
+                     {'username': username, 'password': 'x'}, status=(302,))
+        tmp_id = User.objects.get(username=username).id
+        self.measure('admin_edit_user', a, 'get', reverse('admin_edit_user', args=[tmp_id]))
+        self.measure('admin_edit_user:post', a, 'post', reverse('admin_edit_user', args=[tmp_id]),
+                     {'username': username, 'password': ''})
+        self.measure('admin_delete_user', a, 'post', reverse('admin_delete_user', args=[tmp_id]), status=(302,))
+        self.measure('admin_import_users', a, 'get', reverse('admin_import_users'))
+        prefix = f'bench_import_{iteration}_'
+        students = '\n'.join(['username,password', self.student.username] + [f'{prefix}{i}' for i in range(3)])
+        self.measure('admin_import_users:post', a, 'post', reverse('admin_import_users'),
+                     {'file': SimpleUploadedFile('students.csv', students.encode(), 'text/csv')})
+        User.objects.filter(username__startswith=prefix).delete()
+        self.measure('admin_statistics', a, 'get', reverse('admin_statistics'), {'sort': '-avg'})
+        self.measure('admin_statistics_export', a, 'get', reverse('admin_statistics_export'))
+
+
+def uncovered_routes(results):
+    from .urls import urlpatterns
+    measured = {name.split(':')[0] for name in results}
+    return [p.name for p in urlpatterns if p.name not in measured]
+
+
+def budget_violations(results, budgets=QUERY_BUDGETS):
+    violations = []
+    for name, result in results.items():
+        budget = budgets.get(name)
+        if budget is None or result.max_queries > budget:
+            violations.append((name, result.max_queries, budget))
+    return violations
+
+
+def load_test(users, concurrency, iterations, num_questions):
+    """Parallel oqimlar: har biri o'z foydalanuvchisi bilan imtihon oqimini takrorlaydi."""
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def worker(user):
+        client = Client()
+        client.force_login(user)
+        for _ in range(iterations):
+            started = time.perf_counter()
+            try:
+                r = client.post(reverse('start_test'), {'num_questions': num_questions})
+                session_id = int(r.url.rstrip('/').split('/')[-1])
+                client.get(reverse('take_test', args=[session_id]))
+                client.get(reverse('api_test_questions', args=[session_id]), {'start': 0, 'count': 2})
+                r = client.post(reverse('api_test_finish', args=[session_id]), '{"time_spent": 5}',
+                                content_type='application/json')
+                if r.status_code != 200:
+                    raise AssertionError(f'finish -> {r.status_code}')
+                client.get(reverse('test_result', args=[session_id]))
+            except Exception as e:
+                with lock:
+                    errors.append(repr(e))
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - started)
+        connection.close()
+
+    threads = [threading.Thread(target=worker, args=(users[i % len(users)],)) for i in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'flows': len(latencies),
+        'errors': errors,
+        'wall_s': wall,
+        'flows_per_s': len(latencies) / wall if wall else 0,
+        'p50_ms': latencies[len(latencies) // 2] * 1000 if latencies else None,
+        'p95_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000 if latencies else None,
+    }
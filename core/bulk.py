@@ -0,0 +1,422 @@
+import csv
+import io
+import json
+import zipfile
+from io import BytesIO
+from pathlib import Path, PurePosixPath
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from PIL import Image
+from .bank import bump_version, get_bank
+from .images import build_image_variants, delete_image_variants
+from .models import LETTERS, Question
+
+
+BATCH_SIZE = 500
+MAX_IMAGE_BYTES = 10 * 1024 * 1024
+# pg_advisory_xact_lock kaliti: savol raqamlarini ajratishni ketma-ket qiladi
+NUMBER_LOCK_ID = 0x41565450
+QUESTION_FILES = ('questions.jsonl', 'questions.json', 'questions.csv')
+CSV_FIELDS = ['number', 'text', 'image', 'correct_answer'] + [f'variant_{letter.lower()}' for letter in LETTERS]
+# Mavjud raqamlar qulfdan oldin o'qiladi: parallel import yoki admin qo'shgan savol bilan to'qnashuv
+NUMBER_CONFLICT_MESSAGE = "Savol raqamlari bazadagi savollar bilan to'qnashdi, hech narsa yozilmadi. Qayta urinib ko'ring."
+
+
+class BulkImportError(Exception):
+    pass
+
+
+def allocate_numbers(count, floor=0):
+    """Keyingi bo'sh `count` ta savol raqamini qaytaradi.
+
+    transaction.atomic() ichida chaqirilishi kerak: Postgres'da qulf
+    tranzaksiya tugaguncha ushlab turiladi, shuning uchun parallel
+    qo'shishlar bir xil raqam ololmaydi.
+    """
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [NUMBER_LOCK_ID])
+    start = max(Question.objects.aggregate(m=Max('number'))['m'] or 0, floor) + 1
+    return range(start, start + count)
+
+
+class ImportReport:
+    def __init__(self):
+        self.total = 0
+        self.created = 0
+        self.updated = 0
+        self.images = 0
+        self.errors = []
+
+    def error(self, line, message):
+        self.errors.append((line, message))
+
+
+def _text_stream(stream):
+    return io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+
+
+def _read_csv(stream):
+    reader = csv.DictReader(_text_stream(stream))
+    for row in reader:
+        yield reader.line_num, {
+            'number': row.get('number'),
+            'text': row.get('text'),
+            'image': row.get('image'),
+            'correct_answer': row.get('correct_answer'),
+            'variants': [
+                {'letter': letter, 'text': row.get(f'variant_{letter.lower()}') or ''}
+                for letter in LETTERS
+                if (row.get(f'variant_{letter.lower()}') or '').strip()
+            ],
+        }
+
+
+def _read_jsonl(stream):
+    for line_num, line in enumerate(_text_stream(stream), 1):
+        if not line.strip():
+            continue
+        try:
+            yield line_num, json.loads(line)
+        except ValueError:
+            yield line_num, None
+
+
+def _read_json(stream):
+    try:
+        items = json.load(_text_stream(stream))
+    except ValueError as e:
+        raise BulkImportError(f"JSON faylni o'qib bo'lmadi: {e}")
+    if isinstance(items, dict):
+        items = items.get('questions', [])
+    if not isinstance(items, list):
+        raise BulkImportError("JSON fayl savollar ro'yxatidan iborat bo'lishi kerak")
+    yield from enumerate(items, 1)
+
+
+READERS = {'.csv': _read_csv, '.jsonl': _read_jsonl, '.json': _read_json}
+
+
+def _clean_variants(raw):
+    if not isinstance(raw, list):
+        raise ValueError("variantlar ro'yxat bo'lishi kerak")
+    if not 2 <= len(raw) <= len(LETTERS):
+        raise ValueError(f"variantlar soni 2 dan {len(LETTERS)} gacha bo'lishi kerak")
+    variants = []
+    for i, v in enumerate(raw):
+        if isinstance(v, dict):
+            letter = str(v.get('letter') or LETTERS[i]).strip().upper()
+            text = str(v.get('text') or '').strip()
+        else:
+            letter, text = LETTERS[i], str(v).strip()
+        if letter not in LETTERS or not text:
+            raise ValueError(f"{i + 1}-variant noto'g'ri")
+        variants.append({'letter': letter, 'text': text})
+    if len({v['letter'] for v in variants}) != len(variants):
+        raise ValueError("variant harflari takrorlangan")
+    return variants
+
+
+def _clean_row(data):
+    if not isinstance(data, dict):
+        raise ValueError("qator o'qib bo'lmadi")
+    text = str(data.get('text') or '').strip()
+    if not text:
+        raise ValueError("savol matni bo'sh")
+    number = data.get('number')
+    if number in (None, ''):
+        number = None
+    else:
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise ValueError(f"raqam noto'g'ri: {number}")
+        if number < 1:
+            raise ValueError(f"raqam noto'g'ri: {number}")
+    variants = _clean_variants(data.get('variants'))
+    correct = str(data.get('correct_answer') or '').strip().upper()
+    if correct not in {v['letter'] for v in variants}:
+        raise ValueError(f"to'g'ri javob variantlar orasida yo'q: {correct or '-'}")
+    image = str(data.get('image') or '').strip() or None
+    return {'number': number, 'text': text, 'variants': variants, 'correct_answer': correct, 'image': image}
+
+
+class _Source:
+    """Savollar fayli va rasmlar: ZIP arxiv yoki bitta CSV/JSON fayl."""
+
+    def __init__(self, fileobj, name, base_dir=None):
+        suffix = PurePosixPath(name).suffix.lower()
+        self.zip = None
+        self.base_dir = Path(base_dir) if base_dir else None
+        if suffix == '.zip':
+            try:
+                self.zip = zipfile.ZipFile(fileobj)
+            except zipfile.BadZipFile:
+                raise BulkImportError("ZIP arxivni o'qib bo'lmadi")
+            names = {PurePosixPath(n).name: n for n in self.zip.namelist() if not n.endswith('/')}
+            member = next((names[n] for n in QUESTION_FILES if n in names), None)
+            if member is None:
+                raise BulkImportError(f"Arxivda {', '.join(QUESTION_FILES)} fayllaridan biri bo'lishi kerak")
+            self.root = PurePosixPath(member).parent
+            self.reader = READERS[PurePosixPath(member).suffix]
+            self.stream = self.zip.open(member)
+        elif suffix in READERS:
+            self.reader = READERS[suffix]
+            self.stream = fileobj
+        else:
+            raise BulkImportError("Faqat .zip, .csv, .json yoki .jsonl fayl qabul qilinadi")
+
+    def rows(self):
+        return self.reader(self.stream)
+
+    def read_image(self, path):
+        if self.zip is not None:
+            try:
+                info = self.zip.getinfo(str(self.root / path))
+            except KeyError:
+                raise ValueError(f"rasm arxivda topilmadi: {path}")
+            if info.file_size > MAX_IMAGE_BYTES:
+                raise ValueError(f"rasm juda katta: {path}")
+            data = self.zip.read(info)
+        elif self.base_dir is not None:
+            try:
+                data = (self.base_dir / path).read_bytes()
+            except OSError:
+                raise ValueError(f"rasm topilmadi: {path}")
+        else:
+            raise ValueError(f"rasm uchun ZIP arxiv yuklang: {path}")
+        try:
+            Image.open(BytesIO(data)).verify()
+        except Exception:
+            raise ValueError(f"rasm fayli buzilgan: {path}")
+        return data
+
+    def close(self):
+        if self.zip is not None:
+            self.stream.close()
+            self.zip.close()
+
+
+def _collect(source, report, update):
+    rows = []
+    numbers = {}
+    for line, data in source.rows():
+        report.total += 1
+        try:
+            row = _clean_row(data)
+        except ValueError as e:
+            report.error(line, str(e))
+            continue
+        if row['number'] is not None:
+            if row['number'] in numbers:
+                report.error(line, f"raqam {row['number']} {numbers[row['number']]}-qatorda ham bor")
+                continue
+            numbers[row['number']] = line
+        row['line'] = line
+        rows.append(row)
+    existing = dict(Question.objects.filter(number__in=list(numbers)).values_list('number', 'id'))
+    if not update:
+        for row in rows:
+            if row['number'] in existing:
+                report.error(row['line'], f"raqam {row['number']} bazada allaqachon bor")
+        rows = [row for row in rows if row['number'] not in existing]
+    return rows, existing
+
+
+def _apply_image(question, row, source, saved_files):
+    data = source.read_image(row['image'])
+    question.image.save(PurePosixPath(row['image']).name, ContentFile(data), save=False)
+    saved_files.append(question.image.name)
+
+
+def import_questions(fileobj, name, update=False, build_variants=True, batch_size=BATCH_SIZE, progress=None, base_dir=None):
+    """ZIP/CSV/JSON dan savollarni ommaviy yuklash.
+
+    Xato qatorlar o'tkazib yuboriladi va hisobotda qaytariladi; qolganlari
+    bitta tranzaksiyada `batch_size` bo'laklab yoziladi. `update=True`
+    bo'lsa, mavjud raqamli savollar yangilanadi.
+    """
+    report = ImportReport()
+    source = _Source(fileobj, name, base_dir)
+    try:
+        rows, existing = _collect(source, report, update)
+        new_rows = [row for row in rows if row['number'] not in existing]
+        update_rows = [row for row in rows if row['number'] in existing]
+        saved_files = []
+        replaced_images = []
+        with_images = []
+        try:
+            with transaction.atomic():
+                floor = max((row['number'] for row in new_rows if row['number']), default=0)
+                numbers = iter(allocate_numbers(sum(1 for row in new_rows if row['number'] is None), floor))
+                done = 0
+                for start in range(0, len(new_rows), batch_size):
+                    batch = []
+                    for row in new_rows[start:start + batch_size]:
+                        q = Question(
+                            number=row['number'] or next(numbers),
+                            text=row['text'],
+                            variants=row['variants'],
+                            correct_answer=row['correct_answer'],
+                        )
+                        if row['image']:
+                            try:
+                                _apply_image(q, row, source, saved_files)
+                            except ValueError as e:
+                                report.error(row['line'], str(e))
+                                continue
+                            with_images.append(q.number)
+                        q.search_document = q.build_search_document()
+                        batch.append(q)
+                    Question.objects.bulk_create(batch, batch_size=batch_size)
+                    report.created += len(batch)
+                    done += len(new_rows[start:start + batch_size])
+                    if progress:
+                        progress('rows', done, len(rows))
+                for start in range(0, len(update_rows), batch_size):
+                    chunk = update_rows[start:start + batch_size]
+                    current = Question.objects.in_bulk([existing[row['number']] for row in chunk])
+                    batch = []
+                    now = timezone.now()
+                    for row in chunk:
+                        q = current[existing[row['number']]]
+                        if row['image']:
+                            old_image, old_variants = q.image.name, q.image_variants
+                            try:
+                                _apply_image(q, row, source, saved_files)
+                            except ValueError as e:
+                                report.error(row['line'], str(e))
+                                continue
+                            replaced_images.append((old_image, old_variants))
+                            q.image_variants = {}
+                            with_images.append(q.number)
+                        q.text = row['text']
+                        q.variants = row['variants']
+                        q.correct_answer = row['correct_answer']
+                        q.search_document = q.build_search_document()
+                        q.updated_at = now
+                        batch.append(q)
+                    Question.objects.bulk_update(batch, [
+                        'text', 'variants', 'correct_answer', 'image', 'image_variants', 'search_document', 'updated_at',
+                    ])
+                    report.updated += len(batch)
+                    done += len(chunk)
+                    if progress:
+                        progress('rows', done, len(rows))
+                # bulk_create/bulk_update post_save signalini chaqirmaydi
+                transaction.on_commit(bump_version)
+        except Exception:
+            for file_name in saved_files:
+                default_storage.delete(file_name)
+            raise
+    finally:
+        source.close()
+
+    for old_image, old_variants in replaced_images:
+        if old_image:
+            default_storage.delete(old_image)
+        delete_image_variants(old_variants)
+    report.images = len(with_images)
+    if build_variants and with_images:
+        _build_variants(with_images, progress)
+    return report
+
+
+def _build_variants(numbers, progress=None):
+    done = 0
+    for q in Question.objects.filter(number__in=numbers).only('id', 'image', 'image_variants').iterator():
+        try:
+            variants = build_image_variants(q)
+        except OSError:
+            variants = {}
+        Question.objects.filter(id=q.id).update(image_variants=variants, updated_at=timezone.now())
+        done += 1
+        if progress:
+            progress('images', done, len(numbers))
+    bump_version()
+
+
+def _record(q, image_name):
+    return {
+        'number': q.number,
+        'text': q.text,
+        'variants': q.variants,
+        'correct_answer': q.correct_answer,
+        'image': image_name,
+    }
+
+
+def _export_image_name(q):
+    if q.image and default_storage.exists(q.image.name):
+        return f'images/{q.number}{PurePosixPath(q.image.name).suffix.lower()}'
+    return None
+
+
+class _ZipStream:
+    """zipfile uchun yozish oqimi: yozilgan baytlarni bo'laklab qaytaradi."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def export_zip(questions=None):
+    """questions.jsonl va images/ papkasidan iborat ZIP'ni bo'laklab beradi."""
+    if questions is None:
+        questions = get_bank().questions
+    out = _ZipStream()
+    with zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED) as zf:
+        images = []
+        with zf.open('questions.jsonl', 'w', force_zip64=True) as member:
+            for q in questions:
+                image_name = _export_image_name(q)
+                if image_name:
+                    images.append((image_name, q.image.name))
+                member.write(json.dumps(_record(q, image_name), ensure_ascii=False).encode('utf-8') + b'\n')
+                if out.chunks:
+                    yield out.drain()
+        for image_name, storage_name in images:
+            # rasmlar allaqachon siqilgan, qayta deflate qilish foydasiz
+            info = zipfile.ZipInfo(image_name, date_time=timezone.localtime().timetuple()[:6])
+            with default_storage.open(storage_name, 'rb') as src, zf.open(info, 'w', force_zip64=True) as member:
+                for chunk in iter(lambda: src.read(64 * 1024), b''):
+                    member.write(chunk)
+                    if out.chunks:
+                        yield out.drain()
+    yield out.drain()
+
+
+def export_csv(questions=None):
+    """Rasmlarsiz CSV eksport, qatorma-qator."""
+    if questions is None:
+        questions = get_bank().questions
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, CSV_FIELDS)
+    writer.writeheader()
+    for q in questions:
+        row = {
+            'number': q.number,
+            'text': q.text,
+            'image': '',
+            'correct_answer': q.correct_answer,
+        }
+        for v in q.variants:
+            row[f'variant_{v["letter"].lower()}'] = v['text']
+        writer.writerow(row)
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
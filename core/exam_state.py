@@ -0,0 +1,142 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.module_loading import import_string
+from .models import TestSession
+
+
+def _merged(stored, answers):
+    """Saqlangan javoblarga yangilarini qo'shadi: savolga birinchi javob qoladi. (javoblar, o'zgardimi)."""
+    merged = {int(qid): letter for qid, letter in (stored or {}).items()}
+    new = {qid: letter for qid, letter in answers.items() if qid not in merged}
+    merged.update(new)
+    return merged, bool(new)
+
+
+class DatabaseExamStateStore:
+    """Javoblar TestSession.draft_answers da: kesh tozalanganda ham yo'qolmaydi.
+
+    Sessiya qatori view'da baribir o'qiladi, shuning uchun o'qish bepul;
+    har saqlash bitta UPDATE. grade_session yakunlashda maydonni o'zi tozalaydi.
+    """
+
+    def load_answers(self, request, session):
+        return dict(session.draft_answers or {})
+
+    def save_answers(self, request, session, answers):
+        session.draft_answers = answers
+        TestSession.objects.filter(id=session.id).update(draft_answers=answers)
+
+    def merge_answers(self, request, session, answers):
+        # Qator qulflanadi: bir vaqtda kelgan ikki autosave bir-birining javobini o'chirib yubormaydi
+        with transaction.atomic():
+            stored = TestSession.objects.select_for_update().values_list('draft_answers', flat=True).get(id=session.id)
+            merged, changed = _merged(stored, answers)
+            if changed:
+                TestSession.objects.filter(id=session.id).update(draft_answers=merged)
+        session.draft_answers = merged
+        return merged
+
+    def clear(self, request, session):
+        session.draft_answers = None
+
+    async def aload_answers(self, request, session):
+        return self.load_answers(request, session)
+
+    async def asave_answers(self, request, session, answers):
+        session.draft_answers = answers
+        await TestSession.objects.filter(id=session.id).aupdate(draft_answers=answers)
+
+    async def amerge_answers(self, request, session, answers):
+        return await sync_to_async(self.merge_answers)(request, session, answers)
+
+    async def aclear(self, request, session):
+        self.clear(request, session)
+
+
+class CacheExamStateStore:
+    grace_period = 60 * 60
+
+    def __init__(self):
+        self.cache = caches[getattr(settings, 'EXAM_STATE_CACHE', 'default')]
+
+    def _key(self, session):
+        return f'exam_state:{session.id}'
+
+    def load_answers(self, request, session):
+        return self.cache.get(self._key(session)) or {}
+
+    def save_answers(self, request, session, answers):
+        self.cache.set(self._key(session), answers, session.time_limit + self.grace_period)
+
+    def merge_answers(self, request, session, answers):
+        # o'qish-yozish atomar emas: parallel autosave uchun DatabaseExamStateStore
+        merged, changed = _merged(self.load_answers(request, session), answers)
+        if changed:
+            self.save_answers(request, session, merged)
+        return merged
+
+    def clear(self, request, session):
+        self.cache.delete(self._key(session))
+
+    async def aload_answers(self, request, session):
+        return await self.cache.aget(self._key(session)) or {}
+
+    async def asave_answers(self, request, session, answers):
+        await self.cache.aset(self._key(session), answers, session.time_limit + self.grace_period)
+
+    async def amerge_answers(self, request, session, answers):
+        merged, changed = _merged(await self.aload_answers(request, session), answers)
+        if changed:
+            await self.asave_answers(request, session, merged)
+        return merged
+
+    async def aclear(self, request, session):
+        await self.cache.adelete(self._key(session))
+
+
+class SessionExamStateStore:
+    def _key(self, session):
+        return f'test_{session.id}'
+
+    def load_answers(self, request, session):
+        return request.session.get(self._key(session), {}).get('answers', {})
+
+    def save_answers(self, request, session, answers):
+        request.session[self._key(session)] = {'answers': answers}
+
+    def merge_answers(self, request, session, answers):
+        merged, changed = _merged(self.load_answers(request, session), answers)
+        if changed:
+            self.save_answers(request, session, merged)
+        return merged
+
+    def clear(self, request, session):
+        request.session.pop(self._key(session), None)
+
+    async def aload_answers(self, request, session):
+        return (await request.session.aget(self._key(session), {})).get('answers', {})
+
+    async def asave_answers(self, request, session, answers):
+        await request.session.aset(self._key(session), {'answers': answers})
+
+    async def amerge_answers(self, request, session, answers):
+        merged, changed = _merged(await self.aload_answers(request, session), answers)
+        if changed:
+            await self.asave_answers(request, session, merged)
+        return merged
+
+    async def aclear(self, request, session):
+        await request.session.apop(self._key(session), None)
+
+
+_store = None
+
+
+def get_exam_state_store():
+    global _store
+    if _store is None:
+        backend = getattr(settings, 'EXAM_STATE_BACKEND', 'core.exam_state.DatabaseExamStateStore')
+        _store = import_string(backend)()
+    return _store
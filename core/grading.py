@@ -0,0 +1,138 @@
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+from .bank import get_bank
+from .models import QuestionStat, TestSession, TestAnswer, UserQuestionStat, UserStats
+
+
+def _record_question_stats(user, rows):
+    # Zaif savollar rejimi uchun (user, savol) va umumiy savol hisoblagichlari.
+    # UserStats qatori qulflangan holda chaqiriladi, shuning uchun bitta
+    # foydalanuvchining yozuvlari parallel yangilanmaydi.
+    # Oflayn sinxronlashda bir savol bir nechta testda uchrashi mumkin.
+    counts = {}
+    for row in rows:
+        delta = counts.setdefault(row.question_id, [0, 0])
+        delta[0] += 1
+        delta[1] += not row.is_correct
+    existing = {s.question_id: s for s in UserQuestionStat.objects.filter(user=user, question_id__in=list(counts))}
+    now = timezone.now()
+    new = []
+    for qid, (attempts, wrong) in counts.items():
+        stat = existing.get(qid)
+        if stat is None:
+            new.append(UserQuestionStat(user=user, question_id=qid, attempts=attempts, wrong=wrong))
+        else:
+            stat.attempts += attempts
+            stat.wrong += wrong
+            stat.last_answered_at = now
+    UserQuestionStat.objects.bulk_update(existing.values(), ['attempts', 'wrong', 'last_answered_at'])
+    UserQuestionStat.objects.bulk_create(new)
+    # Umumiy hisoblagichlar barcha talabalar uchun bir xil qatorlar: ular test
+    # tranzaksiyasi tugagach, alohida qisqa tranzaksiyada yangilanadi
+    transaction.on_commit(lambda: _bump_question_stats(counts))
+
+
+def _bump_question_stats(counts):
+    qids = sorted(counts)
+    with transaction.atomic():
+        QuestionStat.objects.bulk_create([QuestionStat(question_id=qid) for qid in qids], ignore_conflicts=True)
+        # Qulflar doim question_id tartibida olinadi: kesishgan testlar bir-birini kutadi, lekin deadlock bo'lmaydi
+        list(QuestionStat.objects.select_for_update().filter(question_id__in=qids).order_by('question_id').values_list('pk'))
+        QuestionStat.objects.filter(question_id__in=qids).update(
+            attempts=F('attempts') + Case(*[When(question_id=qid, then=Value(counts[qid][0])) for qid in qids]),
+            wrong=F('wrong') + Case(*[When(question_id=qid, then=Value(counts[qid][1])) for qid in qids]),
+        )
+
+
+def _grade(answer_key, question_ids, answers):
+    correct = 0
+    rows = []
+    for qid in question_ids:
+        if qid not in answer_key:
+            continue
+        selected = (answers.get(qid) or '').upper()[:1]
+        is_correct = bool(selected) and selected == answer_key[qid]
+        correct += is_correct
+        rows.append(TestAnswer(question_id=qid, selected_answer=selected, is_correct=is_correct))
+    return rows, correct, len(rows) - correct
+
+
+def grade_session(session_id, user, question_ids, answers, time_spent=0):
+    answer_key = get_bank().answer_key(question_ids)
+    with transaction.atomic():
+        session = TestSession.objects.select_for_update().get(id=session_id, user=user)
+        if session.completed:
+            return session
+        rows, correct, wrong = _grade(answer_key, question_ids, answers)
+        for row in rows:
+            row.session = session
+        TestAnswer.objects.bulk_create(rows, ignore_conflicts=True)
+        session.correct_answers = correct
+        session.wrong_answers = wrong
+        session.time_spent = time_spent
+        session.completed = True
+        session.draft_answers = None
+        session.save(update_fields=['correct_answers', 'wrong_answers', 'time_spent', 'completed', 'draft_answers'])
+        stats, _ = UserStats.objects.select_for_update().get_or_create(user=user)
+        stats.add_session(session)
+        stats.save()
+        _record_question_stats(user, rows)
+    return session
+
+
+def record_offline_sessions(user, items):
+    """Oflayn mashqda yechilgan testlarni bir tranzaksiyada yozadi.
+
+    items: [{'client_id', 'created_at', 'time_spent', 'question_ids', 'answers'}],
+    javoblar bankdagi to'g'ri javob bilan shu yerda qayta tekshiriladi. Avval
+    yozilgan client_id lar o'tkazib yuboriladi - brauzer javobni olmay qolib
+    qayta yuborsa ham test ikki marta hisoblanmaydi. Yangi yozilgan testlar
+    sonini qaytaradi.
+    """
+    bank = get_bank()
+    with transaction.atomic():
+        # Qulf bir foydalanuvchining parallel sinxronlashlarini navbatga qo'yadi
+        stats, _ = UserStats.objects.select_for_update().get_or_create(user=user)
+        seen = set(
+            TestSession.objects.filter(user=user, client_id__in=[item['client_id'] for item in items])
+            .values_list('client_id', flat=True)
+        )
+        sessions = []
+        graded = []
+        for item in sorted(items, key=lambda item: item['created_at']):
+            if item['client_id'] in seen:
+                continue
+            seen.add(item['client_id'])
+            rows, correct, wrong = _grade(bank.answer_key(item['question_ids']), item['question_ids'], item['answers'])
+            if not rows:
+                continue
+            sessions.append(TestSession(
+                user=user,
+                mode=TestSession.MODE_OFFLINE,
+                client_id=item['client_id'],
+                total_questions=len(rows),
+                question_ids=[row.question_id for row in rows],
+                correct_answers=correct,
+                wrong_answers=wrong,
+                time_spent=item['time_spent'],
+                completed=True,
+            ))
+            graded.append((item['created_at'], rows))
+        if not sessions:
+            return 0
+        TestSession.objects.bulk_create(sessions)
+        answers = []
+        for session, (created_at, rows) in zip(sessions, graded):
+            # auto_now_add bulk_create da ham joriy vaqtni qo'yadi
+            session.created_at = created_at
+            for row in rows:
+                row.session = session
+            answers.extend(rows)
+        TestSession.objects.bulk_update(sessions, ['created_at'])
+        TestAnswer.objects.bulk_create(answers)
+        for session in sessions:
+            stats.add_session(session)
+        stats.save()
+        _record_question_stats(user, answers)
+    return len(sessions)
@@ -0,0 +1,54 @@
+from io import BytesIO
+from pathlib import PurePosixPath
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, features
+
+
+IMAGE_SIZES = [('thumb', 240), ('medium', 720), ('full', 1600)]
+IMAGE_FORMATS = [
+    ('webp', 'WEBP', {'quality': 80, 'method': 4}),
+    ('jpg', 'JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+]
+DERIVED_DIR = 'questions/derived'
+
+
+def _open_rgb(field_file):
+    with field_file.open('rb') as f:
+        img = Image.open(f)
+        img = ImageOps.exif_transpose(img)
+        img.load()
+    if img.mode in ('RGBA', 'LA', 'P'):
+        img = img.convert('RGBA')
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, mask=img.getchannel('A'))
+        return background
+    return img.convert('RGB')
+
+
+def delete_image_variants(variants):
+    for size in (variants or {}).values():
+        for name in size.get('files', {}).values():
+            default_storage.delete(name)
+
+
+def build_image_variants(question):
+    delete_image_variants(question.image_variants)
+    if not question.image:
+        return {}
+    img = _open_rgb(question.image)
+    stem = PurePosixPath(question.image.name).stem
+    variants = {}
+    for size_name, max_side in IMAGE_SIZES:
+        resized = img.copy()
+        resized.thumbnail((max_side, max_side), Image.LANCZOS)
+        files = {}
+        for ext, fmt, options in IMAGE_FORMATS:
+            if fmt == 'WEBP' and not features.check('webp'):
+                continue
+            buf = BytesIO()
+            resized.save(buf, fmt, **options)
+            name = f'{DERIVED_DIR}/{stem}_{size_name}.{ext}'
+            files[ext] = default_storage.save(name, ContentFile(buf.getvalue()))
+        variants[size_name] = {'width': resized.width, 'height': resized.height, 'files': files}
+    return variants
@@ -0,0 +1,109 @@
+import json
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from core import benchmark
+
+
+BENCH_CACHES = {
+    alias: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': f'benchmark-{alias}'}
+    for alias in settings.CACHES
+}
+
+
+class Command(BaseCommand):
+    help = ("Vaqtinchalik test bazasida barcha sahifalarning SQL so'rovlari soni va vaqtini o'lchash, "
+            "imtihon oqimini parallel yuklash; so'rovlar limiti oshsa xato bilan tugaydi")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--questions', type=int, default=1000)
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--sessions', type=int, default=500)
+        parser.add_argument('--test-size', type=int, default=20, help="Bitta testdagi savollar soni")
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--concurrency', type=int, default=4, help="Yuklama testidagi oqimlar (0 - o'tkazib yuborish)")
+        parser.add_argument('--iterations', type=int, default=10, help="Har bir oqimdagi imtihonlar soni")
+        parser.add_argument('--json', dest='json_path', help="Natijalarni JSON faylga yozish")
+        parser.add_argument('--keepdb', action='store_true', help="Test bazasini o'chirmaslik")
+        parser.add_argument('--no-budgets', action='store_true', help="So'rovlar limitini tekshirmaslik")
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        if connection.vendor == 'sqlite':
+            # xotiradagi SQLite jadval darajasida qulflanadi, yuklama testi uchun fayl kerak
+            connection.settings_dict['TEST']['NAME'] = str(settings.BASE_DIR / '.benchmark.sqlite3')
+            # o'qishdan yozishga o'tishda "database is locked" bo'lmasligi uchun
+            connection.settings_dict['OPTIONS'].update({'transaction_mode': 'IMMEDIATE', 'timeout': 30})
+        try:
+            with override_settings(CACHES=BENCH_CACHES, ALLOWED_HOSTS=['*']):
+                connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+                try:
+                    report = self.run(options)
+                finally:
+                    connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+        finally:
+            teardown_test_environment()
+
+        if options['json_path']:
+            with open(options['json_path'], 'w') as f:
+                json.dump(report, f, indent=2)
+        problems = []
+        if report['uncovered']:
+            problems.append(f"O'lchanmagan sahifalar: {', '.join(report['uncovered'])}")
+        if not options['no_budgets'] and report['violations']:
+            problems.extend(
+                f"{name}: {queries} ta so'rov (limit {budget})" for name, queries, budget in report['violations']
+            )
+        if problems:
+            raise CommandError('\n'.join(problems))
+        self.stdout.write(self.style.SUCCESS("Barcha so'rovlar limit ichida"))
+
+    def run(self, options):
+        self.stdout.write(f"Ma'lumotlar yaratilmoqda ({connection.vendor})...")
+        student_ids = benchmark.seed(options['questions'], options['users'], options['sessions'], options['test_size'])
+        benchmark.rebuild_stats()
+        students = list(User.objects.filter(id__in=student_ids).order_by('id'))
+        admin = User.objects.get(username='bench_admin')
+
+        runner = benchmark.Runner(students[0], admin)
+        for i in range(options['repeat']):
+            runner.exam_flow(options['test_size'])
+            runner.pages(i)
+
+        self.stdout.write(f"{'sahifa':<28} {'so`rov':>7} {'limit':>6} {'median ms':>10} {'p95 ms':>8}")
+        for name, result in runner.results.items():
+            budget = benchmark.QUERY_BUDGETS.get(name)
+            line = f"{name:<28} {result.max_queries:>7} {budget if budget is not None else '-':>6} {result.median_ms:>10.1f} {result.p95_ms:>8.1f}"
+            if budget is None or result.max_queries > budget:
+                line = self.style.ERROR(line)
+            self.stdout.write(line)
+
+        load = None
+        if options['concurrency'] > 0:
+            load = benchmark.load_test(students, options['concurrency'], options['iterations'], options['test_size'])
+            self.stdout.write(
+                f"Yuklama: {load['flows']} ta imtihon, {options['concurrency']} oqim, "
+                f"{load['flows_per_s']:.1f} imtihon/s, p50 {load['p50_ms'] or 0:.0f} ms, "
+                f"p95 {load['p95_ms'] or 0:.0f} ms, xatolar: {len(load['errors'])}"
+            )
+            for error in load['errors'][:5]:
+                self.stderr.write(error)
+
+        return {
+            'vendor': connection.vendor,
+            'views': {
+                name: {
+                    'queries': result.max_queries,
+                    'budget': benchmark.QUERY_BUDGETS.get(name),
+                    'median_ms': round(result.median_ms, 2),
+                    'p95_ms': round(result.p95_ms, 2),
+                }
+                for name, result in runner.results.items()
+            },
+            'load': load,
+            'uncovered': benchmark.uncovered_routes(runner.results),
+            'violations': benchmark.budget_violations(runner.results),
+        }
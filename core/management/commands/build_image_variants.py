@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from core.bank import bump_version
+from core.images import build_image_variants
+from core.models import Question
+
+
+class Command(BaseCommand):
+    help = "Savol rasmlari uchun thumbnail/medium/full (WebP va JPEG) variantlarini yaratish"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help="Mavjud variantlarni ham qayta yaratish")
+
+    def handle(self, *args, **options):
+        questions = Question.objects.exclude(image='').exclude(image__isnull=True)
+        if not options['force']:
+            questions = questions.filter(image_variants={})
+        done = 0
+        failed = 0
+        for q in questions.only('id', 'image', 'image_variants').iterator():
+            try:
+                variants = build_image_variants(q)
+            except OSError as e:
+                failed += 1
+                self.stderr.write(f"Savol id={q.id}: {e}")
+                # eski variant fayllari allaqachon o'chirilgan: asl rasm ko'rsatilsin
+                Question.objects.filter(id=q.id).update(image_variants={}, updated_at=timezone.now())
+                continue
+            Question.objects.filter(id=q.id).update(image_variants=variants, updated_at=timezone.now())
+            done += 1
+            if done % 50 == 0:
+                self.stdout.write(f"{done} ta rasm tayyor...")
+        if done or failed:
+            bump_version()
+        self.stdout.write(self.style.SUCCESS(f"Tayyor: {done} ta rasm, xato: {failed}"))
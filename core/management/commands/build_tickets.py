@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from core.bank import get_bank
+from core.tickets import TICKET_SIZE, warm_tickets
+
+
+class Command(BaseCommand):
+    help = "Imtihon biletlarini savollar bankidan qayta yaratish va tayyor JSON ni keshga yozish"
+
+    def handle(self, *args, **options):
+        count = warm_tickets(get_bank())
+        self.stdout.write(self.style.SUCCESS(f"Tayyor: {count} ta bilet ({TICKET_SIZE} savoldan)"))
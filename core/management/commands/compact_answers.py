@@ -0,0 +1,46 @@
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from core.archive import compact_sessions, compactable_session_ids
+from core.models import TestSession
+
+
+class Command(BaseCommand):
+    help = "Eski testlarning javoblarini TestSession.answers_packed ga yig'ib, TestAnswer qatorlarini o'chirish"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.ANSWER_RETENTION_DAYS,
+                            help="Shundan eski testlar arxivlanadi (standart: ANSWER_RETENTION_DAYS)")
+        parser.add_argument('--batch-size', type=int, default=500, help="Bitta tranzaksiyadagi testlar soni")
+        parser.add_argument('--limit', type=int, default=0, help="Bir ishga tushirishda ko'pi bilan shuncha test (0 - cheklovsiz)")
+        parser.add_argument('--pause', type=float, default=0.0, help="Partiyalar orasida kutish (soniya), bazani yuklamaslik uchun")
+        parser.add_argument('--dry-run', action='store_true', help="Faqat nechta test arxivlanishini ko'rsatish")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        if options['dry_run']:
+            pending = TestSession.objects.filter(completed=True, answers_packed__isnull=True, created_at__lt=cutoff).count()
+            self.stdout.write(f"{cutoff:%Y-%m-%d} dan eski arxivlanmagan testlar: {pending}")
+            return
+        batch_size = options['batch_size']
+        limit = options['limit']
+        after = 0
+        sessions = 0
+        deleted = 0
+        while not limit or sessions < limit:
+            size = min(batch_size, limit - sessions) if limit else batch_size
+            ids = compactable_session_ids(cutoff, after, size)
+            if not ids:
+                break
+            packed, removed = compact_sessions(ids)
+            after = ids[-1]
+            sessions += packed
+            deleted += removed
+            self.stdout.write(f"{sessions} ta test arxivlandi, {deleted} ta javob qatori o'chirildi...")
+            if options['pause']:
+                time.sleep(options['pause'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Tayyor: {sessions} ta test arxivlandi, {deleted} ta TestAnswer qatori o'chirildi"
+        ))
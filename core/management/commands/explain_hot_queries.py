@@ -0,0 +1,75 @@
+import re
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from core.models import Bookmark, TestAnswer, TestSession
+from core.views import RECENT_SESSION_FIELDS, _user_statistics
+
+
+# Katta bo'lib o'sadigan jadvallar: ularda to'liq skanerlash bo'lmasligi kerak
+BIG_TABLES = ('core_testanswer', 'core_testsession', 'core_bookmark')
+
+
+def hot_queries(user_id, session_id):
+    return [
+        ('statistics: oxirgi testlar',
+         TestSession.objects.filter(user_id=user_id, completed=True).only(*RECENT_SESSION_FIELDS)[:10]),
+        ('admin: oxirgi testlar',
+         TestSession.objects.filter(completed=True).select_related('user')
+         .only('created_at', 'total_questions', 'correct_answers', 'user__username')[:5]),
+        ('admin: yakunlangan testlar soni',
+         TestSession.objects.filter(completed=True).values('pk')),
+        ('admin statistikasi', _user_statistics('-avg')[:50]),
+        ('test natijasi', TestAnswer.objects.filter(session_id=session_id).select_related('question')),
+        ('saqlanganlar', Bookmark.objects.filter(user_id=user_id).order_by('id').values_list('question_id', flat=True)),
+        ('saqlanganlar soni', Bookmark.objects.filter(user_id=user_id).values('pk')),
+    ]
+
+
+def full_scans(plan):
+    """Katta jadvallarni to'liq o'qiydigan qadamlar (Postgres va SQLite rejalari uchun)."""
+    found = []
+    for table in BIG_TABLES:
+        if connection.vendor == 'postgresql':
+            pattern = rf'Seq Scan on {table}\b'
+        else:
+            pattern = rf'SCAN {table}\b(?! USING)'
+        if re.search(pattern, plan):
+            found.append(table)
+    return found
+
+
+class Command(BaseCommand):
+    help = "Eng ko'p ishlatiladigan so'rovlarning EXPLAIN rejasini chiqarish va to'liq skanerlashni aniqlash"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--analyze', action='store_true', help="Postgres: EXPLAIN (ANALYZE, BUFFERS)")
+        parser.add_argument('--no-seqscan', action='store_true',
+                            help="Postgres: enable_seqscan=off - kichik jadvallarda ham indeks ishlatilishini tekshirish")
+        parser.add_argument('--strict', action='store_true', help="To'liq skanerlash topilsa xato bilan tugash")
+        parser.add_argument('--user', type=int, help="Tekshiriladigan foydalanuvchi id")
+
+    def handle(self, *args, **options):
+        user_id = options['user'] or User.objects.filter(is_staff=False).values_list('id', flat=True).first() or 0
+        session_id = TestSession.objects.filter(user_id=user_id, completed=True).values_list('id', flat=True).first() or 0
+        explain_options = {}
+        if connection.vendor == 'postgresql' and options['analyze']:
+            explain_options = {'analyze': True, 'buffers': True}
+        problems = []
+        with transaction.atomic():
+            if connection.vendor == 'postgresql' and options['no_seqscan']:
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+            for name, queryset in hot_queries(user_id, session_id):
+                plan = queryset.explain(**explain_options)
+                scans = full_scans(plan)
+                self.stdout.write(self.style.MIGRATE_HEADING(f"== {name}"))
+                self.stdout.write(plan)
+                if scans:
+                    problems.append(f"{name}: {', '.join(scans)}")
+                    self.stdout.write(self.style.WARNING(f"To'liq skanerlash: {', '.join(scans)}"))
+                self.stdout.write('')
+        if problems and options['strict']:
+            raise CommandError("To'liq skanerlash topildi:\n" + '\n'.join(problems))
+        if not problems:
+            self.stdout.write(self.style.SUCCESS("Barcha so'rovlar indeks orqali bajariladi"))
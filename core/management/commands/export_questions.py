@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from core.bulk import export_csv, export_zip
+
+
+class Command(BaseCommand):
+    help = "Savollar bazasini ZIP (questions.jsonl + rasmlar) yoki CSV ko'rinishida eksport qilish"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['zip', 'csv'], default='zip')
+
+    def handle(self, *args, **options):
+        if options['format'] == 'csv':
+            with open(options['path'], 'w', encoding='utf-8', newline='') as f:
+                f.writelines(export_csv())
+        else:
+            with open(options['path'], 'wb') as f:
+                for chunk in export_zip():
+                    f.write(chunk)
+        self.stdout.write(self.style.SUCCESS(f"Eksport qilindi: {options['path']}"))
@@ -0,0 +1,41 @@
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+from core.bulk import BATCH_SIZE, NUMBER_CONFLICT_MESSAGE, BulkImportError, import_questions
+
+
+class Command(BaseCommand):
+    help = "Savollarni ZIP (JSON/CSV + rasmlar), CSV yoki JSON fayldan ommaviy yuklash"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--update', action='store_true', help="Mavjud raqamli savollarni yangilash")
+        parser.add_argument('--skip-variants', action='store_true', help="Rasm o'lchamlarini keyin build_image_variants bilan yaratish")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def progress(self, stage, done, total):
+        if done == total or done % 100 == 0:
+            label = 'savol' if stage == 'rows' else 'rasm'
+            self.stdout.write(f"{done}/{total} {label}...")
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        try:
+            with path.open('rb') as f:
+                report = import_questions(
+                    f, path.name,
+                    update=options['update'],
+                    build_variants=not options['skip_variants'],
+                    batch_size=options['batch_size'],
+                    progress=self.progress,
+                    base_dir=path.parent,
+                )
+        except (OSError, BulkImportError) as e:
+            raise CommandError(str(e))
+        except IntegrityError:
+            raise CommandError(NUMBER_CONFLICT_MESSAGE)
+        for line, message in report.errors:
+            self.stderr.write(f"{line}-qator: {message}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Tayyor: {report.created} ta qo'shildi, {report.updated} ta yangilandi, xato: {len(report.errors)}"
+        ))
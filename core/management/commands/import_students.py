@@ -0,0 +1,43 @@
+import csv
+import sys
+from collections import Counter
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+from core.bulk import BulkImportError
+from core.students import CHUNK_SIZE, REPORT_FIELDS, STATUS_CREATED, provision_students, read_students
+
+
+class Command(BaseCommand):
+    help = "Talabalarni CSV (username[,password]) fayldan ommaviy qo'shish; login/parollar CSV ga yoziladi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('-o', '--output', default='-', help="Login/parollar fayli (standart: stdout)")
+        parser.add_argument('--workers', type=int, default=0, help="Parol hashlash jarayonlari (0 - PASSWORD_HASH_WORKERS)")
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        try:
+            with path.open('rb') as f:
+                rows = read_students(f)
+        except (OSError, BulkImportError) as e:
+            raise CommandError(str(e))
+        output = options['output']
+        out = sys.stdout if output == '-' else open(output, 'w', encoding='utf-8', newline='')
+        counts = Counter()
+        try:
+            writer = csv.writer(out)
+            writer.writerow(REPORT_FIELDS)
+            for row in provision_students(rows, workers=options['workers'], chunk_size=options['chunk_size']):
+                writer.writerow(row)
+                out.flush()
+                counts[row[3] == STATUS_CREATED] += 1
+                if row[3] != STATUS_CREATED:
+                    self.stderr.write(f"{row[0]}-qator: {row[3]}")
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        self.stderr.write(self.style.SUCCESS(
+            f"Tayyor: {counts[True]} ta qo'shildi, o'tkazib yuborildi: {counts[False]}"
+        ))
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+from core import partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "PostgreSQL: TestAnswer jadvalini oylar bo'yicha bo'laklash. Birinchi ishga tushirish jadvalni "
+        "bo'laklanganga aylantiradi, keyingilari (har oy boshida, cron) joriy oyni yopadi"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--execute', action='store_true', help="SQL ni bajarish (aks holda faqat chiqariladi)")
+        parser.add_argument('--truncate-empty', action='store_true',
+                            help="compact_answers bo'shatgan eski bo'laklarni TRUNCATE qilish")
+        parser.add_argument('--list', action='store_true', help="Mavjud bo'laklarni ko'rsatish")
+
+    def handle(self, *args, **options):
+        try:
+            if options['list']:
+                self.show()
+                return
+            if options['execute']:
+                action, statements = partitions.apply()
+            else:
+                action, statements = partitions.plan()
+            if options['truncate_empty'] and options['execute']:
+                for name in partitions.truncate_empty_partitions():
+                    self.stdout.write(f"TRUNCATE {name}")
+        except partitions.PartitionError as e:
+            raise CommandError(str(e))
+        if action == 'noop':
+            self.stdout.write("Joriy bo'lak bo'sh, yopiladigan narsa yo'q")
+            return
+        for sql in statements:
+            self.stdout.write(f'{sql};')
+        if options['execute']:
+            self.stdout.write(self.style.SUCCESS(f"Bajarildi: {action}"))
+        else:
+            self.stdout.write(self.style.WARNING(f"{action}: bajarish uchun --execute qo'shing"))
+
+    def show(self):
+        if not partitions.is_partitioned():
+            self.stdout.write(f"{partitions.TABLE} bo'laklanmagan")
+            return
+        for name, lower, upper in partitions.partitions():
+            lower = 'MINVALUE' if lower is None else lower
+            upper = 'MAXVALUE' if upper is None else upper
+            self.stdout.write(f"{name}: session_id [{lower}, {upper})")
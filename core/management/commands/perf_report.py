@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from core import perf
+
+
+class Command(BaseCommand):
+    help = "Eng ko'p vaqt olayotgan sahifalar va oxirgi sekin so'rovlar (PerformanceMiddleware ma'lumotlari)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=15)
+
+    def handle(self, *args, **options):
+        report = perf.summary()
+        if not report['views']:
+            self.stdout.write("Ma'lumot yo'q")
+            return
+        self.stdout.write(f"{'sahifa':<28} {'soni':>7} {'o`rtacha':>9} {'p95':>6} {'maks':>7} {'sql':>5} {'sql ms':>7}")
+        for v in report['views'][:options['limit']]:
+            p95 = v['p95_ms'] or '>5000'
+            self.stdout.write(
+                f"{v['view']:<28} {v['count']:>7} {v['avg_ms']:>9.1f} {p95:>6} {v['max_ms']:>7.0f} "
+                f"{v['avg_queries']:>5.1f} {v['avg_query_ms']:>7.1f}"
+            )
+        for s in report['slow'][:options['limit']]:
+            self.stdout.write(f"SEKIN {s['at']:%d.%m %H:%M:%S} {s['path']} {s['ms']:.0f} ms, {s['queries']} SQL")
@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q
+from core.archive import iter_archived_answers
+from core.models import Question, QuestionStat, TestAnswer, UserQuestionStat
+
+
+class Command(BaseCommand):
+    help = "Zaif savollar rejimi uchun savol statistikasini (UserQuestionStat, QuestionStat) test tarixidan qayta hisoblash"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        # compact_answers arxivlagan testlar: [attempts, wrong] (user, savol) va savol bo'yicha.
+        # Paketda o'chirilgan savollar ham qoladi, ular tashlab ketiladi.
+        question_ids = set(Question.objects.values_list('id', flat=True))
+        archived = {}
+        archived_questions = {}
+        for user_id, qid, _, is_correct in iter_archived_answers():
+            if qid not in question_ids:
+                continue
+            for counts in (archived.setdefault((user_id, qid), [0, 0]), archived_questions.setdefault(qid, [0, 0])):
+                counts[0] += 1
+                counts[1] += not is_correct
+        answers = TestAnswer.objects.filter(session__completed=True)
+        wrong = Count('id', filter=Q(is_correct=False))
+        with transaction.atomic():
+            UserQuestionStat.objects.all().delete()
+            QuestionStat.objects.all().delete()
+            rows = []
+            per_user = (
+                answers.values('session__user_id', 'question_id')
+                .annotate(attempts=Count('id'), wrong=wrong)
+                .order_by()
+            )
+            for row in per_user.iterator(chunk_size=batch_size):
+                extra = archived.pop((row['session__user_id'], row['question_id']), (0, 0))
+                rows.append(UserQuestionStat(
+                    user_id=row['session__user_id'],
+                    question_id=row['question_id'],
+                    attempts=row['attempts'] + extra[0],
+                    wrong=row['wrong'] + extra[1],
+                ))
+                if len(rows) >= batch_size:
+                    UserQuestionStat.objects.bulk_create(rows)
+                    rows = []
+            UserQuestionStat.objects.bulk_create(rows)
+            UserQuestionStat.objects.bulk_create([
+                UserQuestionStat(user_id=user_id, question_id=qid, attempts=attempts, wrong=wrong_count)
+                for (user_id, qid), (attempts, wrong_count) in archived.items()
+            ], batch_size=batch_size)
+            per_question = answers.values('question_id').annotate(attempts=Count('id'), wrong=wrong).order_by()
+            totals = {row['question_id']: [row['attempts'], row['wrong']] for row in per_question}
+            for qid, (attempts, wrong_count) in archived_questions.items():
+                counts = totals.setdefault(qid, [0, 0])
+                counts[0] += attempts
+                counts[1] += wrong_count
+            QuestionStat.objects.bulk_create([
+                QuestionStat(question_id=qid, attempts=attempts, wrong=wrong_count)
+                for qid, (attempts, wrong_count) in totals.items()
+            ], batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(
+            f"Savol statistikasi qayta hisoblandi: {UserQuestionStat.objects.count()} ta yozuv"
+        ))
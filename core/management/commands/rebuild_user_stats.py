@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from core.models import TestSession, UserStats
+
+
+class Command(BaseCommand):
+    help = "Foydalanuvchi statistikasini (UserStats) test tarixidan qayta hisoblash"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        sessions = (
+            TestSession.objects.filter(completed=True)
+            .order_by('user_id', 'created_at')
+            .only('user_id', 'total_questions', 'correct_answers')
+        )
+        rows = []
+        current = None
+        with transaction.atomic():
+            UserStats.objects.all().delete()
+            for session in sessions.iterator(chunk_size=2000):
+                if current is None or current.user_id != session.user_id:
+                    current = UserStats(user_id=session.user_id)
+                    rows.append(current)
+                current.add_session(session)
+                if len(rows) > batch_size:
+                    UserStats.objects.bulk_create(rows[:-1])
+                    rows = rows[-1:]
+            UserStats.objects.bulk_create(rows)
+        self.stdout.write(self.style.SUCCESS(f"Statistika qayta hisoblandi: {UserStats.objects.count()} foydalanuvchi"))
@@ -0,0 +1,85 @@
+from functools import partial
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.utils.functional import SimpleLazyObject
+from . import perf
+from . import user_cache
+
+
+class PerformanceMiddleware:
+    """Har bir so'rov uchun vaqt, SQL so'rovlar soni/vaqti va shablon vaqtini yozadi."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def _skip(self, request):
+        return not settings.PERF_ENABLED or request.path.startswith((settings.STATIC_URL, settings.MEDIA_URL))
+
+    def _finish(self, request, response, metrics):
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else 'unresolved'
+        total_ms, query_ms, template_ms = perf.recorder.add(view, request.path, response.status_code, metrics)
+        if settings.DEBUG or self._is_staff(request):
+            response['Server-Timing'] = (
+                f'app;dur={total_ms:.1f}, db;dur={query_ms:.1f};desc="{metrics.queries} queries", tpl;dur={template_ms:.1f}'
+            )
+        return response
+
+    @staticmethod
+    def _is_staff(request):
+        # Foydalanuvchi bu yerda yuklanmaydi (async so'rovda sinxron baza): faqat view allaqachon olgani
+        user = getattr(request, '_cached_user', None) or getattr(request, '_acached_user', None)
+        return user is not None and user.is_staff
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if self._skip(request):
+            return self.get_response(request)
+        metrics, token = perf.start_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            perf.end_request(token)
+        return self._finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        if self._skip(request):
+            return await self.get_response(request)
+        metrics, token = perf.start_request()
+        try:
+            response = await self.get_response(request)
+        finally:
+            perf.end_request(token)
+        return self._finish(request, response, metrics)
+
+
+def _get_user(request):
+    if not hasattr(request, '_cached_user'):
+        request._cached_user = user_cache.get_user(request)
+    return request._cached_user
+
+
+async def _auser(request):
+    if not hasattr(request, '_acached_user'):
+        request._acached_user = await user_cache.aget_user(request)
+    return request._acached_user
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """request.user ni auth_user jadvalidan emas, keshdan oladi (core.user_cache).
+
+    Kesh User saqlanganda/o'chirilganda signal orqali tozalanadi.
+    """
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: _get_user(request))
+        request.auser = partial(_auser, request)
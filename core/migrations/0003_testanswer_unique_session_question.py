@@ -0,0 +1,32 @@
+# Generated by Django 5.2.11 on 2026-10-18 13:19
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def remove_duplicate_answers(apps, schema_editor):
+    TestAnswer = apps.get_model('core', 'TestAnswer')
+    duplicates = (
+        TestAnswer.objects.values('session_id', 'question_id')
+        .annotate(first_id=Min('id'), n=Count('id'))
+        .filter(n__gt=1)
+    )
+    for row in duplicates:
+        TestAnswer.objects.filter(
+            session_id=row['session_id'], question_id=row['question_id'],
+        ).exclude(id=row['first_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_question_variants_json_alter_question_correct_answer_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_answers, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='testanswer',
+            constraint=models.UniqueConstraint(fields=('session', 'question'), name='unique_session_question'),
+        ),
+    ]
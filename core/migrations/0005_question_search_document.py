@@ -0,0 +1,60 @@
+# Generated by Django 5.2.11 on 2026-10-18 13:21
+
+import json
+
+from django.db import migrations, models
+
+
+def _variant_texts(question):
+    try:
+        data = json.loads(question.variants_json)
+    except (json.JSONDecodeError, TypeError):
+        data = None
+    if data:
+        return [v['text'] for v in data]
+    return [t for t in (question.variant_a, question.variant_b, question.variant_c, question.variant_d) if t]
+
+
+def fill_search_document(apps, schema_editor):
+    Question = apps.get_model('core', 'Question')
+    for q in Question.objects.all().iterator():
+        q.search_document = '\n'.join([str(q.number), q.text] + _variant_texts(q))
+        q.save(update_fields=['search_document'])
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS core_question_search_trgm '
+        'ON core_question USING gin (search_document gin_trgm_ops)'
+    )
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS core_question_search_fts '
+        "ON core_question USING gin (to_tsvector('simple'::regconfig, COALESCE(search_document, '')))"
+    )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS core_question_search_trgm')
+    schema_editor.execute('DROP INDEX IF EXISTS core_question_search_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_userstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(fill_search_document, migrations.RunPython.noop),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.11 on 2026-10-18 13:22
+
+import json
+
+from django.db import migrations, models
+
+
+LEGACY_FIELDS = [('variant_a', 'A'), ('variant_b', 'B'), ('variant_c', 'C'), ('variant_d', 'D')]
+
+
+def fold_variants(apps, schema_editor):
+    Question = apps.get_model('core', 'Question')
+    for q in Question.objects.all().iterator():
+        try:
+            data = json.loads(q.variants_json)
+        except (json.JSONDecodeError, TypeError):
+            data = None
+        if not data:
+            data = [{'letter': letter, 'text': getattr(q, field)} for field, letter in LEGACY_FIELDS if getattr(q, field)]
+        q.variants = data
+        q.save(update_fields=['variants'])
+
+
+def unfold_variants(apps, schema_editor):
+    Question = apps.get_model('core', 'Question')
+    for q in Question.objects.all().iterator():
+        q.variants_json = json.dumps(q.variants, ensure_ascii=False)
+        q.save(update_fields=['variants_json'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_question_search_document'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='variants',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.RunPython(fold_variants, unfold_variants),
+        migrations.RemoveField(
+            model_name='question',
+            name='variant_a',
+        ),
+        migrations.RemoveField(
+            model_name='question',
+            name='variant_b',
+        ),
+        migrations.RemoveField(
+            model_name='question',
+            name='variant_c',
+        ),
+        migrations.RemoveField(
+            model_name='question',
+            name='variants_json',
+        ),
+        migrations.RemoveField(
+            model_name='question',
+            name='variant_d',
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.11 on 2026-10-18 13:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_question_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='testsession',
+            name='question_ids',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='testsession',
+            name='time_limit',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
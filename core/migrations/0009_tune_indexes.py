@@ -0,0 +1,34 @@
+# Generated by Django 5.2.11 on 2026-10-18 13:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_testsession_question_ids'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='testsession',
+            index=models.Index(condition=models.Q(('completed', True)), fields=['user', '-created_at'], include=('id', 'total_questions', 'correct_answers', 'wrong_answers', 'time_spent'), name='session_user_done_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='testsession',
+            index=models.Index(condition=models.Q(('completed', True)), fields=['-created_at'], include=('id', 'user', 'total_questions', 'correct_answers'), name='session_done_recent_idx'),
+        ),
+        migrations.AlterField(
+            model_name='bookmark',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='bookmarks', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='testanswer',
+            name='session',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='answers', to='core.testsession'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.11 on 2026-10-18 13:46
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_question_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='testsession',
+            name='answers_packed',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='testsession',
+            index=models.Index(condition=models.Q(('answers_packed__isnull', True), ('completed', True)), fields=['id'], include=('created_at',), name='session_unpacked_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.11 on 2026-10-18 13:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_archive_answers'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExamTicket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField(unique=True)),
+                ('question_ids', models.JSONField(default=list)),
+                ('bank_version', models.CharField(max_length=32)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['number'],
+            },
+        ),
+        migrations.AddField(
+            model_name='testsession',
+            name='ticket_number',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='testsession',
+            name='mode',
+            field=models.CharField(choices=[('random', 'Tasodifiy'), ('weak', 'Zaif savollar'), ('ticket', 'Bilet')], default='random', max_length=10),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.11 on 2026-10-18 13:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_exam_tickets'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='testsession',
+            name='client_id',
+            field=models.UUIDField(blank=True, editable=False, null=True),
+        ),
+        migrations.AlterField(
+            model_name='testsession',
+            name='mode',
+            field=models.CharField(choices=[('random', 'Tasodifiy'), ('weak', 'Zaif savollar'), ('ticket', 'Bilet'), ('offline', 'Oflayn mashq')], default='random', max_length=10),
+        ),
+        migrations.AddConstraint(
+            model_name='testsession',
+            constraint=models.UniqueConstraint(condition=models.Q(('client_id__isnull', False)), fields=('user', 'client_id'), name='unique_session_client_id'),
+        ),
+    ]
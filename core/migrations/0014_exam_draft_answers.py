@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-18 14:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_offline_practice'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='testsession',
+            name='draft_answers',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.11 on 2026-10-18 15:02
+
+from django.db import migrations
+
+
+RECENT_SIZE = 10
+BATCH_SIZE = 2000
+
+
+def _score(session):
+    if session.total_questions == 0:
+        return 0
+    return round((session.correct_answers / session.total_questions) * 100)
+
+
+def backfill_user_stats(apps, schema_editor):
+    """UserStats (0004) test tarixidan: rebuild_user_stats bilan bir xil hisob."""
+    TestSession = apps.get_model('core', 'TestSession')
+    UserStats = apps.get_model('core', 'UserStats')
+    sessions = (
+        TestSession.objects.filter(completed=True)
+        .order_by('user_id', 'created_at')
+        .only('user_id', 'total_questions', 'correct_answers')
+    )
+    UserStats.objects.all().delete()
+    rows = []
+    current = None
+    for session in sessions.iterator(chunk_size=BATCH_SIZE):
+        if current is None or current.user_id != session.user_id:
+            current = UserStats(user_id=session.user_id, recent_scores=[])
+            rows.append(current)
+        score = _score(session)
+        current.test_count += 1
+        current.total_questions += session.total_questions
+        current.total_correct += session.correct_answers
+        current.score_sum += score
+        current.best_score = max(current.best_score, score)
+        current.recent_scores = (current.recent_scores + [score])[-RECENT_SIZE:]
+        if len(rows) > BATCH_SIZE:
+            UserStats.objects.bulk_create(rows[:-1])
+            rows = rows[-1:]
+    UserStats.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_exam_draft_answers'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_user_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.11 on 2026-10-18 15:10
+
+from django.db import migrations
+
+
+# search_document__icontains Postgresda UPPER(search_document::text) LIKE UPPER(...) bo'ladi:
+# 0005 dagi ustun bo'yicha trigram indeks unga ishlatilmaydi, indeks shu ifoda bo'yicha kerak.
+def create_upper_trgm_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS core_question_search_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS core_question_search_upper_trgm '
+        'ON core_question USING gin (UPPER(search_document) gin_trgm_ops)'
+    )
+
+
+def drop_upper_trgm_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS core_question_search_upper_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS core_question_search_trgm '
+        'ON core_question USING gin (search_document gin_trgm_ops)'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_backfill_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_upper_trgm_index, drop_upper_trgm_index),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 5.2.11 on 2026-10-18 15:30
+
+from django.db import migrations
+from django.db.models import Count, Q
+
+
+BATCH_SIZE = 2000
+
+
+def _unpack(question_ids, packed):
+    """core.archive.unpack_answers ning 1-versiya nusxasi: [(question_id, is_correct)].
+
+    Migratsiya ilova kodiga bog'lanmasin: archive.py keyin o'zgarsa ham shu holicha ishlaydi.
+    """
+    packed = bytes(packed)
+    if not packed or packed[0] != 1:
+        raise ValueError(f"Noma'lum paket formati: {packed[:1].hex()}")
+    n = len(question_ids)
+    correct = packed[1:1 + (n + 7) // 8]
+    letters = packed[1 + (n + 7) // 8:]
+    result = []
+    for i, qid in enumerate(question_ids):
+        if (letters[i >> 1] >> ((i & 1) * 4)) & 0xF == 0:
+            continue
+        result.append((qid, bool(correct[i >> 3] & (1 << (i & 7)))))
+    return result
+
+
+def backfill_question_stats(apps, schema_editor):
+    """UserQuestionStat va QuestionStat (0010) test tarixidan: rebuild_question_stats bilan bir xil hisob."""
+    Question = apps.get_model('core', 'Question')
+    QuestionStat = apps.get_model('core', 'QuestionStat')
+    TestAnswer = apps.get_model('core', 'TestAnswer')
+    TestSession = apps.get_model('core', 'TestSession')
+    UserQuestionStat = apps.get_model('core', 'UserQuestionStat')
+
+    question_ids = set(Question.objects.values_list('id', flat=True))
+    per_user = {}
+    per_question = {}
+
+    def add(counts, key, attempts, wrong):
+        total = counts.setdefault(key, [0, 0])
+        total[0] += attempts
+        total[1] += wrong
+
+    answers = TestAnswer.objects.filter(session__completed=True)
+    wrong = Count('id', filter=Q(is_correct=False))
+    for row in answers.values('session__user_id', 'question_id').annotate(attempts=Count('id'), wrong=wrong).order_by():
+        add(per_user, (row['session__user_id'], row['question_id']), row['attempts'], row['wrong'])
+        add(per_question, row['question_id'], row['attempts'], row['wrong'])
+    # compact_answers arxivlagan testlar; paketda o'chirilgan savollar ham qoladi
+    archived = (
+        TestSession.objects.filter(completed=True, answers_packed__isnull=False)
+        .only('user_id', 'question_ids', 'answers_packed')
+    )
+    for session in archived.iterator(chunk_size=BATCH_SIZE):
+        for qid, is_correct in _unpack(session.question_ids, session.answers_packed):
+            if qid in question_ids:
+                add(per_user, (session.user_id, qid), 1, not is_correct)
+                add(per_question, qid, 1, not is_correct)
+
+    UserQuestionStat.objects.all().delete()
+    QuestionStat.objects.all().delete()
+    UserQuestionStat.objects.bulk_create([
+        UserQuestionStat(user_id=user_id, question_id=qid, attempts=attempts, wrong=wrong_count)
+        for (user_id, qid), (attempts, wrong_count) in per_user.items()
+    ], batch_size=BATCH_SIZE)
+    QuestionStat.objects.bulk_create([
+        QuestionStat(question_id=qid, attempts=attempts, wrong=wrong_count)
+        for qid, (attempts, wrong_count) in per_question.items()
+    ], batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_question_search_upper_trgm'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_question_stats, migrations.RunPython.noop),
+    ]
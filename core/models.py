@@ -1,6 +1,6 @@
-import json
 from django.db import models
 from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
 
 
 LETTERS = 'ABCDEFGHIJ'
@@ -10,15 +10,13 @@ class Question(models.Model):
     number = models.PositiveIntegerField(unique=True)
     text = models.TextField()
     image = models.ImageField(upload_to='questions/', blank=True, null=True)
-    variants_json = models.TextField(default='[]')
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
+    variants = models.JSONField(default=list, blank=True)
     correct_answer = models.CharField(max_length=1)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
-    variant_a = models.CharField(max_length=500, blank=True, default='')
-    variant_b = models.CharField(max_length=500, blank=True, default='')
-    variant_c = models.CharField(max_length=500, blank=True, default='')
-    variant_d = models.CharField(max_length=500, blank=True, default='')
+    search_document = models.TextField(blank=True, default='', editable=False)
 
     class Meta:
         ordering = ['number']
@@ -26,32 +24,59 @@ class Question(models.Model):
     def __str__(self):
         return f"Savol #{self.number}"
 
-    @property
-    def variants(self):
-        try:
-            data = json.loads(self.variants_json)
-            if data:
-                return data
-        except (json.JSONDecodeError, TypeError):
-            pass
-        result = []
-        for field, letter in [('variant_a', 'A'), ('variant_b', 'B'), ('variant_c', 'C'), ('variant_d', 'D')]:
-            val = getattr(self, field, '')
-            if val:
-                result.append({'letter': letter, 'text': val})
-        return result
-
-    @variants.setter
-    def variants(self, value):
-        self.variants_json = json.dumps(value, ensure_ascii=False)
+    def save(self, *args, **kwargs):
+        self.search_document = self.build_search_document()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'search_document' not in update_fields:
+            kwargs['update_fields'] = list(update_fields) + ['search_document']
+        super().save(*args, **kwargs)
+
+    def build_search_document(self):
+        parts = [str(self.number or ''), self.text]
+        parts.extend(v['text'] for v in self.variants)
+        return '\n'.join(parts)
 
     @property
     def variant_count(self):
         return len(self.variants)
 
+    def image_srcset(self, ext):
+        parts = []
+        widths = set()
+        for size in self.image_variants.values():
+            name = size['files'].get(ext)
+            if name and size['width'] not in widths:
+                widths.add(size['width'])
+                parts.append(f"{default_storage.url(name)} {size['width']}w")
+        return ', '.join(parts)
+
+    @property
+    def image_srcset_webp(self):
+        return self.image_srcset('webp')
+
+    @property
+    def image_srcset_jpg(self):
+        return self.image_srcset('jpg')
+
+    @property
+    def image_full_url(self):
+        name = self.image_variants.get('full', {}).get('files', {}).get('jpg')
+        if name:
+            return default_storage.url(name)
+        return self.image.url
+
+    @property
+    def image_offline_url(self):
+        # Oflayn keshga telefon ekraniga yetarli o'rta o'lcham olinadi
+        name = self.image_variants.get('medium', {}).get('files', {}).get('jpg')
+        if name:
+            return default_storage.url(name)
+        return self.image.url
+
 
 class Bookmark(models.Model):
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='bookmarks')
+    # (user, question) unique indeksi user bo'yicha qidiruvni ham qoplaydi
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='bookmarks', db_index=False)
     question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name='bookmarks')
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -63,16 +88,68 @@ class Bookmark(models.Model):
 
 
 class TestSession(models.Model):
+    MODE_RANDOM = 'random'
+    MODE_WEAK = 'weak'
+    MODE_TICKET = 'ticket'
+    MODE_OFFLINE = 'offline'
+    MODE_CHOICES = [
+        (MODE_RANDOM, 'Tasodifiy'),
+        (MODE_WEAK, 'Zaif savollar'),
+        (MODE_TICKET, 'Bilet'),
+        (MODE_OFFLINE, 'Oflayn mashq'),
+    ]
+
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='test_sessions')
+    mode = models.CharField(max_length=10, choices=MODE_CHOICES, default=MODE_RANDOM)
+    ticket_number = models.PositiveIntegerField(null=True, blank=True)
+    # Oflayn mashq: brauzer yaratgan id, qayta yuborilganda takror yozilmaydi
+    client_id = models.UUIDField(null=True, blank=True, editable=False)
     total_questions = models.PositiveIntegerField()
+    question_ids = models.JSONField(default=list, blank=True)
+    time_limit = models.PositiveIntegerField(default=0)
     correct_answers = models.PositiveIntegerField(default=0)
     wrong_answers = models.PositiveIntegerField(default=0)
     time_spent = models.PositiveIntegerField(default=0)
     completed = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Yechilayotgan testning saqlangan javoblari (core.exam_state.DatabaseExamStateStore)
+    draft_answers = models.JSONField(null=True, blank=True, editable=False)
+    # Arxivlangan javoblar (core.archive.pack_answers); bo'sh bo'lsa javoblar TestAnswer da
+    answers_packed = models.BinaryField(null=True, blank=True, editable=False)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # statistika sahifasi va admin statistikasi: faqat yakunlangan testlar,
+            # kerakli ustunlar indeksning o'zida (index-only scan)
+            models.Index(
+                fields=['user', '-created_at'],
+                include=['id', 'total_questions', 'correct_answers', 'wrong_answers', 'time_spent'],
+                condition=models.Q(completed=True),
+                name='session_user_done_idx',
+            ),
+            # admin paneldagi "oxirgi testlar" va yakunlangan testlar soni
+            models.Index(
+                fields=['-created_at'],
+                include=['id', 'user', 'total_questions', 'correct_answers'],
+                condition=models.Q(completed=True),
+                name='session_done_recent_idx',
+            ),
+            # compact_answers: hali arxivlanmagan yakunlangan testlar, id bo'yicha
+            models.Index(
+                fields=['id'],
+                include=['created_at'],
+                condition=models.Q(completed=True, answers_packed__isnull=True),
+                name='session_unpacked_idx',
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'client_id'],
+                condition=models.Q(client_id__isnull=False),
+                name='unique_session_client_id',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.created_at.strftime('%Y-%m-%d %H:%M')}"
@@ -83,12 +160,111 @@ class TestSession(models.Model):
             return 0
         return round((self.correct_answers / self.total_questions) * 100)
 
+    @property
+    def is_archived(self):
+        return self.answers_packed is not None
+
+
+class ExamTicket(models.Model):
+    # Savollar banki o'zgarganda core.tickets qayta yaratadi (bank_version bo'yicha)
+    number = models.PositiveIntegerField(unique=True)
+    question_ids = models.JSONField(default=list)
+    bank_version = models.CharField(max_length=32)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['number']
+
+    def __str__(self):
+        return f"Bilet #{self.number}"
+
 
 class TestAnswer(models.Model):
-    session = models.ForeignKey(TestSession, on_delete=models.CASCADE, related_name='answers')
+    # (session, question) unique indeksi session bo'yicha qidiruvni qoplaydi
+    session = models.ForeignKey(TestSession, on_delete=models.CASCADE, related_name='answers', db_index=False)
     question = models.ForeignKey(Question, on_delete=models.CASCADE)
     selected_answer = models.CharField(max_length=1)
     is_correct = models.BooleanField(default=False)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['session', 'question'], name='unique_session_question'),
+        ]
+
     def __str__(self):
         return f"Savol #{self.question.number} - {'correct' if self.is_correct else 'wrong'}"
+
+
+class UserStats(models.Model):
+    RECENT_SIZE = 10
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='stats')
+    test_count = models.PositiveIntegerField(default=0)
+    total_questions = models.PositiveIntegerField(default=0)
+    total_correct = models.PositiveIntegerField(default=0)
+    score_sum = models.PositiveIntegerField(default=0)
+    best_score = models.PositiveIntegerField(default=0)
+    recent_scores = models.JSONField(default=list)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user.username} - {self.test_count} test"
+
+    @classmethod
+    def for_user(cls, user):
+        try:
+            return cls.objects.get(user=user)
+        except cls.DoesNotExist:
+            return cls(user=user)
+
+    def add_session(self, session):
+        score = session.score_percent
+        self.test_count += 1
+        self.total_questions += session.total_questions
+        self.total_correct += session.correct_answers
+        self.score_sum += score
+        self.best_score = max(self.best_score, score)
+        self.recent_scores = (list(self.recent_scores) + [score])[-self.RECENT_SIZE:]
+
+    @property
+    def avg_score(self):
+        if self.test_count == 0:
+            return 0
+        return round(self.score_sum / self.test_count)
+
+    @property
+    def rolling_avg(self):
+        if not self.recent_scores:
+            return 0
+        return round(sum(self.recent_scores) / len(self.recent_scores))
+
+
+class UserQuestionStat(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='question_stats', db_index=False)
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name='user_stats')
+    attempts = models.PositiveIntegerField(default=0)
+    wrong = models.PositiveIntegerField(default=0)
+    last_answered_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'question'], name='unique_user_question_stat'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - Savol #{self.question.number}: {self.wrong}/{self.attempts}"
+
+
+class QuestionStat(models.Model):
+    question = models.OneToOneField(Question, on_delete=models.CASCADE, primary_key=True, related_name='stat')
+    attempts = models.PositiveIntegerField(default=0)
+    wrong = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"Savol #{self.question.number}: {self.wrong}/{self.attempts}"
+
+    @property
+    def error_rate(self):
+        if self.attempts == 0:
+            return 0
+        return round(self.wrong / self.attempts * 100)
@@ -0,0 +1,139 @@
+import json
+import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.utils import timezone
+from .models import TestSession
+
+
+SNAPSHOT_KEY = 'bank_snapshot:{}'
+SNAPSHOT_TIMEOUT = 7 * 24 * 3600
+# Savol qatori massiv ko'rinishida: kalit nomlari har savolda takrorlanmaydi
+SNAPSHOT_FIELDS = ['id', 'number', 'text', 'variants', 'correct', 'image', 'updated']
+MAX_SYNC_SESSIONS = 50
+MAX_SYNC_QUESTIONS = 100
+MAX_TIME_SPENT = 24 * 3600
+# Yakunlanmay tashlab ketilgan test vaqti tugagach nusxani to'sib turmaydi
+EXAM_GRACE = 5 * 60
+DEFAULT_TIME_LIMIT = 600
+
+
+def _stamp(value):
+    return int(value.timestamp() * 1000)
+
+
+def _row(q):
+    return [
+        q.id,
+        q.number,
+        q.text,
+        [[v['letter'], v['text']] for v in q.variants],
+        q.correct_answer,
+        q.image_offline_url if q.image else None,
+        _stamp(q.updated_at),
+    ]
+
+
+def build_snapshot(bank, since=None):
+    """Bank nusxasi. since (ms) berilsa faqat undan keyin o'zgargan savollar.
+
+    'ids' doim to'liq: o'chirilgan savollarni brauzer shu ro'yxatdan topadi.
+    'images' - keshlab qo'yish kerak bo'lgan rasmlar manifesti.
+    """
+    questions = bank.questions
+    if since is not None:
+        questions = [q for q in questions if _stamp(q.updated_at) > since]
+    rows = [_row(q) for q in questions]
+    return {
+        'version': bank.version,
+        'updated': max((_stamp(q.updated_at) for q in bank.questions), default=0),
+        'full': since is None,
+        'fields': SNAPSHOT_FIELDS,
+        'questions': rows,
+        'ids': list(bank.ids),
+        'images': [row[5] for row in rows if row[5]],
+    }
+
+
+def dumps(snapshot):
+    return json.dumps(snapshot, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def get_snapshot(bank):
+    """To'liq nusxaning tayyor JSON baytlari, bank versiyasi bo'yicha keshlanadi."""
+    key = SNAPSHOT_KEY.format(bank.version)
+    body = cache.get(key)
+    if body is None:
+        body = dumps(build_snapshot(bank))
+        cache.set(key, body, SNAPSHOT_TIMEOUT)
+    return body
+
+
+async def aget_snapshot(bank):
+    body = await cache.aget(SNAPSHOT_KEY.format(bank.version))
+    if body is None:
+        body = await sync_to_async(get_snapshot)(bank)
+    return body
+
+
+async def aexam_in_progress(user):
+    """Foydalanuvchining vaqti tugamagan, yakunlanmagan onlayn testi bormi.
+
+    Nusxada to'g'ri javoblar bor: test paytida u berilmaydi.
+    """
+    now = timezone.now()
+    sessions = (
+        TestSession.objects.filter(user=user, completed=False, created_at__gte=now - timedelta(days=1))
+        .exclude(mode=TestSession.MODE_OFFLINE)
+        .values_list('created_at', 'time_limit')
+    )
+    async for created_at, time_limit in sessions:
+        if created_at + timedelta(seconds=(time_limit or DEFAULT_TIME_LIMIT) + EXAM_GRACE) > now:
+            return True
+    return False
+
+
+def parse_sessions(bank, user, sessions):
+    """Brauzer navbatidagi testlarni tekshiradi: (items, rejected).
+
+    Boshqa foydalanuvchi nomidan navbatga qo'yilganlar (umumiy telefon) ikkala
+    ro'yxatga ham kirmaydi - brauzer ularni o'sha foydalanuvchi kirguncha saqlaydi.
+    """
+    items = []
+    rejected = []
+    now = timezone.now()
+    for raw in sessions[:MAX_SYNC_SESSIONS]:
+        if not isinstance(raw, dict):
+            continue
+        try:
+            client_id = uuid.UUID(str(raw.get('client_id')))
+        except ValueError:
+            continue
+        if raw.get('user') != user.id:
+            continue
+        try:
+            started_at = datetime.fromtimestamp(int(raw['started_at']) / 1000, tz=dt_timezone.utc)
+            time_spent = min(max(int(raw.get('time_spent', 0)), 0), MAX_TIME_SPENT)
+            question_ids = [int(qid) for qid in raw['question_ids']]
+            submitted = {int(qid): str(letter or '').upper()[:1] for qid, letter in dict(raw.get('answers') or {}).items()}
+        except (KeyError, TypeError, ValueError, OverflowError, OSError):
+            rejected.append(str(client_id))
+            continue
+        question_ids = [qid for qid in dict.fromkeys(question_ids) if qid in bank.by_id][:MAX_SYNC_QUESTIONS]
+        if not question_ids:
+            rejected.append(str(client_id))
+            continue
+        answers = {}
+        for qid in question_ids:
+            letter = submitted.get(qid)
+            if letter and letter in {v['letter'] for v in bank.by_id[qid].variants}:
+                answers[qid] = letter
+        items.append({
+            'client_id': client_id,
+            'created_at': min(started_at, now),
+            'time_spent': time_spent,
+            'question_ids': question_ids,
+            'answers': answers,
+        })
+    return items, rejected
@@ -0,0 +1,41 @@
+from bisect import bisect_right
+from django.db.models.query import QuerySet
+
+
+PAGE_SIZE = 50
+
+
+def parse_cursor(request, param='after'):
+    try:
+        return max(int(request.GET.get(param) or 0), 0)
+    except ValueError:
+        return 0
+
+
+def keyset_page(items, after, limit=PAGE_SIZE):
+    # items is a queryset or a list already ordered by Question.number
+    if isinstance(items, QuerySet):
+        rows = list(items.filter(number__gt=after).order_by('number')[:limit + 1])
+    else:
+        start = bisect_right(items, after, key=lambda q: q.number)
+        rows = items[start:start + limit + 1]
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, rows[-1].number
+    return rows, None
+
+
+# ranked lists (search results) have no stable key, so they page by position
+def offset_page(items, start, limit=PAGE_SIZE):
+    rows = items[start:start + limit]
+    if start + limit < len(items):
+        return rows, start + limit
+    return rows, None
+
+
+def next_page_url(request, cursor, param='after'):
+    if cursor is None:
+        return None
+    params = request.GET.copy()
+    params[param] = cursor
+    return f'{request.path}?{params.urlencode()}'
@@ -0,0 +1,168 @@
+"""core_testanswer jadvalini Postgres da oylar bo'yicha bo'laklash (ixtiyoriy).
+
+Bo'lak kaliti - session_id: test id lari vaqt bo'yicha o'sib boradi, shuning
+uchun har bir oyning testlari session_id ning uzluksiz oralig'ini egallaydi va
+TestAnswer ga qo'shimcha ustun kerak emas. Oxirgi bo'lak (tail) ochiq:
+FROM (chegara) TO (MAXVALUE). Har oy boshida rollover tail ni yopiq oylik
+bo'lakka aylantiradi va yangi tail ochadi. compact_answers o'chirgan qatorlardan
+bo'shagan eski bo'laklar TRUNCATE bilan diskka qaytariladi (VACUUM FULL siz).
+
+Bo'laklangan jadvalda birlamchi kalit (id, session_id) bo'ladi; Django uchun
+id baribir yagona (sequence dan). TestAnswer ni o'zgartiradigan keyingi
+migratsiyalarni bo'laklangan jadvalda alohida tekshirish kerak.
+"""
+import re
+from django.db import connection, transaction
+from .models import Question, TestAnswer, TestSession
+
+
+TABLE = TestAnswer._meta.db_table
+TAIL = f'{TABLE}_tail'
+LEGACY = f'{TABLE}_legacy'
+SEQUENCE = f'{TABLE}_part_id_seq'
+
+_BOUND_RE = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+
+class PartitionError(Exception):
+    pass
+
+
+def _bound(value):
+    value = value.strip("'")
+    return None if value in ('MINVALUE', 'MAXVALUE') else int(value)
+
+
+def is_partitioned():
+    if connection.vendor != 'postgresql':
+        raise PartitionError("Bo'laklash faqat PostgreSQL da ishlaydi")
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass', [TABLE])
+        return cursor.fetchone() is not None
+
+
+def partitions():
+    """[(nom, quyi chegara, yuqori chegara)], session_id bo'yicha; None - MINVALUE/MAXVALUE."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+            FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = %s::regclass
+            """,
+            [TABLE],
+        )
+        rows = cursor.fetchall()
+    result = []
+    for name, bound in rows:
+        match = _BOUND_RE.search(bound)
+        lower, upper = (_bound(match.group(1)), _bound(match.group(2))) if match else (None, None)
+        result.append((name, lower, upper))
+    result.sort(key=lambda p: (p[1] is not None, p[1] or 0))
+    return result
+
+
+def _next_boundary(table, floor):
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT MAX(session_id) FROM {connection.ops.quote_name(table)}')
+        max_id = cursor.fetchone()[0]
+    return max(floor, (max_id or 0) + 1)
+
+
+def conversion_sql(boundary):
+    """Oddiy jadvalni bo'laklanganga aylantirish: mavjud jadval birinchi bo'lak bo'lib qoladi.
+
+    ATTACH PARTITION eski jadvalni bir marta to'liq o'qiydi (chegara tekshiruvi
+    va (id, session_id) indeksi) - texnik tanaffus paytida bajaring.
+    """
+    q = connection.ops.quote_name
+    return [
+        f'ALTER TABLE {q(TABLE)} RENAME TO {q(LEGACY)}',
+        f'ALTER TABLE {q(LEGACY)} DROP CONSTRAINT {q(TABLE + "_pkey")}',
+        f'ALTER TABLE {q(LEGACY)} ALTER COLUMN id DROP IDENTITY IF EXISTS',
+        f'ALTER TABLE {q(LEGACY)} ALTER COLUMN id DROP DEFAULT',
+        f'ALTER INDEX unique_session_question RENAME TO {q(LEGACY + "_session_question")}',
+        f'CREATE TABLE {q(TABLE)} (LIKE {q(LEGACY)}) PARTITION BY RANGE (session_id)',
+        f'CREATE SEQUENCE {q(SEQUENCE)} OWNED BY {q(TABLE)}.id',
+        f"SELECT setval('{SEQUENCE}', COALESCE((SELECT MAX(id) FROM {q(LEGACY)}), 0) + 1, false)",
+        f"ALTER TABLE {q(TABLE)} ALTER COLUMN id SET DEFAULT nextval('{SEQUENCE}')",
+        f'ALTER TABLE {q(TABLE)} ADD PRIMARY KEY (id, session_id)',
+        f'ALTER TABLE {q(TABLE)} ADD CONSTRAINT unique_session_question UNIQUE (session_id, question_id)',
+        f'CREATE INDEX {q(TABLE + "_question_part_idx")} ON {q(TABLE)} (question_id)',
+        f'ALTER TABLE {q(TABLE)} ADD FOREIGN KEY (session_id) '
+        f'REFERENCES {q(TestSession._meta.db_table)} (id) DEFERRABLE INITIALLY DEFERRED',
+        f'ALTER TABLE {q(TABLE)} ADD FOREIGN KEY (question_id) '
+        f'REFERENCES {q(Question._meta.db_table)} (id) DEFERRABLE INITIALLY DEFERRED',
+        f'ALTER TABLE {q(TABLE)} ATTACH PARTITION {q(LEGACY)} FOR VALUES FROM (MINVALUE) TO ({boundary})',
+        f'CREATE TABLE {q(TAIL)} PARTITION OF {q(TABLE)} FOR VALUES FROM ({boundary}) TO (MAXVALUE)',
+    ]
+
+
+def rollover_sql(name, lower, boundary):
+    """Ochiq tail ni [lower, boundary) oylik bo'lagiga aylantirib, yangi tail ochish.
+
+    CHECK cheklovi ATTACH dagi takroriy tekshiruvni olib tashlaydi; uni qo'shish
+    bir oylik qatorlarni bir marta o'qiydi, shu vaqt ichida yozuvlar kutib turadi.
+    """
+    q = connection.ops.quote_name
+    return [
+        f'ALTER TABLE {q(TABLE)} DETACH PARTITION {q(TAIL)}',
+        f'ALTER TABLE {q(TAIL)} RENAME TO {q(name)}',
+        f'ALTER TABLE {q(name)} ADD CONSTRAINT {q(name + "_bound")} '
+        f'CHECK (session_id >= {lower} AND session_id < {boundary})',
+        f'ALTER TABLE {q(TABLE)} ATTACH PARTITION {q(name)} FOR VALUES FROM ({lower}) TO ({boundary})',
+        f'CREATE TABLE {q(TAIL)} PARTITION OF {q(TABLE)} FOR VALUES FROM ({boundary}) TO (MAXVALUE)',
+    ]
+
+
+def plan():
+    """Keyingi qadam: ('convert', sql), ('rollover', sql) yoki ('noop', [])."""
+    if not is_partitioned():
+        return 'convert', conversion_sql(_next_boundary(TABLE, 1))
+    tail = next((p for p in partitions() if p[0] == TAIL), None)
+    if tail is None:
+        raise PartitionError(f"{TABLE} bo'laklangan, lekin {TAIL} bo'lagi topilmadi")
+    lower = tail[1]
+    boundary = _next_boundary(TAIL, lower)
+    if boundary <= lower:
+        return 'noop', []
+    last = TestSession.objects.filter(id__lt=boundary).order_by('-id').values_list('created_at', flat=True).first()
+    name = f'{TABLE}_p{last:%Y%m}' if last else f'{TABLE}_p{lower}'
+    if any(p[0] == name for p in partitions()):
+        name = f'{name}_{lower}'
+    return 'rollover', rollover_sql(name, lower, boundary)
+
+
+def apply():
+    """plan() ni bitta tranzaksiyada bajaradi; chegara jadval qulflangandan keyin hisoblanadi."""
+    q = connection.ops.quote_name
+    with transaction.atomic():
+        # konvertatsiya jadvalni butunlay almashtiradi; rollover da o'qish davom etadi, yozish kutadi
+        mode = 'SHARE ROW EXCLUSIVE' if is_partitioned() else 'ACCESS EXCLUSIVE'
+        with connection.cursor() as cursor:
+            cursor.execute(f'LOCK TABLE {q(TABLE)} IN {mode} MODE')
+            action, statements = plan()
+            for sql in statements:
+                cursor.execute(sql)
+    return action, statements
+
+
+def truncate_empty_partitions():
+    """compact_answers bo'shatgan yopiq bo'laklarni TRUNCATE qiladi; nomlar ro'yxatini qaytaradi."""
+    q = connection.ops.quote_name
+    done = []
+    for name, _, upper in partitions():
+        if name == TAIL or upper is None:
+            continue
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'LOCK TABLE {q(name)} IN ACCESS EXCLUSIVE MODE')
+            # bo'sh, lekin diskda joy egallab turgan bo'laklar
+            cursor.execute(
+                f'SELECT pg_relation_size(%s::regclass) > 0 AND NOT EXISTS (SELECT 1 FROM {q(name)})',
+                [name],
+            )
+            if not cursor.fetchone()[0]:
+                continue
+            cursor.execute(f'TRUNCATE {q(name)}')
+        done.append(name)
+    return done
@@ -0,0 +1,234 @@
+import os
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from django.conf import settings
+from django.core.cache import caches
+from django.template.backends.django import DjangoTemplates
+
+
+# Kechikish gistogrammasi chegaralari (ms); oxirgi katak - undan kattalari
+LATENCY_BUCKETS = [10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+SEQ_KEY = 'perf:seq'
+SLOT_KEY = 'perf:slot:{}'
+MAX_SLOW_PER_BATCH = 20
+
+_current = ContextVar('perf_metrics', default=None)
+
+
+class RequestMetrics:
+    __slots__ = ('started', 'queries', 'query_time', 'template_time', 'slowest_sql', 'slowest_sql_time')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.query_time = 0.0
+        self.template_time = 0.0
+        self.slowest_sql = ''
+        self.slowest_sql_time = 0.0
+
+
+def start_request():
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+def record_query(execute, sql, params, many, context):
+    """connection.execute_wrapper uchun: so'rovlar soni va vaqtini yig'adi."""
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        metrics.queries += 1
+        metrics.query_time += elapsed
+        if elapsed > metrics.slowest_sql_time:
+            metrics.slowest_sql_time = elapsed
+            metrics.slowest_sql = sql
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    # Har bir yangi ulanishga (shu jumladan sync_to_async oqimlaridagilarga)
+    # wrapper qo'shiladi; so'rov tashqarisida u hech narsa qilmaydi.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class _TimedTemplate:
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        metrics = _current.get()
+        if metrics is None:
+            return self.template.render(context, request)
+        started = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            metrics.template_time += time.perf_counter() - started
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """Shablon render vaqtini joriy so'rov metrikalariga qo'shadigan backend."""
+
+    def from_string(self, template_code):
+        return _TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return _TimedTemplate(super().get_template(template_name))
+
+
+def _bucket(ms):
+    for i, bound in enumerate(LATENCY_BUCKETS):
+        if ms <= bound:
+            return i
+    return len(LATENCY_BUCKETS)
+
+
+def _empty_view():
+    return {
+        'count': 0, 'errors': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+        'queries': 0, 'max_queries': 0, 'query_ms': 0.0, 'template_ms': 0.0,
+        'buckets': [0] * (len(LATENCY_BUCKETS) + 1),
+    }
+
+
+class Recorder:
+    """Worker ichida yig'ib, har PERF_FLUSH_SECONDS da keshdagi halqa buferga yozadi.
+
+    Bufer PERF_RING_SIZE ta slotdan iborat; slot raqami umumiy hisoblagichdan
+    (cache.incr) olinadi, shuning uchun barcha gunicorn workerlari bitta
+    buferga navbat bilan yozadi va eng eski partiyalar ustiga yoziladi.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = {}
+        self.slow = []
+        self.last_flush = time.monotonic()
+
+    @property
+    def cache(self):
+        return caches[settings.PERF_CACHE]
+
+    def add(self, view, path, status, metrics):
+        total_ms = (time.perf_counter() - metrics.started) * 1000
+        query_ms = metrics.query_time * 1000
+        template_ms = metrics.template_time * 1000
+        with self.lock:
+            stats = self.views.setdefault(view, _empty_view())
+            stats['count'] += 1
+            stats['errors'] += status >= 500
+            stats['total_ms'] += total_ms
+            stats['max_ms'] = max(stats['max_ms'], total_ms)
+            stats['queries'] += metrics.queries
+            stats['max_queries'] = max(stats['max_queries'], metrics.queries)
+            stats['query_ms'] += query_ms
+            stats['template_ms'] += template_ms
+            stats['buckets'][_bucket(total_ms)] += 1
+            if total_ms >= settings.PERF_SLOW_MS and len(self.slow) < MAX_SLOW_PER_BATCH:
+                self.slow.append({
+                    'view': view, 'path': path, 'status': status, 'at': time.time(),
+                    'ms': round(total_ms, 1), 'queries': metrics.queries,
+                    'query_ms': round(query_ms, 1), 'template_ms': round(template_ms, 1),
+                    'slowest_sql': metrics.slowest_sql[:500],
+                    'slowest_sql_ms': round(metrics.slowest_sql_time * 1000, 1),
+                })
+            due = time.monotonic() - self.last_flush >= settings.PERF_FLUSH_SECONDS
+        if due:
+            self.flush()
+        return total_ms, query_ms, template_ms
+
+    def flush(self):
+        with self.lock:
+            views, slow = self.views, self.slow
+            self.views, self.slow = {}, []
+            self.last_flush = time.monotonic()
+        if not views:
+            return
+        cache = self.cache
+        cache.add(SEQ_KEY, 0, timeout=None)
+        try:
+            seq = cache.incr(SEQ_KEY)
+        except ValueError:
+            seq = 0
+        batch = {'pid': os.getpid(), 'at': time.time(), 'views': views, 'slow': slow}
+        cache.set(SLOT_KEY.format(seq % settings.PERF_RING_SIZE), batch, timeout=None)
+
+
+recorder = Recorder()
+
+
+def _percentile(buckets, count, fraction):
+    target = count * fraction
+    seen = 0
+    for i, n in enumerate(buckets):
+        seen += n
+        if seen >= target and n:
+            return LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else None
+    return None
+
+
+def summary():
+    """Halqa buferdagi barcha partiyalarni bitta hisobotga birlashtiradi."""
+    recorder.flush()
+    size = settings.PERF_RING_SIZE
+    batches = [b for b in recorder.cache.get_many([SLOT_KEY.format(i) for i in range(size)]).values() if b]
+    views = {}
+    slow = []
+    for batch in batches:
+        for view, stats in batch['views'].items():
+            merged = views.setdefault(view, _empty_view())
+            for key in ('count', 'errors', 'total_ms', 'queries', 'query_ms', 'template_ms'):
+                merged[key] += stats[key]
+            merged['max_ms'] = max(merged['max_ms'], stats['max_ms'])
+            merged['max_queries'] = max(merged['max_queries'], stats['max_queries'])
+            merged['buckets'] = [a + b for a, b in zip(merged['buckets'], stats['buckets'])]
+        slow.extend(batch['slow'])
+    rows = []
+    for view, stats in views.items():
+        count = stats['count']
+        rows.append({
+            'view': view,
+            'count': count,
+            'errors': stats['errors'],
+            'avg_ms': stats['total_ms'] / count,
+            'p50_ms': _percentile(stats['buckets'], count, 0.5),
+            'p95_ms': _percentile(stats['buckets'], count, 0.95),
+            'max_ms': stats['max_ms'],
+            'avg_queries': stats['queries'] / count,
+            'max_queries': stats['max_queries'],
+            'avg_query_ms': stats['query_ms'] / count,
+            'avg_template_ms': stats['template_ms'] / count,
+            'total_ms': stats['total_ms'],
+            'buckets': stats['buckets'],
+        })
+    rows.sort(key=lambda r: -r['total_ms'])
+    slow.sort(key=lambda s: -s['at'])
+    for sample in slow:
+        sample['at'] = datetime.fromtimestamp(sample['at'], tz=timezone.utc)
+    since = min((b['at'] for b in batches), default=None)
+    return {
+        'views': rows,
+        'slow': slow,
+        'since': datetime.fromtimestamp(since, tz=timezone.utc) if since else None,
+        'workers': len({b['pid'] for b in batches}),
+        'buckets': LATENCY_BUCKETS,
+    }
+
+
+def reset():
+    recorder.flush()
+    recorder.cache.delete_many([SLOT_KEY.format(i) for i in range(settings.PERF_RING_SIZE)])
@@ -0,0 +1,63 @@
+import random
+import threading
+import time
+from array import array
+from .models import QuestionStat, UserQuestionStat
+from .sampling import weighted_sample_ids
+
+
+# Umumiy qiyinlik og'irliklari shu muddatda bir marta qayta o'qiladi
+BASE_WEIGHTS_TTL = 300
+# Xato ulushi darajaga ko'tariladi: zaif savollar ko'proq ajralib turadi
+WEAK_POWER = 4
+MIN_WEIGHT = 1e-4
+
+_lock = threading.Lock()
+_base = {'version': None, 'loaded_at': 0.0, 'weights': None}
+
+
+def error_weight(attempts, wrong):
+    # Laplace tekislash: hali ko'rilmagan savol 0.5 atrofida boshlanadi
+    rate = (wrong + 1) / (attempts + 2)
+    return max(rate ** WEAK_POWER, MIN_WEIGHT)
+
+
+def _load_base_weights(bank):
+    positions = bank.positions
+    weights = array('d', [error_weight(0, 0)]) * bank.count
+    for qid, attempts, wrong in QuestionStat.objects.values_list('question_id', 'attempts', 'wrong'):
+        i = positions.get(qid)
+        if i is not None:
+            weights[i] = error_weight(attempts, wrong)
+    return weights
+
+
+def base_weights(bank):
+    """Savollarning umumiy qiyinligi (barcha foydalanuvchilar xatolari), bank tartibida."""
+    now = time.monotonic()
+    if _base['version'] == bank.version and now - _base['loaded_at'] < BASE_WEIGHTS_TTL:
+        return _base['weights']
+    with _lock:
+        if _base['version'] != bank.version or now - _base['loaded_at'] >= BASE_WEIGHTS_TTL:
+            _base['weights'] = _load_base_weights(bank)
+            _base['version'] = bank.version
+            _base['loaded_at'] = now
+        return _base['weights']
+
+
+def weak_question_ids(user, bank, k, rng=random):
+    """Foydalanuvchi ko'p xato qiladigan savollarni ustun qo'yib k ta savol tanlaydi.
+
+    Ko'rilmagan savollar umumiy qiyinlik bo'yicha, ko'rilganlari shaxsiy
+    xato ulushi bo'yicha tortiladi. TestAnswer tarixi o'qilmaydi.
+    """
+    weights = array('d', base_weights(bank))
+    positions = bank.positions
+    stats = UserQuestionStat.objects.filter(user=user).values_list('question_id', 'attempts', 'wrong')
+    for qid, attempts, wrong in stats:
+        i = positions.get(qid)
+        if i is not None:
+            weights[i] = error_weight(attempts, wrong)
+    chosen = weighted_sample_ids(bank.ids, weights, k, rng)
+    rng.shuffle(chosen)
+    return chosen
@@ -0,0 +1,100 @@
+import random
+from array import array
+
+
+def _draw(pool, n, exclude, rng):
+    if n <= 0 or not pool:
+        return []
+    if (n + len(exclude)) * 2 > len(pool):
+        candidates = [qid for qid in pool if qid not in exclude]
+        return rng.sample(candidates, min(n, len(candidates)))
+    drawn = []
+    size = len(pool)
+    while len(drawn) < n:
+        qid = pool[rng.randrange(size)]
+        if qid not in exclude:
+            exclude.add(qid)
+            drawn.append(qid)
+    return drawn
+
+
+# quotas: (pool, n) pairs - at least n ids are drawn from each pool
+# (e.g. questions with an image) before the rest is filled from ids.
+def sample_ids(ids, k, quotas=(), rng=random):
+    k = min(k, len(ids))
+    chosen = []
+    seen = set()
+    for pool, n in quotas:
+        picked = _draw(pool, min(n, k - len(chosen)), seen, rng)
+        seen.update(picked)
+        chosen.extend(picked)
+    rest = _draw(ids, k - len(chosen), seen, rng)
+    chosen.extend(rest)
+    rng.shuffle(chosen)
+    return chosen
+
+
+class FenwickTree:
+    """Og'irliklar prefiks yig'indisi: yangilash va qidirish O(log n)."""
+
+    def __init__(self, weights):
+        n = len(weights)
+        tree = array('d', [0.0]) + array('d', weights)
+        for i in range(1, n + 1):
+            parent = i + (i & -i)
+            if parent <= n:
+                tree[parent] += tree[i]
+        self.n = n
+        self.tree = tree
+        self.weights = array('d', weights)
+        self.top = 1 << (n.bit_length() - 1) if n else 0
+
+    @property
+    def total(self):
+        total = 0.0
+        i = self.n
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def add(self, index, delta):
+        self.weights[index] += delta
+        i = index + 1
+        while i <= self.n:
+            self.tree[i] += delta
+            i += i & -i
+
+    def find(self, x):
+        """Prefiks yig'indisi x dan katta bo'ladigan birinchi indeks."""
+        pos = 0
+        step = self.top
+        while step:
+            nxt = pos + step
+            if nxt <= self.n and self.tree[nxt] <= x:
+                pos = nxt
+                x -= self.tree[nxt]
+            step >>= 1
+        return min(pos, self.n - 1)
+
+
+def weighted_sample_ids(ids, weights, k, rng=random):
+    """Og'irlikka mutanosib, takrorlanmaydigan k ta id: O(n) qurish + O(k log n) tanlash."""
+    k = min(k, len(ids))
+    tree = FenwickTree(weights)
+    chosen = []
+    total = tree.total
+    while len(chosen) < k and total > 1e-12:
+        i = tree.find(rng.random() * total)
+        weight = tree.weights[i]
+        if weight <= 0:
+            # float yaxlitlash xatosi to'plangan: daraxtni aniq qayta quramiz
+            tree = FenwickTree(tree.weights)
+            total = tree.total
+            continue
+        chosen.append(ids[i])
+        tree.add(i, -weight)
+        total -= weight
+    if len(chosen) < k:
+        chosen.extend(_draw(ids, k - len(chosen), set(chosen), rng))
+    return chosen
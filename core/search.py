@@ -0,0 +1,81 @@
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from django.db import connection
+from django.db.models import Q
+from .bank import get_bank
+from .models import Question
+
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+class InvertedIndex:
+    def __init__(self, questions):
+        postings = defaultdict(dict)
+        for q in questions:
+            for token in tokenize(q.search_document):
+                postings[token][q.id] = postings[token].get(q.id, 0) + 1
+        self.postings = dict(postings)
+        self.tokens = sorted(self.postings)
+
+    def _prefix_matches(self, term):
+        i = bisect_left(self.tokens, term)
+        while i < len(self.tokens) and self.tokens[i].startswith(term):
+            yield self.tokens[i]
+            i += 1
+
+    def search(self, query):
+        scores = {}
+        for term in tokenize(query):
+            term_scores = defaultdict(float)
+            for token in self._prefix_matches(term):
+                weight = 1.0 if token == term else 0.5
+                for qid, tf in self.postings[token].items():
+                    term_scores[qid] += weight * tf
+            if not scores:
+                scores = term_scores
+            else:
+                scores = {qid: score + term_scores[qid] for qid, score in scores.items() if qid in term_scores}
+            if not scores:
+                return []
+        return sorted(scores, key=lambda qid: -scores[qid])
+
+
+def _python_search(bank, query):
+    index = getattr(bank, '_search_index', None)
+    if index is None:
+        index = InvertedIndex(bank.questions)
+        bank._search_index = index
+    return index.search(query)
+
+
+def _postgres_search(query):
+    from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramSimilarity
+
+    vector = SearchVector('search_document', config='simple')
+    search_query = SearchQuery(query, config='simple', search_type='websearch')
+    # icontains -> UPPER(search_document) LIKE: 0016 dagi core_question_search_upper_trgm indeksi
+    return list(
+        Question.objects.annotate(document=vector)
+        .filter(Q(document=search_query) | Q(search_document__icontains=query))
+        .annotate(rank=SearchRank(vector, search_query) + TrigramSimilarity('search_document', query))
+        .order_by('-rank', 'number')
+        .values_list('id', flat=True)
+    )
+
+
+def ranked_search(query):
+    query = query.strip()
+    bank = get_bank()
+    if not query:
+        return []
+    if connection.vendor == 'postgresql':
+        ids = _postgres_search(query)
+    else:
+        ids = _python_search(bank, query)
+    return bank.ordered(ids)
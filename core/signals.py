@@ -0,0 +1,20 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .bank import bump_version
+from .models import Question
+from .user_cache import invalidate_user
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def question_bank_changed(sender, **kwargs):
+    transaction.on_commit(bump_version)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    # profile, admin_edit_user, admin_delete_user va har bir login (last_login)
+    transaction.on_commit(lambda: invalidate_user(instance.pk))
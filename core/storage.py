@@ -0,0 +1,60 @@
+import gzip
+import brotli
+import rcssmin
+import rjsmin
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+
+MINIFIERS = {
+    '.css': rcssmin.cssmin,
+    '.js': rjsmin.jsmin,
+}
+COMPRESS_EXTENSIONS = ('.css', '.js', '.svg', '.json', '.txt', '.map', '.xml', '.ico', '.ttf', '.eot')
+# Bundan kichik fayllarni siqish foyda bermaydi
+COMPRESS_MIN_SIZE = 256
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """collectstatic: nomga kontent hashi qo'shiladi, CSS/JS minify qilinadi va .gz/.br nusxalar yoziladi.
+
+    nginx siqilgan nusxani tayyor holda beradi (gzip_static/brotli_static),
+    hashli nomlar esa "immutable" bilan bir yilga keshlanadi - fayl o'zgarsa
+    nomi ham o'zgaradi, eskisini qayta tekshirish kerak bo'lmaydi.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        hashed = set()
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception):
+                hashed.add(hashed_name)
+            yield name, hashed_name, processed
+        if dry_run:
+            return
+        for name in sorted(hashed):
+            self._build(name)
+
+    def _replace(self, name, content):
+        if self.exists(name):
+            self.delete(name)
+        self._save(name, ContentFile(content))
+
+    def _build(self, name):
+        ext = name[name.rfind('.'):].lower()
+        if ext not in COMPRESS_EXTENSIONS:
+            return
+        with self.open(name) as f:
+            content = f.read()
+        minify = MINIFIERS.get(ext)
+        if minify and '.min.' not in name:
+            # url() lar hashli nomlarga almashtirilgandan keyin; hash manba faylnikidir
+            content = minify(content.decode('utf-8')).encode('utf-8')
+            self._replace(name, content)
+        if len(content) < COMPRESS_MIN_SIZE:
+            return
+        for suffix, compressed in (
+            ('.gz', gzip.compress(content, compresslevel=9, mtime=0)),
+            ('.br', brotli.compress(content, quality=11)),
+        ):
+            if len(compressed) < len(content):
+                self._replace(name + suffix, compressed)
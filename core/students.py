@@ -0,0 +1,138 @@
+import csv
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.utils.crypto import get_random_string
+from .bulk import BulkImportError
+
+
+CHUNK_SIZE = 100
+# Bitta PBKDF2 hash ~0.5 s: veb so'rov gunicorn --timeout 120 ga sig'ishi uchun.
+# Kattaroq ro'yxatlar serverda import_students buyrug'i bilan yuklanadi.
+WEB_MAX_STUDENTS = 100
+STUDENT_CSV_FIELDS = ['username', 'password']
+REPORT_FIELDS = ['line', 'username', 'password', 'status']
+STATUS_CREATED = 'yaratildi'
+STATUS_EXISTS = 'login allaqachon mavjud'
+# Adashtiradigan belgilarsiz (0/o, 1/l/i): parol qog'ozdan ko'chiriladi
+PASSWORD_CHARS = 'abcdefghjkmnpqrstuvwxyz23456789'
+PASSWORD_LENGTH = 8
+# Bundan kam parol uchun jarayonlarni ishga tushirish hashlashdan qimmatroq
+POOL_MIN_PASSWORDS = 16
+
+
+def read_students(stream):
+    """CSV (username[,password]) dan [(qator, login, parol)] ro'yxati; parol bo'sh bo'lishi mumkin."""
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+    try:
+        if 'username' not in (reader.fieldnames or []):
+            raise BulkImportError(f"CSV ustunlari: {','.join(STUDENT_CSV_FIELDS)} (parol ixtiyoriy)")
+        return [
+            (reader.line_num, (row.get('username') or '').strip(), (row.get('password') or '').strip())
+            for row in reader
+        ]
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise BulkImportError(f"CSV faylni o'qib bo'lmadi: {e}")
+
+
+def _clean_username(username):
+    if not username:
+        raise ValueError("login bo'sh")
+    username = User.normalize_username(username)
+    if len(username) > User._meta.get_field('username').max_length:
+        raise ValueError("login juda uzun")
+    try:
+        User.username_validator(username)
+    except ValidationError:
+        raise ValueError(f"login noto'g'ri: {username}")
+    return username
+
+
+def _existing(usernames, chunk_size):
+    usernames = list(usernames)
+    found = set()
+    for start in range(0, len(usernames), chunk_size):
+        found.update(User.objects.filter(username__in=usernames[start:start + chunk_size]).values_list('username', flat=True))
+    return found
+
+
+def _hashes(passwords, workers):
+    """Parollarni tartib bilan hashlaydi; natijalar tayyor bo'lishi bilan qaytadi.
+
+    PBKDF2 protsessorni band qiladi (GIL), shuning uchun iplar emas, jarayonlar.
+    'spawn' - fork qilingan jarayon ota jarayonning baza ulanishini yopib qo'ymasin.
+    """
+    if workers == 1 or len(passwords) < POOL_MIN_PASSWORDS:
+        yield from map(make_password, passwords)
+        return
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+    try:
+        yield from executor.map(make_password, passwords, chunksize=8)
+    finally:
+        # yuklab olish uzilsa navbatdagi parollar hashlanmaydi
+        executor.shutdown(cancel_futures=True)
+
+
+def _insert(users):
+    """Bitta bo'lakni yozadi; parallel qo'shilgan loginlar o'tkazib yuboriladi. Yozilmaganlarini qaytaradi."""
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+        return set()
+    except IntegrityError:
+        taken = _existing((u.username for u in users), len(users))
+        with transaction.atomic():
+            User.objects.bulk_create([u for u in users if u.username not in taken])
+        return taken
+
+
+def provision_students(rows, workers=None, chunk_size=CHUNK_SIZE):
+    """Talabalarni ommaviy yaratadi va har bir qator uchun (qator, login, parol, holat) beradi.
+
+    Bazada yoki faylda takrorlangan loginlar o'tkazib yuboriladi, bo'sh parol
+    o'rniga tasodifiy parol yaratiladi. Foydalanuvchilar chunk_size talik
+    bo'laklarda, har biri o'z tranzaksiyasida yoziladi: bo'lak yozilayotganda
+    keyingi bo'lakning parollari boshqa jarayonlarda hashlanadi.
+    """
+    workers = workers or settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1
+    pending = []
+    seen = {}
+    for line, username, password in rows:
+        try:
+            username = _clean_username(username)
+        except ValueError as e:
+            yield line, username, '', str(e)
+            continue
+        if username in seen:
+            yield line, username, '', f"login {seen[username]}-qatorda ham bor"
+            continue
+        seen[username] = line
+        pending.append((line, username, password or get_random_string(PASSWORD_LENGTH, PASSWORD_CHARS)))
+
+    existing = _existing(seen, chunk_size)
+    new = []
+    for line, username, password in pending:
+        if username in existing:
+            yield line, username, '', STATUS_EXISTS
+        else:
+            new.append((line, username, password))
+
+    hashes = _hashes([password for _, _, password in new], workers)
+    try:
+        for start in range(0, len(new), chunk_size):
+            chunk = new[start:start + chunk_size]
+            users = [User(username=username, password=next(hashes)) for _, username, _ in chunk]
+            taken = _insert(users)
+            for line, username, password in chunk:
+                if username in taken:
+                    yield line, username, '', STATUS_EXISTS
+                else:
+                    yield line, username, password, STATUS_CREATED
+    finally:
+        hashes.close()
@@ -1,3 +1,513 @@
-from django.test import TestCase
+import io
+import json
+import random
+import shutil
+import tempfile
+import time
+import uuid
+import zipfile
+from datetime import timedelta
+from unittest import mock
+from django.contrib.auth import authenticate
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+from .archive import compact_sessions, pack_answers, unpack_answers
+from .bank import bump_version
+from .bulk import NUMBER_CONFLICT_MESSAGE, export_csv, export_zip, import_questions
+from .grading import grade_session
+from .models import Question, QuestionStat, TestAnswer, TestSession, UserStats
+from .sampling import FenwickTree, sample_ids, weighted_sample_ids
+from .search import InvertedIndex, ranked_search
+from .students import STATUS_CREATED, STATUS_EXISTS, _existing, provision_students
+from .user_cache import USER_CACHE_KEY
 
-# Create your tests here.
+
+def _make_question(number, text=None, correct='A'):
+    return Question.objects.create(
+        number=number,
+        text=text or f"Savol {number}",
+        variants=[{'letter': 'A', 'text': 'birinchi'}, {'letter': 'B', 'text': 'ikkinchi'}, {'letter': 'C', 'text': 'uchinchi'}],
+        correct_answer=correct,
+    )
+
+
+# Bank versiyasi, sessiyalar va foydalanuvchi keshi testlar orasida (va ishlayotgan saytdan) ajralsin
+LOCMEM_CACHES = {
+    alias: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': f'tests-{alias}'}
+    for alias in ('default', 'fragments', 'perf', 'sessions')
+}
+
+
+class SampleIdsTests(SimpleTestCase):
+    def test_quota_is_drawn_first(self):
+        ids = list(range(1, 101))
+        images = [5, 15, 25, 35]
+        for seed in range(20):
+            chosen = sample_ids(ids, 10, [(images, 3)], rng=random.Random(seed))
+            self.assertEqual(len(chosen), 10)
+            self.assertEqual(len(set(chosen)), 10)
+            self.assertGreaterEqual(len(set(chosen) & set(images)), 3)
+
+    def test_quota_larger_than_pool_or_sample(self):
+        chosen = sample_ids(list(range(1, 51)), 5, [([1, 2], 10)], rng=random.Random(1))
+        self.assertEqual(len(set(chosen)), 5)
+        self.assertTrue({1, 2} <= set(chosen))
+        self.assertEqual(len(sample_ids([1, 2, 3], 10, [([1, 2, 3], 10)], rng=random.Random(2))), 3)
+
+    def test_without_quota(self):
+        self.assertEqual(sorted(sample_ids([3, 1, 2], 10, rng=random.Random(3))), [1, 2, 3])
+        self.assertEqual(sample_ids([], 10), [])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class StartTestViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('talaba', password='x')
+        for n in range(1, 21):
+            _make_question(n)
+        bump_version()
+        self.client.force_login(self.user)
+
+    def test_bad_min_images_is_ignored(self):
+        response = self.client.post(reverse('start_test'), {'num_questions': 5, 'min_images': 'ko\'p'})
+        self.assertEqual(response.status_code, 302)
+        session = TestSession.objects.get(user=self.user)
+        self.assertEqual(len(session.question_ids), 5)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SearchTests(TestCase):
+    def setUp(self):
+        self.sign = _make_question(1, "Yo'l belgisi qaysi holatda o'rnatiladi?")
+        self.crossing = _make_question(2, "Chorrahada qaysi transport birinchi o'tadi? Chorraha tartibga solinmagan")
+        self.speed = _make_question(3, "Aholi punktida tezlik qancha?")
+        bump_version()
+
+    def test_index_prefix_and_all_terms(self):
+        index = InvertedIndex(Question.objects.all())
+        self.assertEqual(index.search('chorraha'), [self.crossing.id])
+        self.assertEqual(index.search('QAYSI'), sorted(index.search('qaysi')))
+        # barcha so'zlar bo'lishi kerak
+        self.assertEqual(index.search('qaysi tezlik'), [])
+        self.assertEqual(index.search('tez aholi'), [self.speed.id])
+        self.assertEqual(index.search('!!!'), [])
+
+    def test_exact_term_ranks_above_prefix(self):
+        exact = _make_question(4, "Belgi ko'rinmasa nima qilinadi?")
+        index = InvertedIndex(Question.objects.all())
+        self.assertEqual(index.search('belgi'), [exact.id, self.sign.id])
+        self.assertEqual(set(index.search('qaysi')), {self.sign.id, self.crossing.id})
+
+    def test_ranked_search_uses_bank(self):
+        self.assertEqual([q.id for q in ranked_search('  belgisi ')], [self.sign.id])
+        self.assertEqual(ranked_search('   '), [])
+        # savol raqami ham hujjatda
+        self.assertIn(self.speed.id, [q.id for q in ranked_search('3')])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ExamAnswersApiTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('talaba', password='x')
+        self.q1, self.q2, self.q3 = (_make_question(n).id for n in range(1, 4))
+        bump_version()
+        self.session = TestSession.objects.create(
+            user=self.user, total_questions=3, question_ids=[self.q1, self.q2, self.q3], time_limit=180,
+        )
+        self.client.force_login(self.user)
+
+    def _post_answers(self, answers):
+        url = reverse('api_test_answers', args=[self.session.id])
+        return self.client.post(url, json.dumps({'answers': answers}), content_type='application/json')
+
+    def test_first_answer_wins(self):
+        self.assertEqual(self._post_answers({str(self.q1): 'b'}).status_code, 200)
+        results = self._post_answers({str(self.q1): 'A', str(self.q2): 'Z'}).json()['results']
+        # javobdan keyin to'g'ri harf ko'rinadi: uni qayta yuborib natijani o'zgartirib bo'lmaydi
+        self.assertEqual(results, {str(self.q1): {'selected': 'B', 'correct': 'A'}})
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.draft_answers, {str(self.q1): 'B'})
+
+    def test_finish_uses_saved_answers(self):
+        self._post_answers({str(self.q1): 'A'})
+        url = reverse('api_test_finish', args=[self.session.id])
+        response = self.client.post(url, json.dumps({'answers': {str(self.q2): 'A'}, 'time_spent': 20}), content_type='application/json')
+        self.assertEqual(response.json(), {'redirect': reverse('test_result', args=[self.session.id])})
+        self.session.refresh_from_db()
+        self.assertEqual((self.session.completed, self.session.correct_answers, self.session.wrong_answers), (True, 2, 1))
+        self.assertEqual(self._post_answers({str(self.q3): 'A'}).status_code, 409)
+
+    def test_form_fallback_keeps_saved_answers(self):
+        # JSON finish muvaffaqiyatsiz bo'lsa sahifa oddiy formani yuboradi
+        self._post_answers({str(self.q1): 'B'})
+        response = self.client.post(reverse('submit_test', args=[self.session.id]), {
+            f'answer_{self.q1}': 'A',
+            f'answer_{self.q2}': 'a',
+            f'answer_{self.q3}': 'Z',
+            'time_spent': 40,
+        })
+        self.assertRedirects(response, reverse('test_result', args=[self.session.id]), fetch_redirect_response=False)
+        answers = dict(TestAnswer.objects.filter(session=self.session).values_list('question_id', 'selected_answer'))
+        self.assertEqual(answers, {self.q1: 'B', self.q2: 'A', self.q3: ''})
+        self.session.refresh_from_db()
+        self.assertEqual((self.session.correct_answers, self.session.time_spent, self.session.draft_answers), (1, 40, None))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class UserCacheTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('talaba', password='eski-parol')
+        self.key = USER_CACHE_KEY.format(self.user.id)
+        self.url = reverse('api_bank_snapshot')
+        self.client.login(username='talaba', password='eski-parol')
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    def _cached(self):
+        return caches['sessions'].get(self.key)
+
+    def test_user_is_cached_after_request(self):
+        self.assertEqual(self._cached().pk, self.user.pk)
+
+    def test_save_invalidates(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.first_name = 'Ali'
+            self.user.save()
+        self.assertIsNone(self._cached())
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.assertEqual(self._cached().first_name, 'Ali')
+
+    def test_password_change_logs_out_other_sessions(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.set_password('yangi-parol')
+            self.user.save()
+        self.assertIsNone(self._cached())
+        # keshdagi eski foydalanuvchi eski sessiya hashini tasdiqlab yubormasligi kerak
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response.url.startswith(reverse('login')))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class OfflinePracticeTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('talaba', password='x')
+        self.question_ids = [_make_question(n).id for n in range(1, 4)]
+        bump_version()
+        self.client.force_login(self.user)
+
+    def _item(self, user=None, **extra):
+        item = {
+            'client_id': str(uuid.uuid4()),
+            'user': (user or self.user).id,
+            'started_at': int(time.time() * 1000) - 60000,
+            'time_spent': 45,
+            'question_ids': self.question_ids,
+            'answers': {str(self.question_ids[0]): 'A', str(self.question_ids[1]): 'B'},
+        }
+        item.update(extra)
+        return item
+
+    def _sync(self, *items):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('api_practice_sync'), json.dumps({'sessions': list(items)}), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_resend_is_not_counted_twice(self):
+        item = self._item()
+        self.assertEqual(self._sync(item), {'synced': [item['client_id']], 'rejected': []})
+        # brauzer javobni olmay qolib qayta yuborgan
+        self.assertEqual(self._sync(item, item), {'synced': [item['client_id']] * 2, 'rejected': []})
+        session = TestSession.objects.get(user=self.user)
+        self.assertEqual((session.mode, session.correct_answers, session.wrong_answers), (TestSession.MODE_OFFLINE, 1, 2))
+        self.assertEqual(UserStats.objects.get(user=self.user).test_count, 1)
+        self.assertEqual(QuestionStat.objects.get(question_id=self.question_ids[0]).attempts, 1)
+
+    def test_other_user_and_bad_items(self):
+        other = User.objects.create_user('boshqa', password='x')
+        foreign = self._item(user=other)
+        broken = self._item(started_at='kecha')
+        unknown = self._item(question_ids=[999999])
+        result = self._sync(foreign, broken, unknown)
+        # boshqa foydalanuvchiniki brauzer navbatida qoladi
+        self.assertEqual(result, {'synced': [], 'rejected': [broken['client_id'], unknown['client_id']]})
+        self.assertFalse(TestSession.objects.exists())
+
+    def test_snapshot_withheld_during_exam(self):
+        TestSession.objects.create(user=self.user, total_questions=3, question_ids=self.question_ids, time_limit=180)
+        response = self.client.get(reverse('api_bank_snapshot'))
+        self.assertEqual(response.status_code, 403)
+        # tashlab ketilgan test vaqti tugagach to'smaydi
+        TestSession.objects.update(created_at=timezone.now() - timedelta(hours=1))
+        snapshot = self.client.get(reverse('api_bank_snapshot')).json()
+        self.assertEqual(sorted(snapshot['ids']), sorted(self.question_ids))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class GradeSessionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('talaba', password='x')
+        self.questions = [_make_question(n) for n in range(1, 4)]
+        bump_version()
+        self.question_ids = [q.id for q in self.questions]
+        self.session = TestSession.objects.create(
+            user=self.user, total_questions=3, question_ids=self.question_ids, time_limit=180,
+        )
+
+    def test_second_submit_is_ignored(self):
+        q1, q2, q3 = self.question_ids
+        with self.captureOnCommitCallbacks(execute=True):
+            grade_session(self.session.id, self.user, self.question_ids, {q1: 'A', q2: 'B'}, 30)
+        # ikkinchi yuborish (ikki tab, qayta urinish) natijani ham, statistikani ham o'zgartirmaydi
+        with self.captureOnCommitCallbacks(execute=True):
+            session = grade_session(self.session.id, self.user, self.question_ids, {q1: 'A', q2: 'A', q3: 'A'}, 90)
+        self.assertEqual((session.correct_answers, session.wrong_answers, session.time_spent), (1, 2, 30))
+        self.assertEqual(TestAnswer.objects.filter(session=self.session).count(), 3)
+        stats = UserStats.objects.get(user=self.user)
+        self.assertEqual((stats.test_count, stats.total_correct), (1, 1))
+        self.assertEqual(QuestionStat.objects.get(question_id=q1).attempts, 1)
+
+
+class FenwickTreeTests(SimpleTestCase):
+    def test_prefix_sums(self):
+        tree = FenwickTree([1.0, 2.0, 3.0, 4.0])
+        self.assertEqual(tree.total, 10.0)
+        self.assertEqual([tree.find(x) for x in (0, 0.99, 1, 2.99, 3, 5.99, 6, 9.99)], [0, 0, 1, 1, 2, 2, 3, 3])
+        tree.add(1, -2.0)
+        self.assertEqual(tree.total, 8.0)
+        self.assertEqual(tree.find(1), 2)
+
+    def test_single_and_empty(self):
+        self.assertEqual(FenwickTree([5.0]).find(4.9), 0)
+        self.assertEqual(FenwickTree([]).total, 0.0)
+
+    def test_sample_is_distinct_and_skips_zero_weights(self):
+        ids = list(range(100, 120))
+        weights = [0.0 if i % 2 else float(i + 1) for i in range(20)]
+        chosen = weighted_sample_ids(ids, weights, 10, rng=random.Random(1))
+        self.assertEqual(len(set(chosen)), 10)
+        self.assertTrue(all((qid - 100) % 2 == 0 for qid in chosen))
+
+    def test_sample_fills_from_zero_weights(self):
+        ids = [1, 2, 3, 4]
+        chosen = weighted_sample_ids(ids, [1.0, 0.0, 0.0, 0.0], 3, rng=random.Random(2))
+        self.assertEqual(chosen[0], 1)
+        self.assertEqual(len(set(chosen)), 3)
+        self.assertEqual(sorted(weighted_sample_ids(ids, [0.0] * 4, 10, rng=random.Random(3))), ids)
+
+    def test_sample_follows_weights(self):
+        rng = random.Random(4)
+        first = [weighted_sample_ids([1, 2], [9.0, 1.0], 1, rng=rng)[0] for _ in range(2000)]
+        self.assertAlmostEqual(first.count(1) / len(first), 0.9, delta=0.03)
+
+
+class PackAnswersTests(SimpleTestCase):
+    def test_round_trip(self):
+        question_ids = [11, 12, 13, 14, 15]
+        answers = {11: ('A', True), 12: ('', False), 14: ('J', False), 15: ('C', True)}
+        blob = pack_answers(question_ids, answers)
+        # 1 + ceil(5 / 8) + ceil(5 / 2)
+        self.assertEqual(len(blob), 5)
+        self.assertEqual(
+            unpack_answers(question_ids, blob),
+            [(11, 'A', True), (12, '', False), (14, 'J', False), (15, 'C', True)],
+        )
+
+    def test_empty_session(self):
+        self.assertEqual(unpack_answers([], pack_answers([], {})), [])
+
+    def test_rejects_unknown_format(self):
+        blob = pack_answers([1, 2], {1: ('A', True)})
+        with self.assertRaises(ValueError):
+            unpack_answers([1, 2], b'\x09' + blob[1:])
+        with self.assertRaises(ValueError):
+            unpack_answers([1, 2, 3], blob)
+
+
+class CompactSessionsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('talaba', password='x')
+        self.questions = [_make_question(n) for n in range(1, 6)]
+
+    def _session(self, question_ids, answers):
+        session = TestSession.objects.create(
+            user=self.user, total_questions=len(answers), question_ids=question_ids, completed=True,
+        )
+        for q, selected in answers:
+            TestAnswer.objects.create(session=session, question=q, selected_answer=selected, is_correct=selected == 'A')
+        return session
+
+    def _unpacked(self, session):
+        session.refresh_from_db()
+        return unpack_answers(session.question_ids, session.answers_packed)
+
+    def test_packs_and_deletes_rows(self):
+        q = self.questions
+        session = self._session([q[0].id, q[1].id, q[2].id], [(q[0], 'A'), (q[2], 'B')])
+        self.assertEqual(compact_sessions([session.id]), (1, 2))
+        self.assertFalse(TestAnswer.objects.filter(session=session).exists())
+        self.assertEqual(self._unpacked(session), [(q[0].id, 'A', True), (q[2].id, 'B', False)])
+
+    def test_legacy_session_keeps_answers(self):
+        # 0008 dan oldingi test: question_ids bo'sh, javoblar faqat TestAnswer da
+        q = self.questions
+        session = self._session([], [(q[3], 'A'), (q[1], 'C'), (q[4], '')])
+        self.assertEqual(compact_sessions([session.id]), (1, 3))
+        self.assertEqual(self._unpacked(session), [(q[3].id, 'A', True), (q[1].id, 'C', False), (q[4].id, '', False)])
+
+    def test_answers_outside_question_ids_are_kept(self):
+        q = self.questions
+        session = self._session([q[0].id], [(q[0], 'A'), (q[1], 'B')])
+        compact_sessions([session.id])
+        self.assertEqual(self._unpacked(session), [(q[0].id, 'A', True), (q[1].id, 'B', False)])
+
+    def test_unrepresentable_answer_is_not_archived(self):
+        q = self.questions
+        session = self._session([q[0].id], [(q[0], 'Z')])
+        self.assertEqual(compact_sessions([session.id]), (0, 0))
+        session.refresh_from_db()
+        self.assertIsNone(session.answers_packed)
+        self.assertEqual(TestAnswer.objects.filter(session=session).count(), 1)
+
+
+class BulkRoundTripTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media)
+        override = override_settings(MEDIA_ROOT=self.media)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def _snapshot(self):
+        return [
+            (q.number, q.text, q.variants, q.correct_answer)
+            for q in Question.objects.order_by('number')
+        ]
+
+    def test_csv_round_trip(self):
+        _make_question(3, 'Vergul, "qo\'shtirnoq"\nva yangi qator', correct='B')
+        _make_question(7, "Oddiy savol", correct='C')
+        before = self._snapshot()
+        data = ''.join(export_csv(Question.objects.order_by('number'))).encode('utf-8')
+        Question.objects.all().delete()
+        report = import_questions(io.BytesIO(data), 'savollar.csv', build_variants=False)
+        self.assertEqual((report.total, report.created, report.errors), (2, 2, []))
+        self.assertEqual(self._snapshot(), before)
+
+    def test_zip_round_trip_with_image(self):
+        buf = io.BytesIO()
+        Image.new('RGB', (40, 30), (10, 20, 30)).save(buf, 'PNG')
+        q = _make_question(5)
+        q.image.save('belgi.png', ContentFile(buf.getvalue()))
+        _make_question(6)
+        before = self._snapshot()
+        data = b''.join(export_zip(Question.objects.order_by('number')))
+        with zipfile.ZipFile(io.BytesIO(data)) as zf:
+            records = [json.loads(line) for line in zf.read('questions.jsonl').splitlines()]
+            self.assertEqual(zf.read(records[0]['image']), buf.getvalue())
+        Question.objects.all().delete()
+        report = import_questions(io.BytesIO(data), 'savollar.zip', build_variants=False)
+        self.assertEqual((report.created, report.images, report.errors), (2, 1, []))
+        self.assertEqual(self._snapshot(), before)
+        with Question.objects.get(number=5).image.open('rb') as f:
+            self.assertEqual(f.read(), buf.getvalue())
+
+    def test_command_reports_number_conflict(self):
+        path = f'{self.media}/savollar.csv'
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('text,correct_answer,variant_a,variant_b\nSavol,A,bir,ikki\n')
+        with mock.patch('core.management.commands.import_questions.import_questions', side_effect=IntegrityError('number')):
+            with self.assertRaisesMessage(CommandError, NUMBER_CONFLICT_MESSAGE):
+                call_command('import_questions', path, stdout=io.StringIO())
+
+    def test_existing_numbers_are_reported(self):
+        _make_question(1)
+        data = ''.join(export_csv(Question.objects.all())).encode('utf-8')
+        report = import_questions(io.BytesIO(data), 'savollar.csv', build_variants=False)
+        self.assertEqual(report.created, 0)
+        self.assertEqual([line for line, _ in report.errors], [2])
+
+
+class BuildImageVariantsCommandTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media)
+        override = override_settings(MEDIA_ROOT=self.media)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def _run(self, *args):
+        call_command('build_image_variants', *args, stdout=io.StringIO(), stderr=io.StringIO())
+
+    def test_broken_source_clears_variants(self):
+        buf = io.BytesIO()
+        Image.new('RGB', (60, 40), (1, 2, 3)).save(buf, 'PNG')
+        q = _make_question(1)
+        q.image.save('belgi.png', ContentFile(buf.getvalue()))
+        self._run()
+        q.refresh_from_db()
+        old = [name for size in q.image_variants.values() for name in size['files'].values()]
+        self.assertTrue(old)
+        # manba fayl buziladi: variantlar o'chiriladi, yozuvda ham qolmasligi kerak
+        with default_storage.open(q.image.name, 'wb') as f:
+            f.write(b'not an image')
+        updated_at = q.updated_at
+        self._run('--force')
+        q.refresh_from_db()
+        self.assertEqual(q.image_variants, {})
+        self.assertGreater(q.updated_at, updated_at)
+        self.assertFalse(any(default_storage.exists(name) for name in old))
+
+
+class ProvisionStudentsTests(TestCase):
+    def setUp(self):
+        User.objects.create_user('bor', password='x')
+
+    def _run(self, rows, **kwargs):
+        return {line: (username, password, status) for line, username, password, status in provision_students(rows, workers=1, **kwargs)}
+
+    def test_duplicates_and_invalid_rows(self):
+        report = self._run([
+            (2, 'ali', 'parol1'),
+            (3, 'vali', ''),
+            (4, 'bor', 'y'),
+            (5, 'ali', 'boshqa'),
+            (6, 'yomon login!', 'z'),
+            (7, '', 'z'),
+        ])
+        self.assertEqual(report[2], ('ali', 'parol1', STATUS_CREATED))
+        self.assertEqual(report[3][2], STATUS_CREATED)
+        self.assertEqual(len(report[3][1]), 8)
+        self.assertEqual(report[4], ('bor', '', STATUS_EXISTS))
+        self.assertEqual(report[5], ('ali', '', "login 2-qatorda ham bor"))
+        self.assertEqual(report[6][1:], ('', "login noto'g'ri: yomon login!"))
+        self.assertEqual(report[7][1:], ('', "login bo'sh"))
+        self.assertIsNotNone(authenticate(username='ali', password='parol1'))
+        self.assertIsNotNone(authenticate(username='vali', password=report[3][1]))
+        self.assertEqual(User.objects.filter(username__in=['ali', 'vali', 'bor']).count(), 3)
+
+    def test_login_taken_while_importing(self):
+        # boshqa import login'ni tekshiruvdan keyin, yozishdan oldin egallagan
+        calls = []
+
+        def existing(usernames, chunk_size):
+            usernames = list(usernames)
+            calls.append(usernames)
+            if len(calls) == 1:
+                User.objects.create_user('poyga', password='x')
+                return set()
+            return _existing(usernames, chunk_size)
+
+        with mock.patch('core.students._existing', side_effect=existing):
+            report = self._run([(2, 'poyga', 'a'), (3, 'yangi', 'b')], chunk_size=10)
+        self.assertEqual(report[2], ('poyga', '', STATUS_EXISTS))
+        self.assertEqual(report[3], ('yangi', 'b', STATUS_CREATED))
+        self.assertIsNone(authenticate(username='poyga', password='a'))
@@ -0,0 +1,116 @@
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils.html import json_script
+from .api import question_payload
+from .models import ExamTicket
+
+
+TICKET_SIZE = 20
+TICKET_LOCK_ID = 7202302
+# Kalitlarda bank versiyasi bor: savol o'zgarsa eski yozuvlar o'z-o'zidan eskiradi
+TICKET_KEY = 'ticket:{}:{}'
+TICKET_COUNT_KEY = 'tickets:{}'
+TICKET_TIMEOUT = 7 * 24 * 3600
+
+
+def split_tickets(ids, size=TICKET_SIZE):
+    """Bankni savol raqami tartibida size talik biletlarga bo'ladi.
+
+    Oxirgi to'liq bo'lmagan bilet bankning boshidagi savollar bilan to'ldiriladi,
+    shunda har bir bilet imtihondagidek size ta savoldan iborat bo'ladi.
+    """
+    ids = list(ids)
+    if len(ids) <= size:
+        return [ids] if ids else []
+    tickets = [ids[i:i + size] for i in range(0, len(ids), size)]
+    if len(tickets[-1]) < size:
+        tickets[-1] += ids[:size - len(tickets[-1])]
+    return tickets
+
+
+def sync_tickets(bank):
+    """ExamTicket jadvalini bank versiyasiga moslaydi; biletlar sonini qaytaradi."""
+    tickets = split_tickets(bank.ids)
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_xact_lock(%s)', [TICKET_LOCK_ID])
+        current = ExamTicket.objects.filter(bank_version=bank.version).count()
+        if current == len(tickets) and current == ExamTicket.objects.count():
+            return current
+        ExamTicket.objects.bulk_create(
+            [
+                ExamTicket(number=number, question_ids=ids, bank_version=bank.version)
+                for number, ids in enumerate(tickets, start=1)
+            ],
+            update_conflicts=True,
+            unique_fields=['number'],
+            update_fields=['question_ids', 'bank_version', 'updated_at'],
+        )
+        ExamTicket.objects.filter(number__gt=len(tickets)).delete()
+    return len(tickets)
+
+
+def ticket_count(bank):
+    key = TICKET_COUNT_KEY.format(bank.version)
+    count = cache.get(key)
+    if count is None:
+        count = sync_tickets(bank)
+        cache.set(key, count, TICKET_TIMEOUT)
+    return count
+
+
+def _build(bank, number):
+    if not 1 <= number <= ticket_count(bank):
+        return None
+    ids = ExamTicket.objects.filter(number=number, bank_version=bank.version).values_list('question_ids', flat=True).first()
+    if ids is None:
+        # boshqa worker jadvalni yangi versiyaga o'tkazayotgan bo'lishi mumkin
+        sync_tickets(bank)
+        ids = ExamTicket.objects.values_list('question_ids', flat=True).get(number=number)
+    return _entry(bank, number, ids)
+
+
+def _entry(bank, number, ids):
+    questions = []
+    for index, q in enumerate(bank.ordered(ids)):
+        item = question_payload(q)
+        item['index'] = index
+        questions.append(item)
+    return {
+        'number': number,
+        'question_ids': [q['id'] for q in questions],
+        # take_test sahifasiga tayyor <script type="application/json"> holida qo'yiladi
+        'script': json_script({'questions': questions}, 'ticketQuestions'),
+    }
+
+
+def get_ticket(bank, number):
+    """Bilet: {'number', 'question_ids', 'script'}. Odatda bitta kesh o'qishi."""
+    key = TICKET_KEY.format(bank.version, number)
+    ticket = cache.get(key)
+    if ticket is None:
+        ticket = _build(bank, number)
+        if ticket is not None:
+            cache.set(key, ticket, TICKET_TIMEOUT)
+    return ticket
+
+
+async def aget_ticket(bank, number):
+    ticket = await cache.aget(TICKET_KEY.format(bank.version, number))
+    if ticket is None:
+        ticket = await sync_to_async(get_ticket)(bank, number)
+    return ticket
+
+
+def warm_tickets(bank):
+    """Barcha biletlarni oldindan tayyorlab keshga yozadi; biletlar sonini qaytaradi."""
+    count = sync_tickets(bank)
+    cache.set(TICKET_COUNT_KEY.format(bank.version), count, TICKET_TIMEOUT)
+    rows = ExamTicket.objects.filter(bank_version=bank.version).values_list('number', 'question_ids')
+    cache.set_many(
+        {TICKET_KEY.format(bank.version, number): _entry(bank, number, ids) for number, ids in rows},
+        TICKET_TIMEOUT,
+    )
+    return count
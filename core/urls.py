@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import api, views
 
 urlpatterns = [
     path('', views.index, name='index'),
@@ -13,20 +13,36 @@ urlpatterns = [
     path('bookmark/toggle/<int:question_id>/', views.toggle_bookmark, name='toggle_bookmark'),
     path('bookmarks/', views.bookmarks, name='bookmarks'),
     path('test/start/', views.start_test, name='start_test'),
+    path('tickets/', views.tickets, name='tickets'),
+    path('tickets/<int:number>/start/', views.start_ticket, name='start_ticket'),
+    path('practice/', views.practice, name='practice'),
+    path('sw.js', views.service_worker, name='service_worker'),
+    path('manifest.webmanifest', views.web_manifest, name='web_manifest'),
     path('test/<int:session_id>/', views.take_test, name='take_test'),
     path('test/<int:session_id>/submit/', views.submit_test, name='submit_test'),
     path('test/<int:session_id>/result/', views.test_result, name='test_result'),
+    path('api/test/<int:session_id>/questions/', api.test_questions, name='api_test_questions'),
+    path('api/test/<int:session_id>/answers/', api.test_answers, name='api_test_answers'),
+    path('api/test/<int:session_id>/finish/', api.test_finish, name='api_test_finish'),
+    path('api/bank/snapshot/', api.bank_snapshot, name='api_bank_snapshot'),
+    path('api/practice/sync/', api.practice_sync, name='api_practice_sync'),
     path('statistics/', views.statistics, name='statistics'),
     path('profile/', views.profile, name='profile'),
 
     path('panel/', views.admin_dashboard, name='admin_dashboard'),
+    path('panel/db/', views.admin_db_status, name='admin_db_status'),
+    path('panel/performance/', views.admin_performance, name='admin_performance'),
     path('panel/questions/', views.admin_questions, name='admin_questions'),
     path('panel/questions/add/', views.admin_add_question, name='admin_add_question'),
+    path('panel/questions/import/', views.admin_import_questions, name='admin_import_questions'),
+    path('panel/questions/export/', views.admin_export_questions, name='admin_export_questions'),
     path('panel/questions/<int:question_id>/edit/', views.admin_edit_question, name='admin_edit_question'),
     path('panel/questions/<int:question_id>/delete/', views.admin_delete_question, name='admin_delete_question'),
     path('panel/users/', views.admin_users, name='admin_users'),
     path('panel/users/add/', views.admin_add_user, name='admin_add_user'),
+    path('panel/users/import/', views.admin_import_users, name='admin_import_users'),
     path('panel/users/<int:user_id>/edit/', views.admin_edit_user, name='admin_edit_user'),
     path('panel/users/<int:user_id>/delete/', views.admin_delete_user, name='admin_delete_user'),
     path('panel/statistics/', views.admin_statistics, name='admin_statistics'),
+    path('panel/statistics/export/', views.admin_statistics_export, name='admin_statistics_export'),
 ]
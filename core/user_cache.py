@@ -0,0 +1,62 @@
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.utils.crypto import constant_time_compare
+
+
+USER_CACHE_KEY = 'auth_user:{}'
+
+
+def _cache():
+    return caches[settings.USER_CACHE]
+
+
+def _verified(user, session_hash, backend):
+    # django.contrib.auth.get_user dagi kabi: parol o'zgarsa eski sessiyalar yaroqsiz
+    if not session_hash or not constant_time_compare(session_hash, user.get_session_auth_hash()):
+        return None
+    user.backend = backend
+    return user
+
+
+def get_user(request):
+    """auth.get_user ning keshli varianti: sessiyadagi foydalanuvchi bazaga murojaatsiz."""
+    session = request.session
+    user_id = session.get(auth.SESSION_KEY)
+    backend = session.get(auth.BACKEND_SESSION_KEY)
+    if user_id is None or backend not in settings.AUTHENTICATION_BACKENDS:
+        return AnonymousUser()
+    key = USER_CACHE_KEY.format(user_id)
+    cached = _cache().get(key)
+    if cached is not None:
+        user = _verified(cached, session.get(auth.HASH_SESSION_KEY), backend)
+        if user is not None:
+            return user
+    # kesh bo'sh yoki hash mos emas: to'liq tekshiruv (SECRET_KEY_FALLBACKS, flush) Django ning o'zida
+    user = auth.get_user(request)
+    if user.is_authenticated:
+        _cache().set(key, user, settings.USER_CACHE_TIMEOUT)
+    return user
+
+
+async def aget_user(request):
+    session = request.session
+    user_id = await session.aget(auth.SESSION_KEY)
+    backend = await session.aget(auth.BACKEND_SESSION_KEY)
+    if user_id is None or backend not in settings.AUTHENTICATION_BACKENDS:
+        return AnonymousUser()
+    key = USER_CACHE_KEY.format(user_id)
+    cached = await _cache().aget(key)
+    if cached is not None:
+        user = _verified(cached, await session.aget(auth.HASH_SESSION_KEY), backend)
+        if user is not None:
+            return user
+    user = await auth.aget_user(request)
+    if user.is_authenticated:
+        await _cache().aset(key, user, settings.USER_CACHE_TIMEOUT)
+    return user
+
+
+def invalidate_user(user_id):
+    _cache().delete(USER_CACHE_KEY.format(user_id))
@@ -1,18 +1,47 @@
+import csv
+import hashlib
+import io
 import json
-import random
-from django.shortcuts import render, redirect, get_object_or_404
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth.models import User
-from django.http import JsonResponse
-from django.db.models import Q, Avg, Count
-from .models import Question, Bookmark, TestSession, TestAnswer
+from django.core.paginator import Paginator
+from django.http import HttpResponse, JsonResponse, Http404, StreamingHttpResponse
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q, F, Avg, Count, Max, Sum
+from django.db.models.functions import NullIf
+from django.template.loader import render_to_string
+from django.templatetags.static import static
+from django.urls import reverse
+from django.utils import timezone
+from .archive import session_answers
+from .bank import aget_bank, get_bank
+from .bulk import CSV_FIELDS, NUMBER_CONFLICT_MESSAGE, BulkImportError, allocate_numbers, export_csv, export_zip, import_questions
+from .exam_state import get_exam_state_store
+from .grading import grade_session
+from .images import build_image_variants, delete_image_variants
+from .models import Question, Bookmark, TestSession, UserQuestionStat, UserStats
+from .offline import MAX_SYNC_SESSIONS
+from . import perf
+from .pagination import keyset_page, offset_page, next_page_url, parse_cursor
+from .practice import weak_question_ids
+from .search import ranked_search
+from .students import REPORT_FIELDS, STUDENT_CSV_FIELDS, WEB_MAX_STUDENTS, provision_students, read_students
+from .sampling import sample_ids
+from .tickets import TICKET_SIZE, aget_ticket, ticket_count
 
 
 def is_admin(user):
     return user.is_staff
 
 
+def _is_ajax(request):
+    return request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+
+
 def index(request):
     if request.user.is_authenticated:
         if request.user.is_staff:
@@ -46,35 +75,46 @@ def logout_view(request):
 
 @login_required
 def dashboard(request):
-    total_questions = Question.objects.count()
+    total_questions = get_bank().count
     bookmark_count = Bookmark.objects.filter(user=request.user).count()
-    test_count = TestSession.objects.filter(user=request.user, completed=True).count()
-    sessions = TestSession.objects.filter(user=request.user, completed=True)
-    avg_score = 0
-    if sessions.exists():
-        total = sum(s.score_percent for s in sessions)
-        avg_score = round(total / sessions.count())
+    stats = UserStats.for_user(request.user)
     return render(request, 'dashboard.html', {
         'total_questions': total_questions,
         'bookmark_count': bookmark_count,
-        'test_count': test_count,
-        'avg_score': avg_score,
+        'test_count': stats.test_count,
+        'avg_score': stats.avg_score,
+    })
+
+
+def _render_question_page(request, template, questions, context, ranked=False):
+    if ranked:
+        page, cursor = offset_page(questions, parse_cursor(request, 'start'))
+        next_url = next_page_url(request, cursor, 'start')
+    else:
+        page, cursor = keyset_page(questions, parse_cursor(request))
+        next_url = next_page_url(request, cursor)
+    page_ids = [q.id for q in page]
+    context.update({
+        'questions': page,
+        'total_count': len(questions),
+        'next_url': next_url,
+        'user_bookmarks': set(Bookmark.objects.filter(user=request.user, question_id__in=page_ids).values_list('question_id', flat=True)),
     })
+    if _is_ajax(request):
+        return render(request, 'partials/question_cards.html', context)
+    return render(request, template, context)
 
 
 @login_required
 def all_questions(request):
-    questions = Question.objects.all()
-    user_bookmarks = set(Bookmark.objects.filter(user=request.user).values_list('question_id', flat=True))
-    return render(request, 'all_questions.html', {
-        'questions': questions,
-        'user_bookmarks': user_bookmarks,
-    })
+    return _render_question_page(request, 'all_questions.html', get_bank().questions, {})
 
 
 @login_required
 def question_detail(request, question_id):
-    question = get_object_or_404(Question, id=question_id)
+    question = get_bank().get(question_id)
+    if question is None:
+        raise Http404
     is_bookmarked = Bookmark.objects.filter(user=request.user, question=question).exists()
     return render(request, 'question_detail.html', {
         'question': question,
@@ -84,142 +124,169 @@ def question_detail(request, question_id):
 
 @login_required
 def search_questions(request):
-    query = request.GET.get('q', '')
-    questions = Question.objects.all()
-    if query:
-        questions = questions.filter(
-            Q(text__icontains=query) |
-            Q(variant_a__icontains=query) |
-            Q(variant_b__icontains=query) |
-            Q(variant_c__icontains=query) |
-            Q(variant_d__icontains=query) |
-            Q(number__icontains=query)
-        )
-    user_bookmarks = set(Bookmark.objects.filter(user=request.user).values_list('question_id', flat=True))
-    return render(request, 'search.html', {
-        'questions': questions,
-        'query': query,
-        'user_bookmarks': user_bookmarks,
-    })
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return _render_question_page(request, 'search.html', get_bank().questions, {'query': query})
+    return _render_question_page(request, 'search.html', ranked_search(query), {'query': query}, ranked=True)
 
 
 @login_required
-def toggle_bookmark(request, question_id):
-    question = get_object_or_404(Question, id=question_id)
-    bookmark, created = Bookmark.objects.get_or_create(user=request.user, question=question)
+async def toggle_bookmark(request, question_id):
+    user = await request.auser()
+    bank = await aget_bank()
+    if bank.get(question_id) is None:
+        raise Http404
+    bookmark, created = await Bookmark.objects.aget_or_create(user=user, question_id=question_id)
     if not created:
-        bookmark.delete()
+        await bookmark.adelete()
         status = 'removed'
     else:
         status = 'added'
-    if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+    if _is_ajax(request):
         return JsonResponse({'status': status})
     return redirect(request.META.get('HTTP_REFERER', 'all_questions'))
 
 
 @login_required
 def bookmarks(request):
-    user_bookmarks = Bookmark.objects.filter(user=request.user).select_related('question')
-    bookmark_ids = set(b.question_id for b in user_bookmarks)
-    questions = [b.question for b in user_bookmarks]
+    bookmark_ids = list(Bookmark.objects.filter(user=request.user).order_by('id').values_list('question_id', flat=True))
     return render(request, 'bookmarks.html', {
-        'questions': questions,
-        'user_bookmarks': bookmark_ids,
+        'questions': get_bank().ordered(bookmark_ids),
+        'user_bookmarks': set(bookmark_ids),
     })
 
 
 @login_required
 def start_test(request):
-    total_available = Question.objects.count()
+    bank = get_bank()
+    total_available = bank.count
     if request.method == 'POST':
         num_questions = int(request.POST.get('num_questions', 10))
         num_questions = min(num_questions, total_available)
         if num_questions < 1:
             num_questions = 1
-        questions = list(Question.objects.all())
-        random.shuffle(questions)
-        selected = questions[:num_questions]
+        mode = request.POST.get('mode')
+        if mode == TestSession.MODE_WEAK:
+            selected = weak_question_ids(request.user, bank, num_questions)
+        else:
+            mode = TestSession.MODE_RANDOM
+            quotas = []
+            try:
+                min_images = int(request.POST.get('min_images') or 0)
+            except ValueError:
+                min_images = 0
+            if min_images > 0:
+                quotas.append((bank.image_ids, min_images))
+            selected = sample_ids(bank.ids, num_questions, quotas)
         session = TestSession.objects.create(
             user=request.user,
-            total_questions=num_questions
+            mode=mode,
+            total_questions=num_questions,
+            question_ids=selected,
+            time_limit=num_questions * 60,
         )
-        session._selected_questions = [q.id for q in selected]
-        request.session[f'test_{session.id}'] = {
-            'question_ids': [q.id for q in selected],
-            'current': 0,
-            'answers': {},
-            'time_limit': num_questions * 60,
-        }
         return redirect('take_test', session_id=session.id)
-    return render(request, 'start_test.html', {'total_available': total_available})
+    return render(request, 'start_test.html', {
+        'total_available': total_available,
+        'total_with_images': len(bank.image_ids),
+        'weak_count': UserQuestionStat.objects.filter(user=request.user, wrong__gt=0).count(),
+    })
 
 
 @login_required
-def take_test(request, session_id):
-    session = get_object_or_404(TestSession, id=session_id, user=request.user)
+def tickets(request):
+    bank = get_bank()
+    best = dict(
+        TestSession.objects.filter(user=request.user, completed=True, mode=TestSession.MODE_TICKET)
+        .values('ticket_number').annotate(best=Max('correct_answers'))
+        .values_list('ticket_number', 'best')
+    )
+    return render(request, 'tickets.html', {
+        'tickets': [{'number': n, 'best': best.get(n)} for n in range(1, ticket_count(bank) + 1)],
+        'ticket_size': TICKET_SIZE,
+    })
+
+
+@login_required
+async def start_ticket(request, number):
+    if request.method != 'POST':
+        return redirect('tickets')
+    user = await request.auser()
+    # bilet tarkibi keshda tayyor turadi: bir vaqtda boshlaganlar bazani o'qimaydi
+    ticket = await aget_ticket(await aget_bank(), number)
+    if ticket is None:
+        raise Http404
+    question_ids = ticket['question_ids']
+    session = await TestSession.objects.acreate(
+        user=user,
+        mode=TestSession.MODE_TICKET,
+        ticket_number=number,
+        total_questions=len(question_ids),
+        question_ids=question_ids,
+        time_limit=len(question_ids) * 60,
+    )
+    return redirect('take_test', session_id=session.id)
+
+
+async def _ticket_preload(request, session):
+    # Bilet savollari sahifaga tayyor JSON bo'lib qo'yiladi, API ga so'rov kerak emas
+    bank = await aget_bank()
+    ticket = await aget_ticket(bank, session.ticket_number)
+    if ticket is None or ticket['question_ids'] != session.question_ids:
+        return None, {}
+    answers = {int(qid): answer for qid, answer in (await get_exam_state_store().aload_answers(request, session)).items()}
+    answer_key = bank.answer_key(list(answers))
+    results = {str(qid): {'selected': selected, 'correct': answer_key.get(qid)} for qid, selected in answers.items()}
+    return ticket, results
+
+
+@login_required
+async def take_test(request, session_id):
+    user = await request.auser()
+    session = await aget_object_or_404(TestSession, id=session_id, user=user)
     if session.completed:
         return redirect('test_result', session_id=session.id)
-    test_data = request.session.get(f'test_{session.id}')
-    if not test_data:
+    if not session.question_ids:
         return redirect('start_test')
-    question_ids = test_data['question_ids']
-    questions = Question.objects.filter(id__in=question_ids)
-    q_map = {q.id: q for q in questions}
-    ordered_questions = [q_map[qid] for qid in question_ids if qid in q_map]
-    return render(request, 'take_test.html', {
+    time_limit = session.time_limit or 600
+    elapsed = int((timezone.now() - session.created_at).total_seconds())
+    ticket, results = None, {}
+    if session.mode == TestSession.MODE_TICKET:
+        ticket, results = await _ticket_preload(request, session)
+    return await sync_to_async(render)(request, 'take_test.html', {
         'session': session,
-        'questions': ordered_questions,
-        'answers': test_data.get('answers', {}),
-        'time_limit': test_data.get('time_limit', 600),
-        'question_ids_json': json.dumps(question_ids),
+        'total_questions': len(session.question_ids),
+        'time_limit': time_limit,
+        'elapsed': min(max(elapsed, 0), time_limit),
+        'ticket': ticket,
+        'initial_results': results,
     })
 
 
 @login_required
-def submit_test(request, session_id):
-    session = get_object_or_404(TestSession, id=session_id, user=request.user)
+async def submit_test(request, session_id):
+    user = await request.auser()
+    session = await aget_object_or_404(TestSession, id=session_id, user=user)
     if session.completed:
         return redirect('test_result', session_id=session.id)
-    test_data = request.session.get(f'test_{session.id}')
-    if not test_data:
+    if not session.question_ids:
         return redirect('start_test')
     if request.method == 'POST':
-        correct = 0
-        wrong = 0
-        time_spent = int(request.POST.get('time_spent', 0))
-        question_ids = test_data['question_ids']
-        questions = Question.objects.filter(id__in=question_ids)
-        q_map = {q.id: q for q in questions}
+        store = get_exam_state_store()
+        question_ids = session.question_ids
+        answers = {int(qid): answer for qid, answer in (await store.aload_answers(request, session)).items()}
+        bank = await aget_bank()
+        # Saqlangan javobdan keyin to'g'ri harf ko'rsatiladi: forma uni almashtira olmaydi
         for qid in question_ids:
-            answer = request.POST.get(f'answer_{qid}', '')
-            q = q_map.get(qid)
-            if q and answer:
-                is_correct = answer.upper() == q.correct_answer
-                if is_correct:
-                    correct += 1
-                else:
-                    wrong += 1
-                TestAnswer.objects.create(
-                    session=session,
-                    question=q,
-                    selected_answer=answer.upper(),
-                    is_correct=is_correct
-                )
-            elif q:
-                wrong += 1
-                TestAnswer.objects.create(
-                    session=session,
-                    question=q,
-                    selected_answer='',
-                    is_correct=False
-                )
-        session.correct_answers = correct
-        session.wrong_answers = wrong
-        session.time_spent = time_spent
-        session.completed = True
-        session.save()
-        del request.session[f'test_{session.id}']
-        request.session.modified = True
+            q = bank.get(qid)
+            answer = request.POST.get(f'answer_{qid}', '').upper()[:1]
+            if qid in answers or q is None or not answer:
+                continue
+            if answer in {v['letter'] for v in q.variants}:
+                answers[qid] = answer
+        time_spent = int(request.POST.get('time_spent', 0))
+        await sync_to_async(grade_session)(session.id, user, question_ids, answers, time_spent)
+        await store.aclear(request, session)
         return redirect('test_result', session_id=session.id)
     return redirect('take_test', session_id=session.id)
 
@@ -227,34 +294,77 @@ def submit_test(request, session_id):
 @login_required
 def test_result(request, session_id):
     session = get_object_or_404(TestSession, id=session_id, user=request.user)
-    answers = TestAnswer.objects.filter(session=session).select_related('question')
     return render(request, 'test_result.html', {
         'session': session,
-        'answers': answers,
+        'answers': session_answers(session),
+    })
+
+
+PRACTICE_SIZES = [10, 20, 50]
+# Service worker o'rnatilganda oldindan keshlanadigan fayllar
+OFFLINE_ASSETS = ['css/style.css', 'js/main.js', 'js/practice.js', 'img/icon.svg']
+
+
+@login_required
+def practice(request):
+    return render(request, 'practice.html', {
+        'config': {
+            'user': request.user.id,
+            'sizes': PRACTICE_SIZES,
+            'snapshot_url': reverse('api_bank_snapshot'),
+            'sync_url': reverse('api_practice_sync'),
+        },
+    })
+
+
+def service_worker(request):
+    # Ildizdan beriladi (/sw.js) - aks holda faqat /static/ ichidagi so'rovlarni ushlay olardi.
+    # Hashli fayl nomlari o'zgarsa skript ham o'zgaradi va brauzer yangisini o'rnatadi.
+    assets = [static(path) for path in OFFLINE_ASSETS]
+    script = render_to_string('sw.js', {
+        'version': hashlib.md5('\n'.join(assets).encode()).hexdigest()[:12],
+        'config': json.dumps({
+            'assets': assets,
+            'practice_url': reverse('practice'),
+            'sync_url': reverse('api_practice_sync'),
+            'media_url': settings.MEDIA_URL,
+            'batch_size': MAX_SYNC_SESSIONS,
+        }),
     })
+    response = HttpResponse(script, content_type='application/javascript')
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+def web_manifest(request):
+    return JsonResponse({
+        'name': 'AvtotestPrime',
+        'short_name': 'Avtotest',
+        'lang': 'uz',
+        'start_url': reverse('practice'),
+        'scope': '/',
+        'display': 'standalone',
+        'background_color': '#0f0f13',
+        'theme_color': '#6c5ce7',
+        'icons': [{'src': static('img/icon.svg'), 'sizes': 'any', 'type': 'image/svg+xml'}],
+    }, content_type='application/manifest+json')
+
+
+# session_user_done_idx indeksidagi ustunlar
+RECENT_SESSION_FIELDS = ['created_at', 'total_questions', 'correct_answers', 'wrong_answers', 'time_spent']
 
 
 @login_required
 def statistics(request):
-    sessions = TestSession.objects.filter(user=request.user, completed=True)
-    total_tests = sessions.count()
-    avg_score = 0
-    best_score = 0
-    total_questions_answered = 0
-    total_correct = 0
-    if sessions.exists():
-        scores = [s.score_percent for s in sessions]
-        avg_score = round(sum(scores) / len(scores))
-        best_score = max(scores)
-        total_questions_answered = sum(s.total_questions for s in sessions)
-        total_correct = sum(s.correct_answers for s in sessions)
-    recent_sessions = sessions[:10]
+    stats = UserStats.for_user(request.user)
+    recent_sessions = TestSession.objects.filter(user=request.user, completed=True).only(*RECENT_SESSION_FIELDS)[:10]
     return render(request, 'statistics.html', {
-        'total_tests': total_tests,
-        'avg_score': avg_score,
-        'best_score': best_score,
-        'total_questions_answered': total_questions_answered,
-        'total_correct': total_correct,
+        'total_tests': stats.test_count,
+        'avg_score': stats.avg_score,
+        'rolling_avg': stats.rolling_avg,
+        'best_score': stats.best_score,
+        'total_questions_answered': stats.total_questions,
+        'total_correct': stats.total_correct,
         'recent_sessions': recent_sessions,
     })
 
@@ -289,7 +399,11 @@ def admin_dashboard(request):
     total_questions = Question.objects.count()
     total_users = User.objects.filter(is_staff=False).count()
     total_tests = TestSession.objects.filter(completed=True).count()
-    recent_tests = TestSession.objects.filter(completed=True).select_related('user')[:5]
+    recent_tests = (
+        TestSession.objects.filter(completed=True)
+        .select_related('user')
+        .only('created_at', 'total_questions', 'correct_answers', 'user__username')[:5]
+    )
     return render(request, 'admin/dashboard.html', {
         'total_questions': total_questions,
         'total_users': total_users,
@@ -298,11 +412,51 @@ def admin_dashboard(request):
     })
 
 
+@login_required
+@user_passes_test(is_admin)
+def admin_db_status(request):
+    settings_dict = connection.settings_dict
+    pool = getattr(connection, 'pool', None)
+    data = {
+        'vendor': connection.vendor,
+        'conn_max_age': settings_dict.get('CONN_MAX_AGE'),
+        'conn_health_checks': settings_dict.get('CONN_HEALTH_CHECKS'),
+        'pool': None,
+    }
+    if pool is not None:
+        data['pool'] = {
+            'name': pool.name,
+            'min_size': pool.min_size,
+            'max_size': pool.max_size,
+            'stats': pool.get_stats(),
+        }
+    return JsonResponse(data)
+
+
+@login_required
+@user_passes_test(is_admin)
+def admin_performance(request):
+    if request.method == 'POST':
+        perf.reset()
+        return redirect('admin_performance')
+    return render(request, 'admin/performance.html', {
+        'report': perf.summary(),
+        'slow_ms': settings.PERF_SLOW_MS,
+    })
+
+
 @login_required
 @user_passes_test(is_admin)
 def admin_questions(request):
-    questions = Question.objects.all()
-    return render(request, 'admin/questions.html', {'questions': questions})
+    questions, cursor = keyset_page(Question.objects.all(), parse_cursor(request))
+    context = {
+        'questions': questions,
+        'next_url': next_page_url(request, cursor),
+    }
+    if _is_ajax(request):
+        return render(request, 'partials/admin_question_rows.html', context)
+    context['total_count'] = Question.objects.count()
+    return render(request, 'admin/questions.html', context)
 
 
 def _parse_variants(post_data):
@@ -315,22 +469,33 @@ def _parse_variants(post_data):
     return variants
 
 
+def _refresh_image_variants(question):
+    try:
+        question.image_variants = build_image_variants(question)
+    except OSError:
+        # Pillow ocha olmagan rasm (UnidentifiedImageError ham OSError): asl fayl variantlarsiz ko'rsatiladi
+        question.image_variants = {}
+    # updated_at ham yangilansin: savol fragment keshi shu vaqt bo'yicha
+    question.save(update_fields=['image_variants', 'updated_at'])
+
+
 @login_required
 @user_passes_test(is_admin)
 def admin_add_question(request):
     if request.method == 'POST':
-        last = Question.objects.order_by('-number').first()
-        next_num = (last.number + 1) if last else 1
         variants = _parse_variants(request.POST)
         q = Question(
-            number=next_num,
             text=request.POST.get('text', ''),
             correct_answer=request.POST.get('correct_answer', 'A'),
         )
         q.variants = variants
         if 'image' in request.FILES:
             q.image = request.FILES['image']
-        q.save()
+        with transaction.atomic():
+            q.number = allocate_numbers(1)[0]
+            q.save()
+        if q.image:
+            _refresh_image_variants(q)
         return redirect('admin_questions')
     return render(request, 'admin/add_question.html')
 
@@ -344,11 +509,16 @@ def admin_edit_question(request, question_id):
         variants = _parse_variants(request.POST)
         question.variants = variants
         question.correct_answer = request.POST.get('correct_answer', question.correct_answer)
+        image_changed = False
         if 'image' in request.FILES:
             question.image = request.FILES['image']
+            image_changed = True
         if request.POST.get('remove_image') == 'on':
             question.image = None
+            image_changed = True
         question.save()
+        if image_changed:
+            _refresh_image_variants(question)
         return redirect('admin_questions')
     return render(request, 'admin/edit_question.html', {'question': question})
 
@@ -358,10 +528,51 @@ def admin_edit_question(request, question_id):
 def admin_delete_question(request, question_id):
     question = get_object_or_404(Question, id=question_id)
     if request.method == 'POST':
+        delete_image_variants(question.image_variants)
         question.delete()
     return redirect('admin_questions')
 
 
+@login_required
+@user_passes_test(is_admin)
+def admin_import_questions(request):
+    report = None
+    error = None
+    if request.method == 'POST':
+        upload = request.FILES.get('file')
+        if upload is None:
+            error = "Fayl tanlanmagan"
+        else:
+            try:
+                # Rasm o'lchamlari so'rov ichida emas, build_image_variants buyrug'i bilan yaratiladi
+                report = import_questions(
+                    upload, upload.name,
+                    update=request.POST.get('update') == 'on',
+                    build_variants=False,
+                )
+            except BulkImportError as e:
+                error = str(e)
+            except IntegrityError:
+                error = NUMBER_CONFLICT_MESSAGE
+    return render(request, 'admin/import_questions.html', {
+        'report': report,
+        'error': error,
+        'csv_fields': ','.join(CSV_FIELDS),
+    })
+
+
+@login_required
+@user_passes_test(is_admin)
+def admin_export_questions(request):
+    if request.GET.get('format') == 'csv':
+        response = StreamingHttpResponse(export_csv(), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = 'attachment; filename="savollar.csv"'
+    else:
+        response = StreamingHttpResponse(export_zip(), content_type='application/zip')
+        response['Content-Disposition'] = 'attachment; filename="savollar.zip"'
+    return response
+
+
 @login_required
 @user_passes_test(is_admin)
 def admin_users(request):
@@ -384,6 +595,41 @@ def admin_add_user(request):
     return render(request, 'admin/add_user.html', {'error': error})
 
 
+@login_required
+@user_passes_test(is_admin)
+def admin_import_users(request):
+    error = None
+    if request.method == 'POST':
+        upload = request.FILES.get('file')
+        if upload is None:
+            error = "Fayl tanlanmagan"
+        else:
+            try:
+                rows = read_students(upload)
+            except BulkImportError as e:
+                error = str(e)
+            else:
+                if len(rows) > WEB_MAX_STUDENTS:
+                    error = (
+                        f"Bir yuklashda ko'pi bilan {WEB_MAX_STUDENTS} ta talaba. Kattaroq ro'yxatni serverda yuklang: "
+                        f"python manage.py import_students talabalar.csv -o parollar.csv"
+                    )
+                else:
+                    # Hisobot hamma foydalanuvchi yozilgach beriladi: yarim yo'lda uzilib, paroli noma'lum talabalar qolmasin
+                    buffer = io.StringIO()
+                    writer = csv.writer(buffer)
+                    writer.writerow(REPORT_FIELDS)
+                    writer.writerows(provision_students(rows))
+                    response = HttpResponse(buffer.getvalue(), content_type='text/csv; charset=utf-8')
+                    response['Content-Disposition'] = 'attachment; filename="talabalar.csv"'
+                    return response
+    return render(request, 'admin/import_users.html', {
+        'error': error,
+        'csv_fields': ','.join(STUDENT_CSV_FIELDS),
+        'max_students': WEB_MAX_STUDENTS,
+    })
+
+
 @login_required
 @user_passes_test(is_admin)
 def admin_edit_user(request, user_id):
@@ -413,21 +659,68 @@ def admin_delete_user(request, user_id):
     return redirect('admin_users')
 
 
+STATISTICS_SORT_FIELDS = {
+    'username': 'username',
+    'tests': 'total_tests',
+    'avg': 'avg_score',
+    'correct': 'total_correct',
+    'last': 'last_test',
+}
+
+
+def _user_statistics(sort):
+    completed = Q(test_sessions__completed=True)
+    users = User.objects.filter(is_staff=False).annotate(
+        total_tests=Count('test_sessions', filter=completed),
+        total_correct=Sum('test_sessions__correct_answers', filter=completed),
+        avg_score=Avg(
+            F('test_sessions__correct_answers') * 100.0 / NullIf(F('test_sessions__total_questions'), 0),
+            filter=completed,
+        ),
+        last_test=Max('test_sessions__created_at', filter=completed),
+    )
+    field = STATISTICS_SORT_FIELDS.get(sort.lstrip('-'), 'username')
+    if sort.startswith('-'):
+        return users.order_by(F(field).desc(nulls_last=True), 'id')
+    return users.order_by(F(field).asc(nulls_first=True), 'id')
+
+
 @login_required
 @user_passes_test(is_admin)
 def admin_statistics(request):
-    users = User.objects.filter(is_staff=False)
-    user_stats = []
-    for u in users:
-        sessions = TestSession.objects.filter(user=u, completed=True)
-        total = sessions.count()
-        avg = 0
-        if sessions.exists():
-            scores = [s.score_percent for s in sessions]
-            avg = round(sum(scores) / len(scores))
-        user_stats.append({
-            'user': u,
-            'total_tests': total,
-            'avg_score': avg,
-        })
-    return render(request, 'admin/statistics.html', {'user_stats': user_stats})
+    sort = request.GET.get('sort', 'username')
+    paginator = Paginator(_user_statistics(sort), 50)
+    page = paginator.get_page(request.GET.get('page'))
+    return render(request, 'admin/statistics.html', {
+        'page': page,
+        'sort': sort,
+    })
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+@login_required
+@user_passes_test(is_admin)
+def admin_statistics_export(request):
+    users = _user_statistics(request.GET.get('sort', 'username')).values_list(
+        'username', 'total_tests', 'total_correct', 'avg_score', 'last_test',
+    )
+    writer = csv.writer(_Echo())
+
+    def rows():
+        yield writer.writerow(['username', 'total_tests', 'total_correct', 'avg_score', 'last_test'])
+        for username, total_tests, total_correct, avg_score, last_test in users.iterator(chunk_size=2000):
+            yield writer.writerow([
+                username,
+                total_tests,
+                total_correct or 0,
+                round(avg_score) if avg_score is not None else 0,
+                last_test.isoformat() if last_test else '',
+            ])
+
+    response = StreamingHttpResponse(rows(), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = 'attachment; filename="statistika.csv"'
+    return response
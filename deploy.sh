@@ -25,8 +25,20 @@ if [ -f "${PROJECT_DIR}/.env" ]; then
     echo -e "${YELLOW}Mavjud .env topildi, parollar saqlanadi${NC}"
     DB_PASS=$(grep PGPASSWORD "${PROJECT_DIR}/.env" | head -1 | cut -d'"' -f2)
     SECRET_KEY=$(grep SECRET_KEY "${PROJECT_DIR}/.env" | head -1 | cut -d'"' -f2)
+    if [ -z "$SERVER_MODE" ]; then
+        SERVER_MODE=$(grep SERVER_MODE "${PROJECT_DIR}/.env" | head -1 | cut -d'"' -f2)
+    fi
+    if [ -z "$DB_POOL" ]; then
+        DB_POOL=$(grep DB_POOL "${PROJECT_DIR}/.env" | head -1 | cut -d'"' -f2)
+    fi
 fi
 
+# SERVER_MODE=asgi bash deploy.sh -> gunicorn + uvicorn workerlari (async test endpointlari uchun)
+SERVER_MODE="${SERVER_MODE:-wsgi}"
+WEB_WORKERS="${WEB_WORKERS:-3}"
+# DB_POOL=True -> psycopg 3 connection pool, aks holda doimiy ulanishlar (DB_CONN_MAX_AGE)
+DB_POOL="${DB_POOL:-False}"
+
 if [ -z "$DB_PASS" ]; then
     DB_PASS=$(openssl rand -hex 24)
     echo -e "${YELLOW}Yangi DB parol yaratildi${NC}"
@@ -124,6 +136,12 @@ fi
 source venv/bin/activate
 pip install --upgrade pip
 pip install -r requirements.txt
+if [ "$SERVER_MODE" = "asgi" ]; then
+    pip install "uvicorn[standard]==0.30.6"
+fi
+if [ "$DB_POOL" = "True" ]; then
+    pip install "psycopg[binary,pool]==3.2.3"
+fi
 echo -e "${GREEN}Python paketlari o'rnatildi!${NC}"
 
 echo -e "${YELLOW}[4/8] .env faylini yaratish...${NC}"
@@ -135,6 +153,12 @@ echo "PGUSER=\"${DB_USER}\"" >> "${PROJECT_DIR}/.env"
 echo "PGPASSWORD=\"${DB_PASS}\"" >> "${PROJECT_DIR}/.env"
 echo "PGHOST=\"localhost\"" >> "${PROJECT_DIR}/.env"
 echo "PGPORT=\"5432\"" >> "${PROJECT_DIR}/.env"
+echo "SERVER_MODE=\"${SERVER_MODE}\"" >> "${PROJECT_DIR}/.env"
+echo "DB_POOL=\"${DB_POOL}\"" >> "${PROJECT_DIR}/.env"
+if [ "$SERVER_MODE" = "asgi" ] && [ "$DB_POOL" != "True" ]; then
+    # ASGI da doimiy ulanishlar to'planib qoladi: pool bo'lmasa har so'rovga yangi ulanish
+    echo "DB_CONN_MAX_AGE=\"0\"" >> "${PROJECT_DIR}/.env"
+fi
 echo -e "${GREEN}.env fayli yaratildi!${NC}"
 
 echo -e "${YELLOW}[5/8] Django migratsiya va sozlash...${NC}"
@@ -183,6 +207,13 @@ if ! id -u www > /dev/null 2>&1; then
 fi
 echo -e "${YELLOW}Web user: ${WEB_USER}${NC}"
 
+if [ "$SERVER_MODE" = "asgi" ]; then
+    GUNICORN_APP="avtotestprime.asgi:application --worker-class uvicorn.workers.UvicornWorker"
+else
+    GUNICORN_APP="avtotestprime.wsgi:application"
+fi
+echo -e "${YELLOW}Server rejimi: ${SERVER_MODE} (${WEB_WORKERS} worker)${NC}"
+
 cat > /etc/systemd/system/avtotestprime.service <<SERVICEEOF
 [Unit]
 Description=AvtotestPrime Gunicorn Daemon
@@ -193,7 +224,7 @@ User=${WEB_USER}
 Group=${WEB_USER}
 WorkingDirectory=${PROJECT_DIR}
 EnvironmentFile=${PROJECT_DIR}/.env
-ExecStart=${PROJECT_DIR}/venv/bin/gunicorn avtotestprime.wsgi:application --bind 127.0.0.1:8000 --workers 3 --timeout 120
+ExecStart=${PROJECT_DIR}/venv/bin/gunicorn ${GUNICORN_APP} --bind 127.0.0.1:8000 --workers ${WEB_WORKERS} --timeout 120
 Restart=always
 RestartSec=3
 
@@ -244,6 +275,15 @@ else
         mkdir -p "$LOG_DIR"
     fi
 
+    # ngx_brotli moduli bo'lsa collectstatic yozgan .br fayllar ham beriladi
+    BROTLI_STATIC=""
+    for bin in /www/server/nginx/sbin/nginx nginx; do
+        if command -v "$bin" &> /dev/null && "$bin" -V 2>&1 | grep -qi brotli; then
+            BROTLI_STATIC="brotli_static on;"
+            break
+        fi
+    done
+
     cat > "$NGINX_CONF" <<NGINXEOF
 server {
     listen 80;
@@ -253,8 +293,22 @@ server {
     access_log ${LOG_DIR}/${DOMAIN}.log;
     error_log ${LOG_DIR}/${DOMAIN}.error.log;
 
+    # Hashli fayllar (style.1a2b3c4d5e6f.css): nomi kontent bilan o'zgaradi, shuning uchun
+    # brauzer ularni qayta tekshirmaydi. Siqilgan nusxalar collectstatic da tayyorlanadi.
+    location ~ "^/static/(.+\.[0-9a-f]{12}\.[A-Za-z0-9]+)\$" {
+        alias ${PROJECT_DIR}/staticfiles/\$1;
+        gzip_static on;
+        ${BROTLI_STATIC}
+        gzip_vary on;
+        add_header Cache-Control "public, max-age=31536000, immutable";
+        access_log off;
+    }
+
     location /static/ {
         alias ${PROJECT_DIR}/staticfiles/;
+        gzip_static on;
+        ${BROTLI_STATIC}
+        gzip_vary on;
         expires 30d;
     }
 
@@ -271,6 +325,10 @@ server {
         proxy_set_header X-Forwarded-Proto \$scheme;
         proxy_read_timeout 120;
         proxy_connect_timeout 120;
+        # oflayn mashq: /api/bank/snapshot/ javobi va /sw.js
+        gzip on;
+        gzip_proxied any;
+        gzip_types application/json application/javascript application/manifest+json;
     }
 }
 NGINXEOF
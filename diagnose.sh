@@ -98,6 +98,9 @@ if [ -f "venv/bin/python" ]; then
     echo "Django tekshiruv:"
     export $(grep -v '^#' .env 2>/dev/null | sed 's/"//g' | xargs) 2>/dev/null
     venv/bin/python manage.py check 2>&1
+    echo ""
+    echo "Sekin sahifalar:"
+    venv/bin/python manage.py perf_report --limit 10 2>&1
 else
     echo "venv topilmadi!"
 fi
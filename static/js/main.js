@@ -51,3 +51,44 @@ function toggleBookmark(element, questionId) {
         }
     });
 }
+
+function loadMore(sentinel, observer) {
+    const url = sentinel.dataset.nextUrl;
+    if (!url || sentinel.dataset.loading) return;
+    sentinel.dataset.loading = '1';
+    fetch(url, {
+        headers: {
+            'X-Requested-With': 'XMLHttpRequest',
+        }
+    })
+    .then(response => response.text())
+    .then(html => {
+        sentinel.insertAdjacentHTML('afterend', html);
+        const next = sentinel.parentNode.querySelector('.load-more:not([data-loading])');
+        sentinel.remove();
+        if (next && observer) observer.observe(next);
+    })
+    .catch(() => {
+        delete sentinel.dataset.loading;
+    });
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    const sentinels = document.querySelectorAll('.load-more');
+    if (!sentinels.length || !('IntersectionObserver' in window)) return;
+    const observer = new IntersectionObserver(entries => {
+        entries.forEach(entry => {
+            if (entry.isIntersecting) {
+                observer.unobserve(entry.target);
+                loadMore(entry.target, observer);
+            }
+        });
+    }, { rootMargin: '600px' });
+    sentinels.forEach(s => observer.observe(s));
+});
+
+if ('serviceWorker' in navigator) {
+    window.addEventListener('load', function() {
+        navigator.serviceWorker.register('/sw.js').catch(() => {});
+    });
+}
@@ -0,0 +1,361 @@
+// Oflayn mashq: savollar banki Cache Storage da saqlanadi, natijalar navbatga
+// yoziladi va service worker (sw.js) ularni internet paydo bo'lganda yuboradi.
+(function() {
+    const configNode = document.getElementById('practiceConfig');
+    if (!configNode) return;
+    const config = JSON.parse(configNode.textContent);
+
+    // Nomlar sw.js dagi bilan bir xil bo'lishi kerak
+    const BANK_CACHE = 'avtotest-bank';
+    const IMAGE_CACHE = 'avtotest-images';
+    const QUEUE_CACHE = 'avtotest-queue';
+    const SYNC_TAG = 'practice-sync';
+    const BANK_KEY = config.snapshot_url + '?local';
+    const IMAGE_WORKERS = 4;
+
+    const hasCaches = 'caches' in window;
+    const statusLine = document.getElementById('practiceStatus');
+    let bank = null;
+    let quiz = null;
+    let timer = null;
+
+    function getCookie(name) {
+        const match = document.cookie.match('(?:^|; )' + name + '=([^;]*)');
+        return match ? decodeURIComponent(match[1]) : '';
+    }
+
+    function uuid4() {
+        if (crypto.randomUUID) return crypto.randomUUID();
+        const b = crypto.getRandomValues(new Uint8Array(16));
+        b[6] = (b[6] & 0x0f) | 0x40;
+        b[8] = (b[8] & 0x3f) | 0x80;
+        const hex = Array.from(b, x => x.toString(16).padStart(2, '0')).join('');
+        return hex.slice(0, 8) + '-' + hex.slice(8, 12) + '-' + hex.slice(12, 16) + '-' + hex.slice(16, 20) + '-' + hex.slice(20);
+    }
+
+    function setStatus(text) {
+        statusLine.textContent = text;
+    }
+
+    // --- Savollar banki ---
+
+    function merge(local, snapshot) {
+        const rows = snapshot.full || !local ? {} : local.questions;
+        snapshot.questions.forEach(row => { rows[row[0]] = row; });
+        const questions = {};
+        snapshot.ids.forEach(id => { if (rows[id]) questions[id] = rows[id]; });
+        const ids = snapshot.ids.filter(id => questions[id]);
+        return {
+            version: snapshot.version,
+            // nimadir yetishmasa keyingi safar to'liq nusxa so'raladi
+            updated: ids.length === snapshot.ids.length ? snapshot.updated : 0,
+            ids: ids,
+            questions: questions,
+        };
+    }
+
+    function loadBank() {
+        if (!hasCaches) return Promise.resolve(null);
+        return caches.open(BANK_CACHE)
+            .then(cache => cache.match(BANK_KEY))
+            .then(response => response ? response.json() : null)
+            .catch(() => null);
+    }
+
+    function saveBank() {
+        if (!hasCaches) return Promise.resolve();
+        return caches.open(BANK_CACHE).then(cache => cache.put(BANK_KEY, new Response(JSON.stringify(bank), {
+            headers: {'Content-Type': 'application/json'},
+        })));
+    }
+
+    function refreshBank() {
+        let url = config.snapshot_url;
+        const headers = {'X-Requested-With': 'XMLHttpRequest'};
+        if (bank) {
+            url += '?since=' + bank.updated;
+            headers['If-None-Match'] = '"' + bank.version + '"';
+        }
+        return fetch(url, {headers: headers, cache: 'no-store'})
+            .then(response => {
+                if (response.status === 304) return false;
+                if (response.status === 403) throw new Error('exam');
+                if (!response.ok || response.redirected) throw new Error(response.status);
+                return response.json().then(snapshot => {
+                    bank = merge(bank, snapshot);
+                    return saveBank().then(() => true);
+                });
+            });
+    }
+
+    function cacheImages() {
+        if (!hasCaches) return Promise.resolve();
+        const wanted = new Set();
+        bank.ids.forEach(id => {
+            const image = bank.questions[id][5];
+            if (image) wanted.add(new URL(image, location.href).href);
+        });
+        return caches.open(IMAGE_CACHE).then(cache => cache.keys().then(keys => {
+            const have = new Set();
+            keys.forEach(request => {
+                // bankdan chiqib ketgan savollarning rasmlari o'chiriladi
+                if (wanted.has(request.url)) have.add(request.url);
+                else cache.delete(request);
+            });
+            const missing = Array.from(wanted).filter(url => !have.has(url));
+            let done = 0;
+            function worker() {
+                const url = missing.shift();
+                if (!url) return Promise.resolve();
+                return cache.add(url).catch(() => {}).then(() => {
+                    done++;
+                    setStatus('Rasmlar saqlanmoqda: ' + done + ' / ' + (done + missing.length));
+                    return worker();
+                });
+            }
+            const workers = [];
+            for (let i = 0; i < IMAGE_WORKERS; i++) workers.push(worker());
+            return Promise.all(workers);
+        }));
+    }
+
+    // --- Natijalar navbati ---
+
+    function queueKey(clientId) {
+        return new URL(config.sync_url + 'queue/' + clientId, location.href).href;
+    }
+
+    function pendingCount() {
+        if (!hasCaches) return Promise.resolve(0);
+        return caches.open(QUEUE_CACHE).then(cache => cache.keys()).then(keys => keys.length);
+    }
+
+    function showPending() {
+        return pendingCount().then(count => {
+            document.getElementById('practicePending').textContent = count;
+        });
+    }
+
+    function postSessions(sessions) {
+        return fetch(config.sync_url, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': getCookie('csrftoken'),
+                'X-Requested-With': 'XMLHttpRequest',
+            },
+            body: JSON.stringify({sessions: sessions}),
+        }).then(response => {
+            if (!response.ok || response.redirected) throw new Error(response.status);
+            return response.json();
+        });
+    }
+
+    function requestSync() {
+        if (!navigator.onLine) return;
+        if (!navigator.serviceWorker || !navigator.serviceWorker.controller) return;
+        navigator.serviceWorker.ready.then(registration => {
+            if (registration.sync) {
+                return registration.sync.register(SYNC_TAG);
+            }
+            // Background Sync yo'q brauzerlar (Safari, Firefox): navbatni hozir yuborish
+            registration.active.postMessage({type: 'flush', csrf: getCookie('csrftoken')});
+        }).catch(() => {
+            navigator.serviceWorker.controller.postMessage({type: 'flush', csrf: getCookie('csrftoken')});
+        });
+    }
+
+    function enqueue(session) {
+        if (!hasCaches || !navigator.serviceWorker || !navigator.serviceWorker.controller) {
+            // Service worker yo'q (HTTP sayt): natija darhol yuboriladi
+            return postSessions([session]).catch(() => {
+                setStatus("Natijani yuborib bo'lmadi: internetni tekshiring");
+            });
+        }
+        return caches.open(QUEUE_CACHE)
+            .then(cache => cache.put(queueKey(session.client_id), new Response(JSON.stringify({
+                session: session,
+                csrf: getCookie('csrftoken'),
+            }), {headers: {'Content-Type': 'application/json'}})))
+            .then(showPending)
+            .then(requestSync);
+    }
+
+    // --- Mashq ---
+
+    function sample(ids, count) {
+        const pool = ids.slice();
+        count = Math.min(count, pool.length);
+        for (let i = 0; i < count; i++) {
+            const j = i + Math.floor(Math.random() * (pool.length - i));
+            [pool[i], pool[j]] = [pool[j], pool[i]];
+        }
+        return pool.slice(0, count);
+    }
+
+    function formatTime(seconds) {
+        const m = Math.floor(seconds / 60);
+        const s = seconds % 60;
+        return String(m).padStart(2, '0') + ':' + String(s).padStart(2, '0');
+    }
+
+    function show(section) {
+        ['practiceSetup', 'practiceQuiz', 'practiceResult'].forEach(id => {
+            document.getElementById(id).style.display = id === section ? '' : 'none';
+        });
+    }
+
+    function startQuiz(size) {
+        quiz = {
+            client_id: uuid4(),
+            started_at: Date.now(),
+            ids: sample(bank.ids, size),
+            answers: {},
+            index: 0,
+            correct: 0,
+            wrong: 0,
+        };
+        document.getElementById('practiceTotal').textContent = quiz.ids.length;
+        document.getElementById('practiceCorrect').textContent = 0;
+        document.getElementById('practiceWrong').textContent = 0;
+        show('practiceQuiz');
+        clearInterval(timer);
+        timer = setInterval(() => {
+            document.getElementById('practiceTimer').textContent = formatTime(Math.floor((Date.now() - quiz.started_at) / 1000));
+        }, 1000);
+        renderQuestion();
+    }
+
+    function renderQuestion() {
+        const q = bank.questions[quiz.ids[quiz.index]];
+        document.getElementById('practiceNum').textContent = quiz.index + 1;
+        document.getElementById('practiceTitle').textContent = 'Savol #' + q[1];
+        document.getElementById('practiceText').textContent = q[2];
+        document.getElementById('practiceProgress').style.width = (quiz.index / quiz.ids.length * 100) + '%';
+
+        const imageBox = document.getElementById('practiceImage');
+        if (q[5]) {
+            document.getElementById('practiceImageImg').src = q[5];
+            imageBox.onclick = () => openImageModal(q[5]);
+            imageBox.style.display = '';
+        } else {
+            imageBox.style.display = 'none';
+        }
+
+        const list = document.getElementById('practiceVariants');
+        list.innerHTML = '';
+        q[3].forEach(([letter, text]) => {
+            const row = document.createElement('div');
+            row.className = 'test-variant-single';
+            row.dataset.answer = letter;
+            row.onclick = () => selectAnswer(q, letter);
+            const indicator = document.createElement('span');
+            indicator.className = 'variant-indicator';
+            indicator.textContent = letter;
+            const content = document.createElement('span');
+            content.className = 'variant-text-content';
+            content.textContent = text;
+            const icon = document.createElement('span');
+            icon.className = 'variant-result-icon';
+            row.append(indicator, content, icon);
+            list.appendChild(row);
+        });
+        document.getElementById('practiceNext').disabled = true;
+    }
+
+    function selectAnswer(q, letter) {
+        if (quiz.answers[q[0]]) return;
+        quiz.answers[q[0]] = letter;
+        if (letter === q[4]) quiz.correct++;
+        else quiz.wrong++;
+        document.getElementById('practiceCorrect').textContent = quiz.correct;
+        document.getElementById('practiceWrong').textContent = quiz.wrong;
+        document.querySelectorAll('#practiceVariants .test-variant-single').forEach(v => {
+            v.style.pointerEvents = 'none';
+            if (v.dataset.answer === q[4]) {
+                v.classList.add('variant-answer-correct');
+                v.querySelector('.variant-result-icon').innerHTML = '<i class="fas fa-check-circle"></i>';
+            } else if (v.dataset.answer === letter) {
+                v.classList.add('variant-answer-wrong');
+                v.querySelector('.variant-result-icon').innerHTML = '<i class="fas fa-times-circle"></i>';
+            }
+        });
+        document.getElementById('practiceNext').disabled = false;
+    }
+
+    function nextQuestion() {
+        if (quiz.index < quiz.ids.length - 1) {
+            quiz.index++;
+            renderQuestion();
+        } else {
+            finishQuiz();
+        }
+    }
+
+    function finishQuiz() {
+        clearInterval(timer);
+        const timeSpent = Math.floor((Date.now() - quiz.started_at) / 1000);
+        const total = quiz.ids.length;
+        const percent = total ? Math.round(quiz.correct / total * 100) : 0;
+        const score = document.getElementById('resultScore');
+        score.textContent = percent + '%';
+        score.className = 'result-score ' + (percent >= 80 ? 'score-good' : percent >= 50 ? 'score-ok' : 'score-bad');
+        document.getElementById('resultCorrect').textContent = quiz.correct;
+        document.getElementById('resultWrong').textContent = total - quiz.correct;
+        document.getElementById('resultTime').textContent = timeSpent;
+        show('practiceResult');
+        enqueue({
+            client_id: quiz.client_id,
+            user: config.user,
+            started_at: quiz.started_at,
+            time_spent: timeSpent,
+            question_ids: quiz.ids,
+            answers: quiz.answers,
+        });
+    }
+
+    function showSetup() {
+        document.getElementById('practiceCount').textContent = bank.ids.length;
+        document.querySelectorAll('#practiceSetup [data-size]').forEach(button => {
+            button.disabled = bank.ids.length < Number(button.dataset.size);
+        });
+        showPending();
+        show('practiceSetup');
+    }
+
+    document.querySelectorAll('#practiceSetup [data-size]').forEach(button => {
+        button.addEventListener('click', () => startQuiz(Number(button.dataset.size)));
+    });
+    document.getElementById('practiceNext').addEventListener('click', nextQuestion);
+    document.getElementById('practiceAgain').addEventListener('click', showSetup);
+
+    if (navigator.serviceWorker) {
+        navigator.serviceWorker.addEventListener('message', event => {
+            if (event.data && event.data.type === 'synced') showPending();
+        });
+    }
+    window.addEventListener('online', requestSync);
+
+    loadBank().then(local => {
+        bank = local;
+        if (bank) showSetup();
+        return refreshBank()
+            .then(changed => {
+                if (!bank) throw new Error('empty');
+                if (changed) showSetup();
+                // to'xtab qolgan yuklashlar ham shu yerda davom etadi
+                return cacheImages();
+            })
+            .then(() => {
+                setStatus(hasCaches ? "Savollar saqlangan, mashq internetsiz ishlaydi" : "Oflayn rejim uchun sayt HTTPS orqali ochilishi kerak");
+                requestSync();
+            })
+            .catch(error => {
+                if (error.message === 'exam') {
+                    setStatus("Boshlangan testni yakunlang: test davomida savollar yuklanmaydi");
+                } else {
+                    setStatus(bank ? "Internet yo'q: saqlangan savollar bilan mashq qilinmoqda" : "Savollarni yuklab bo'lmadi: internetga ulaning");
+                }
+            });
+    });
+})();
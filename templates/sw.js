@@ -0,0 +1,127 @@
+// AvtotestPrime service worker: oflayn mashq (core.views.service_worker orqali beriladi)
+const CONFIG = {{ config|safe }};
+const SHELL_CACHE = 'avtotest-shell-{{ version }}';
+// Nomlar static/js/practice.js dagi bilan bir xil bo'lishi kerak
+const IMAGE_CACHE = 'avtotest-images';
+const QUEUE_CACHE = 'avtotest-queue';
+const SYNC_TAG = 'practice-sync';
+const MEDIA_BASE = new URL(CONFIG.media_url, self.location.href).href;
+const CDN_HOSTS = ['fonts.googleapis.com', 'fonts.gstatic.com', 'cdnjs.cloudflare.com'];
+
+self.addEventListener('install', event => {
+    event.waitUntil(
+        caches.open(SHELL_CACHE)
+            .then(cache => cache.addAll(CONFIG.assets))
+            .then(() => self.skipWaiting())
+    );
+});
+
+self.addEventListener('activate', event => {
+    event.waitUntil(
+        caches.keys()
+            .then(names => Promise.all(names
+                .filter(name => name.startsWith('avtotest-shell-') && name !== SHELL_CACHE)
+                .map(name => caches.delete(name))))
+            .then(() => self.clients.claim())
+    );
+});
+
+async function cacheFirst(cacheName, request) {
+    const cache = await caches.open(cacheName);
+    const cached = await cache.match(request);
+    if (cached) return cached;
+    const response = await fetch(request);
+    if (response.ok || response.type === 'opaque') {
+        cache.put(request, response.clone());
+    }
+    return response;
+}
+
+async function practicePage(request) {
+    const cache = await caches.open(SHELL_CACHE);
+    try {
+        const response = await fetch(request);
+        // login sahifasiga yo'naltirish keshga tushmasin
+        if (request.url.endsWith(CONFIG.practice_url) && response.ok && !response.redirected) {
+            cache.put(CONFIG.practice_url, response.clone());
+        }
+        return response;
+    } catch (error) {
+        // Internet yo'q: istalgan sahifa o'rniga oflayn mashq
+        const cached = await cache.match(CONFIG.practice_url);
+        if (cached) return cached;
+        throw error;
+    }
+}
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    if (request.method !== 'GET') return;
+    const url = new URL(request.url);
+    if (url.href.startsWith(MEDIA_BASE)) {
+        event.respondWith(cacheFirst(IMAGE_CACHE, request));
+    } else if (url.origin === self.location.origin) {
+        if (CONFIG.assets.includes(url.pathname)) {
+            event.respondWith(cacheFirst(SHELL_CACHE, request));
+        } else if (request.mode === 'navigate') {
+            event.respondWith(practicePage(request));
+        }
+    } else if (CDN_HOSTS.includes(url.hostname)) {
+        event.respondWith(cacheFirst(SHELL_CACHE, request));
+    }
+});
+
+let flushing = null;
+
+async function flushQueue(csrf) {
+    const cache = await caches.open(QUEUE_CACHE);
+    let synced = 0;
+    for (;;) {
+        const keys = (await cache.keys()).slice(0, CONFIG.batch_size);
+        if (!keys.length) break;
+        const items = await Promise.all(keys.map(key => cache.match(key).then(response => response.json())));
+        const response = await fetch(CONFIG.sync_url, {
+            method: 'POST',
+            credentials: 'same-origin',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': csrf || items[items.length - 1].csrf,
+                'X-Requested-With': 'XMLHttpRequest',
+            },
+            body: JSON.stringify({sessions: items.map(item => item.session)}),
+        });
+        if (!response.ok || response.redirected) {
+            // sync hodisasi xato bilan tugasa brauzer keyinroq qayta urinadi
+            throw new Error('sync ' + response.status);
+        }
+        const result = await response.json();
+        const done = new Set(result.synced.concat(result.rejected));
+        const finished = keys.filter((key, i) => done.has(items[i].session.client_id));
+        await Promise.all(finished.map(key => cache.delete(key)));
+        synced += finished.length;
+        // qolganlari boshqa foydalanuvchiniki: u kirguncha navbatda turadi
+        if (finished.length < keys.length) break;
+    }
+    const clients = await self.clients.matchAll();
+    clients.forEach(client => client.postMessage({type: 'synced', count: synced}));
+    return synced;
+}
+
+function flush(csrf) {
+    if (!flushing) {
+        flushing = flushQueue(csrf).finally(() => { flushing = null; });
+    }
+    return flushing;
+}
+
+self.addEventListener('sync', event => {
+    if (event.tag === SYNC_TAG) {
+        event.waitUntil(flush());
+    }
+});
+
+self.addEventListener('message', event => {
+    if (event.data && event.data.type === 'flush') {
+        event.waitUntil(flush(event.data.csrf).catch(() => {}));
+    }
+});
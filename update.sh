@@ -11,8 +11,18 @@ git pull origin main || git pull origin master
 source venv/bin/activate
 
 pip install -r requirements.txt
+if grep -q 'SERVER_MODE="asgi"' .env 2>/dev/null; then
+    pip install "uvicorn[standard]==0.30.6"
+fi
+if grep -q 'DB_POOL="True"' .env 2>/dev/null; then
+    pip install "psycopg[binary,pool]==3.2.3"
+fi
 python manage.py migrate --noinput
+# Statik fayllar: hashli nomlar, minify va .gz/.br nusxalar (core/storage.py).
+# Eski hashli fayllar o'chirilmaydi - eski sahifani ochib turganlar uchun kerak.
 python manage.py collectstatic --noinput
+python manage.py build_image_variants
+python manage.py build_tickets
 
 WEB_USER="www"
 if ! id -u www > /dev/null 2>&1; then